@@ -1,225 +1,271 @@
+import atexit
+import hashlib
 import io
-from flask import Flask, request, send_file, render_template
+import itertools
+import logging
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from flask import Flask, Response, g, jsonify, request, send_file, render_template, stream_with_context
 from PIL import Image
-from pathlib import Path
 import zipfile
 import json
 import uuid
-import requests
+
+import metrics
+from artifacts import ArtifactStore
+from batch_render import batch_entries, iter_inputs, iter_zip_inputs
+from pack_builder import CMD_START, pack_entries
+from pack_writer import build_zip, stream_zip
+from png_encoder import ENCODE_STATS, encode_png
+from render_cache import RenderCache, cache_key
+from singleflight import SingleFlight
+from skin_decoder import MAX_SKIN_BYTES, SkinDecodeError, decode_skin, read_limited
+from skin_resolver import SkinResolver, SkinResolverError, SkinUnavailable, UnknownUsername
+from totem_core import AUTO_PROFILE, LAYERS, PROFILES, RenderOptions, mapping_version, render_pixels, skin_to_array
 
 app = Flask(__name__)
 
+# Größter Request-Body insgesamt (Batch-ZIPs) und für einzelne Skins
+MAX_BATCH_UPLOAD_BYTES = 64 * 1024 * 1024
+MAX_UPLOAD_BYTES = MAX_SKIN_BYTES + 64 * 1024
+app.config['MAX_CONTENT_LENGTH'] = MAX_BATCH_UPLOAD_BYTES
+
+logger = logging.getLogger("totem.app")
+
+# Cache für fertige Totem-PNGs (optional mit Festplatten-Ebene über TOTEM_CACHE_DIR)
+render_cache = RenderCache(
+    max_entries=4096,
+    max_bytes=32 * 1024 * 1024,
+    disk_dir=os.environ.get("TOTEM_CACHE_DIR"),
+)
+
+# Username -> Skin über Mojang/Crafatar (Connection-Pool, Timeouts, Caches)
+skin_resolver = SkinResolver()
+
+# Fasst gleichzeitige Anfragen für denselben Username zusammen
+username_flight = SingleFlight()
+
+# --- Metriken: Laufzeit, Status und laufende Requests pro Route ---
+@app.before_request
+def metrics_start():
+    route = request.url_rule.rule if request.url_rule is not None else "unbekannt"
+    g.metrics = metrics.start_request(route)
+
+# Routen, die nur einen einzelnen Skin annehmen
+SKIN_ROUTES = {'/generate_totem', '/generate_java_zip', '/generate_bedrock_mcpack'}
+
+@app.before_request
+def limit_skin_upload():
+    # Zu große Uploads abweisen, bevor der Body gelesen wird
+    if request.url_rule is not None and request.url_rule.rule in SKIN_ROUTES:
+        if request.content_length is not None and request.content_length > MAX_UPLOAD_BYTES:
+            return "Anfrage zu groß.", 413
+        # Auch ohne Content-Length (chunked) gilt beim Lesen des Streams das Skin-Limit
+        request.max_content_length = MAX_UPLOAD_BYTES
+
+@app.after_request
+def metrics_status(response):
+    g.metrics_status = response.status_code
+    return response
+
+@app.teardown_request
+def metrics_finish(exc):
+    handle = g.pop('metrics', None)
+    if handle is not None:
+        metrics.finish_request(handle, g.pop('metrics_status', 500 if exc else 200))
+
+@metrics.REGISTRY.collector
+def cache_metrics():
+    # Werte der Caches und der PNG-Kodierung zum Zeitpunkt des Abrufs
+    cache = render_cache.stats()
+    treffer = cache["hits"] + cache["disk_hits"]
+    abfragen = treffer + cache["misses"]
+    kodierung = ENCODE_STATS.snapshot()
+    return [
+        ("totem_render_cache_hits_total", "counter", "Treffer im Render-Cache (Speicher)", cache["hits"]),
+        ("totem_render_cache_disk_hits_total", "counter", "Treffer im Render-Cache (Festplatte)", cache["disk_hits"]),
+        ("totem_render_cache_misses_total", "counter", "Fehlschläge im Render-Cache", cache["misses"]),
+        ("totem_render_cache_hit_ratio", "gauge", "Trefferquote des Render-Caches", treffer / abfragen if abfragen else 0),
+        ("totem_render_cache_bytes", "gauge", "Belegung des Render-Caches im Speicher", cache["bytes"]),
+        ("totem_username_flights_in_flight", "gauge", "Laufende Username-Abfragen", username_flight.in_flight()),
+        ("totem_username_flights_shared_total", "counter", "Anfragen, die eine laufende Abfrage mitgenutzt haben", username_flight.shared),
+        ("totem_png_encodes_total", "counter", "Kodierte PNGs", kodierung["encodes"]),
+        ("totem_png_bytes_total", "counter", "Ausgegebene PNG-Bytes", kodierung["bytes_out"]),
+    ]
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    # Metriken im Prometheus-Textformat
+    return Response(metrics.REGISTRY.expose(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/')
 def index():
     # Gibt die HTML-Seite zurück
     return render_template('index.html')
 
-def generate_totem_image(uploaded_image, overlay):
+def render_png(skin_pixel, options):
     """
-    Erzeugt aus einem Minecraft-Skin-Bild (uploaded_image) und Overlay-Flag ein Totem-Bild (32x32).
-    Gibt ein PIL.Image-Objekt zurück.
+    Rendert das Totem aus dem Pixel-Array von open_skin() und liefert
+    (artefakt_id, png_bytes).
+    Bereits bekannte Skins (gleiche Pixel, gleiche Optionen) kommen aus dem Cache.
+    Die Artefakt-ID ist der Cache-Schlüssel, das PNG liegt danach im Artefakt-Store.
     """
-    # Mapping-Parameter für Kopf, Arme und Körper
-    mapping = {
-        "kopf": {
-            "skin": [8, 8, 8, 8],
-            "totem": [8, 1, 16, 16],
-            "resize": "nearest",
-            "crop": [
-                [0, 0, 15, 0], [0, 1], [1, 1], [14, 1], [15, 1], [0, 2], [15, 2], [0, 15, 15, 15]
-            ]
-        },
-        "arm_links": {
-            "skin": [44, 20, 3, 9],
-            "totem": [8, 17, 3, 9],
-            "resize": None,
-            "crop": []
-        },
-        "arm_rechts": {
-            "skin": [36, 52, 3, 9],
-            "totem": [21, 17, 3, 9],
-            "resize": None,
-            "crop": []
-        },
-        "koerper": {
-            "skin": [20, 20, 8, 12],
-            "totem": [12, 16, 8, 12],
-            "resize": None,
-            "crop": []
-        }
-    }
+    # Outline- und Mapping-Version gehören zum Schlüssel, damit eine geänderte
+    # Outline- oder Profil-Datei greift
+    outline_version = LAYERS.version(options.outline) if options.outline else None
+    key = cache_key(skin_pixel, options, (outline_version, mapping_version(options.profile)))
+    png = render_cache.get(key)
+    if png is None:
+        with metrics.stage("render"):
+            totem_img = render_pixels(skin_pixel, options)
+        with metrics.stage("encode"):
+            png = encode_png(totem_img).data
+        render_cache.put(key, png)
+    artifact_store.put(key, png)
+    return key, png
+
+def options_from_form(form):
+    """
+    Liest die Render-Optionen aus einem Formular (MultiDict).
+
+    Raises:
+        ValueError: unbekannter Outline-Stil oder unbekanntes Profil
+    """
+    overlay = form.get('overlay', 'off') == 'on'
+    outline = form.get('outline', 'default').strip() or 'default'
+    if outline == 'none':
+        outline = None
+    elif outline not in LAYERS.names():
+        raise ValueError(f"Unbekannter Outline-Stil: {outline}")
+    hd = form.get('hd', 'off') == 'on'
+    profile = form.get('profile', AUTO_PROFILE).strip() or AUTO_PROFILE
+    if profile != AUTO_PROFILE and profile not in PROFILES.names():
+        raise ValueError(f"Unbekanntes Profil: {profile}")
+    second_layer = form.get('second_layer', 'off') == 'on'
+    return RenderOptions(overlay=overlay, outline=outline, hd=hd, profile=profile, second_layer=second_layer)
+
+def options_from_request():
+    """
+    Liest die Render-Optionen aus dem Formular des aktuellen Requests.
+    """
+    return options_from_form(request.form)
 
-    # Leeres Totem-Bild (32x32 Pixel, transparent)
-    totem_img = Image.new("RGBA", (32, 32), (0, 0, 0, 0))
-
-    # --- Kopf generieren ---
-    kopf = mapping["kopf"]
-    sx, sy, sw, sh = kopf["skin"]
-    kopf_img = uploaded_image.crop((sx, sy, sx+sw, sy+sh))
-    if kopf["resize"] == "nearest":
-        ziel_w, ziel_h = kopf["totem"][2], kopf["totem"][3]
-        kopf_img = kopf_img.resize((ziel_w, ziel_h), Image.NEAREST)
-    kopf_img = kopf_img.convert("RGBA")
-    pixels = kopf_img.load()
-    for crop in kopf["crop"]:
-        if len(crop) == 4:
-            x1, y1, x2, y2 = crop
-            for x in range(x1, x2+1):
-                for y in range(y1, y2+1):
-                    if 0 <= x < kopf_img.width and 0 <= y < kopf_img.height:
-                        pixels[x, y] = (0, 0, 0, 0)
-        elif len(crop) == 2:
-            x, y = crop
-            if 0 <= x < kopf_img.width and 0 <= y < kopf_img.height:
-                pixels[x, y] = (0, 0, 0, 0)
-
-    # --- Kopf-Overlay extrahieren und drüberlegen (nur wenn overlay aktiviert ist) ---
-    if overlay:
-        overlay_img = uploaded_image.crop((40, 8, 40+8, 8+8))
-        if kopf["resize"] == "nearest":
-            overlay_img = overlay_img.resize((ziel_w, ziel_h), Image.NEAREST)
-        overlay_img = overlay_img.convert("RGBA")
-        overlay_pixels = overlay_img.load()
-        for crop in kopf["crop"]:
-            if len(crop) == 4:
-                x1, y1, x2, y2 = crop
-                for x in range(x1, x2+1):
-                    for y in range(y1, y2+1):
-                        if 0 <= x < overlay_img.width and 0 <= y < overlay_img.height:
-                            overlay_pixels[x, y] = (0, 0, 0, 0)
-            elif len(crop) == 2:
-                x, y = crop
-                if 0 <= x < overlay_img.width and 0 <= y < overlay_img.height:
-                    overlay_pixels[x, y] = (0, 0, 0, 0)
-        kopf_img = Image.alpha_composite(kopf_img, overlay_img)
-
-    tx, ty = kopf["totem"][0], kopf["totem"][1]
-    totem_img.paste(kopf_img, (tx, ty), kopf_img)
-
-    # --- Linken Arm generieren ---
-    arm_l = mapping["arm_links"]
-    sx, sy, sw, sh = arm_l["skin"]
-    arm_l_img = uploaded_image.crop((sx, sy, sx+sw, sy+sh)).convert("RGBA")
-    pixels = arm_l_img.load()
-    for crop in arm_l["crop"]:
-        if len(crop) == 4:
-            x1, y1, x2, y2 = crop
-            for x in range(x1, x2+1):
-                for y in range(y1, y2+1):
-                    if 0 <= x < arm_l_img.width and 0 <= y < arm_l_img.height:
-                        pixels[x, y] = (0, 0, 0, 0)
-        elif len(crop) == 2:
-            x, y = crop
-            if 0 <= x < arm_l_img.width and 0 <= y < arm_l_img.height:
-                pixels[x, y] = (0, 0, 0, 0)
-    tx, ty = arm_l["totem"][0], arm_l["totem"][1]
-    totem_img.paste(arm_l_img, (tx, ty), arm_l_img)
-
-    # --- Rechten Arm generieren ---
-    arm_r = mapping["arm_rechts"]
-    sx, sy, sw, sh = arm_r["skin"]
-    arm_r_img = uploaded_image.crop((sx, sy, sx+sw, sy+sh)).convert("RGBA")
-    pixels = arm_r_img.load()
-    for crop in arm_r["crop"]:
-        if len(crop) == 4:
-            x1, y1, x2, y2 = crop
-            for x in range(x1, x2+1):
-                for y in range(y1, y2+1):
-                    if 0 <= x < arm_r_img.width and 0 <= y < arm_r_img.height:
-                        pixels[x, y] = (0, 0, 0, 0)
-        elif len(crop) == 2:
-            x, y = crop
-            if 0 <= x < arm_r_img.width and 0 <= y < arm_r_img.height:
-                pixels[x, y] = (0, 0, 0, 0)
-    tx, ty = arm_r["totem"][0], arm_r["totem"][1]
-    totem_img.paste(arm_r_img, (tx, ty), arm_r_img)
-
-    # --- Körper generieren ---
-    koerper = mapping["koerper"]
-    sx, sy, sw, sh = koerper["skin"]
-    koerper_img = uploaded_image.crop((sx, sy, sx+sw, sy+sh)).convert("RGBA")
-    pixels = koerper_img.load()
-    for crop in koerper["crop"]:
-        if len(crop) == 4:
-            x1, y1, x2, y2 = crop
-            for x in range(x1, x2+1):
-                for y in range(y1, y2+1):
-                    if 0 <= x < koerper_img.width and 0 <= y < koerper_img.height:
-                        pixels[x, y] = (0, 0, 0, 0)
-        elif len(crop) == 2:
-            x, y = crop
-            if 0 <= x < koerper_img.width and 0 <= y < koerper_img.height:
-                pixels[x, y] = (0, 0, 0, 0)
-    tx, ty = koerper["totem"][0], koerper["totem"][1]
-    totem_img.paste(koerper_img, (tx, ty), koerper_img)
-
-    # --- Spezielle Pixel-Kopieraktionen für den Körper (Feinschliff) ---
-    px = totem_img.getpixel((10, 17))
-    totem_img.putpixel((10, 16), px)
-    for y in range(16, 27):
-        px = totem_img.getpixel((12, y))
-        totem_img.putpixel((11, y), px)
-    for y in range(16, 27):
-        px = totem_img.getpixel((19, y))
-        totem_img.putpixel((20, y), px)
-    px = totem_img.getpixel((21, 17))
-    totem_img.putpixel((21, 16), px)
-
-    # --- Outline laden und drüberlegen, falls vorhanden ---
-    outline_path = Path("outline.png")
-    if outline_path.exists():
+def resolver_error(e, kontext=""):
+    """
+    Übersetzt einen Fehler des Skin-Resolvers in (Meldung, Status).
+    """
+    if isinstance(e, UnknownUsername):
+        metrics.UPSTREAM_ERRORS.inc(kind="unknown_username")
+        logger.info("Username existiert nicht laut Mojang API%s: %s", kontext, e)
+        return "Username existiert nicht (laut Mojang API).", 400
+    if isinstance(e, SkinUnavailable):
+        metrics.UPSTREAM_ERRORS.inc(kind="skin_unavailable")
+        logger.warning("Skin konnte nicht von Crafatar geladen werden%s: %s", kontext, e)
+        return "Skin konnte nicht von Crafatar geladen werden.", 400
+    metrics.UPSTREAM_ERRORS.inc(kind="mojang")
+    logger.warning("Mojang API nicht erreichbar%s: %s", kontext, e)
+    return "Mojang API ist gerade nicht erreichbar.", 502
+
+def open_skin(stream, quelle, kontext="", hd=False):
+    """
+    Liest und prüft den Skin aus einem Datei-Objekt (siehe skin_decoder)
+    und dekodiert ihn einmalig in das Pixel-Array für render_png().
+    Die ganze Dekodierung zählt als eine Stufe "decode".
+
+    Raises:
+        SkinDecodeError: kein zulässiger PNG-Skin
+    """
+    with metrics.stage("decode"):
         try:
-            outline_img = Image.open(outline_path).convert("RGBA")
-            if outline_img.size != (32, 32):
-                outline_img = outline_img.resize((32, 32), Image.NEAREST)
-            totem_img = Image.alpha_composite(totem_img, outline_img)
-        except Exception as e:
-            pass  # Fehler ignorieren, Outline ist optional
+            uploaded_image = decode_skin(read_limited(stream))
+        except SkinDecodeError as e:
+            logger.info("Ungültiger Skin (%s%s): %s", quelle, kontext, e)
+            raise
+        logger.debug("%s%s: Bild geladen, Größe %s, Modus %s", quelle, kontext, uploaded_image.size, uploaded_image.mode)
+        return skin_to_array(uploaded_image, hd)
 
-    return totem_img
+def render_skin_bytes(skin_bytes, options, kontext="", quelle="Username"):
+    """
+    Rendert das Totem aus den PNG-Bytes eines Skins (z.B. vom Resolver).
+    """
+    return render_png(open_skin(io.BytesIO(skin_bytes), quelle, kontext, options.hd), options)
+
+def render_username_png(username, options, kontext=""):
+    """
+    Lädt den Skin eines Usernames (Mojang/Crafatar) und rendert das Totem.
+
+    Raises:
+        SkinResolverError: Username unbekannt oder Upstream nicht erreichbar
+    """
+    with metrics.stage("upstream"):
+        skin_bytes = skin_resolver.resolve(username)
+    return render_skin_bytes(skin_bytes, options, kontext)
+
+def totem_png_from_request(kontext=""):
+    """
+    Erzeugt das Totem-PNG aus dem Formular (Username oder Datei-Upload).
+
+    Gleichzeitige Anfragen für denselben Username und dieselben Optionen
+    teilen sich eine Upstream-Abfrage und einen Render-Vorgang.
+
+    Returns:
+        ((artefakt_id, png), None) bei Erfolg, sonst (None, Fehler-Antwort)
+    """
+    try:
+        options = options_from_request()
+    except ValueError as e:
+        return None, (str(e), 400)
 
-@app.route('/generate_totem', methods=['POST'])
-def generate_totem():
     # Prüfe, ob ein Username übergeben wurde
     username = request.form.get('username', '').strip()
     if username:
-        mojang_url = f"https://api.mojang.com/users/profiles/minecraft/{username}"
-        mojang_response = requests.get(mojang_url)
-        if mojang_response.status_code == 200:
-            uuid = mojang_response.json()['id']
-            skin_url = f"https://crafatar.com/skins/{uuid}"
-            response = requests.get(skin_url)
-            if response.status_code == 200:
-                try:
-                    uploaded_image = Image.open(io.BytesIO(response.content))
-                    print("[DEBUG] Username: Bild geladen, Typ:", type(uploaded_image), "Größe:", getattr(uploaded_image, 'size', 'NO SIZE'))
-                except Exception as e:
-                    print("[DEBUG] Fehler beim Laden des Bildes (Username):", e)
-                    raise
-            else:
-                print("[DEBUG] Fehler: Skin konnte nicht von Crafatar geladen werden.")
-                return "Skin konnte nicht von Crafatar geladen werden.", 400
-        else:
-            print("[DEBUG] Fehler: Username existiert nicht laut Mojang API.")
-            return "Username existiert nicht (laut Mojang API).", 400
-    else:
         try:
-            file = request.files['skin']
-            uploaded_image = Image.open(file.stream)
-            print("[DEBUG] Datei-Upload: Bild geladen, Typ:", type(uploaded_image), "Größe:", getattr(uploaded_image, 'size', 'NO SIZE'))
-        except Exception as e:
-            print("[DEBUG] Fehler beim Laden des Bildes (Datei):", e)
-            raise
-    overlay = request.form.get('overlay', 'off') == 'on'
+            result = username_flight.do(
+                (username.lower(), options),
+                lambda: render_username_png(username, options, kontext),
+            )
+        except SkinResolverError as e:
+            return None, resolver_error(e, kontext)
+        except SkinDecodeError as e:
+            return None, (f"Ungültiger Skin: {e}", 400)
+        return result, None
+
+    file = request.files['skin']
+    try:
+        skin_pixel = open_skin(file.stream, "Datei-Upload", kontext, options.hd)
+    except SkinDecodeError as e:
+        return None, (f"Ungültiger Skin: {e}", 400)
+    return render_png(skin_pixel, options), None
 
-    # --- NEU: Bildverarbeitung ausgelagert ---
-    totem_img = generate_totem_image(uploaded_image, overlay)
+@app.route('/outlines', methods=['GET'])
+def list_outlines():
+    # Verfügbare Outline-Stile für das Formularfeld "outline"
+    return jsonify(LAYERS.names() + ['none'])
 
-    # Bild als PNG zurückgeben
-    img_io = io.BytesIO()
-    totem_img.save(img_io, 'PNG')
-    img_io.seek(0)
-    return send_file(img_io, mimetype='image/png')
+@app.route('/profiles', methods=['GET'])
+def list_profiles():
+    # Verfügbare Mapping-Profile für das Formularfeld "profile"
+    profiles = {AUTO_PROFILE: "classic oder slim, je nach Arm-Modell des Skins"}
+    profiles.update((profile.name, profile.description) for profile in PROFILES.all())
+    return jsonify(profiles)
+
+@app.route('/generate_totem', methods=['POST'])
+def generate_totem():
+    # --- NEU: Bildverarbeitung ausgelagert (mit Render-Cache) ---
+    result, fehler = totem_png_from_request()
+    if fehler:
+        return fehler
+    artifact_id, png = result
+
+    # Bild als PNG zurückgeben; über die Artefakt-ID holt die Seite später
+    # pack.png und das ZIP ab, ohne erneut zu rendern
+    response = send_file(io.BytesIO(png), mimetype='image/png')
+    response.headers['X-Artifact-Id'] = artifact_id
+    return response
 
 # Inhalt der pack.mcmeta als String-Konstante direkt im Code
 PACK_MCMETA = """{
@@ -233,64 +279,226 @@ PACK_MCMETA = """{
     }
 }"""
 
+def make_pack_png(artefakt):
+    """
+    pack.png dynamisch aus Totem-Textur erzeugen (256x256)
+    """
+    totem_img = Image.open(io.BytesIO(artefakt["png"]))
+    # Per Indexbild-Vergrößerung statt resize() auf RGBA (Faktor 8 bei 32x32,
+    # HD-Totems werden entsprechend weniger vergrößert)
+    return encode_png(totem_img, scale=max(1, 256 // totem_img.width)).data
+
+def make_java_zip(artefakt):
+    """
+    Java-Resourcepack als ZIP-Archiv erstellen
+    """
+    return build_zip([
+        # Totem-Bild ins ZIP schreiben (PNG wird nur gespeichert, nicht erneut komprimiert)
+        ('assets/minecraft/textures/item/totem_of_undying.png', artefakt["png"]),
+        # pack.mcmeta direkt aus String-Konstante hinzufügen
+        ('pack.mcmeta', PACK_MCMETA),
+        # pack.png aus Totem-Textur erzeugen und hinzufügen
+        ('pack.png', artefakt["pack_png"]),
+    ])
+
+# --- Bedrock (.mcpack) ---
+# Pfad der Totem-Textur in einem Bedrock-Resourcepack
+BEDROCK_TEXTURE = 'textures/items/totem.png'
+# Namensraum der Pack-UUIDs; gleiche Textur ergibt immer dieselben UUIDs
+BEDROCK_UUID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, 'https://mc-totem.com/bedrock')
+BEDROCK_MIN_ENGINE_VERSION = [1, 16, 0]
+
+def bedrock_manifest(png):
+    """
+    manifest.json für ein Bedrock-Resourcepack. Header- und Modul-UUID werden
+    aus dem Inhalts-Hash der Textur abgeleitet, gleiche Totems ergeben also
+    byte-gleiche Packs (und Bedrock erkennt sie als dasselbe Pack wieder).
+    """
+    digest = hashlib.sha256(png).hexdigest()
+    return json.dumps({
+        "format_version": 2,
+        "header": {
+            "name": "Custom Totem",
+            "description": "§6Have fun with youre custom §bTotem§6. §4Made with §5mc-totem.com",
+            "uuid": str(uuid.uuid5(BEDROCK_UUID_NAMESPACE, f"header:{digest}")),
+            "version": [1, 0, 0],
+            "min_engine_version": BEDROCK_MIN_ENGINE_VERSION,
+        },
+        "modules": [{
+            "type": "resources",
+            "uuid": str(uuid.uuid5(BEDROCK_UUID_NAMESPACE, f"resources:{digest}")),
+            "version": [1, 0, 0],
+        }],
+    }, indent=4, ensure_ascii=False)
+
+def make_bedrock_mcpack(artefakt):
+    """
+    Bedrock-Resourcepack als .mcpack (ZIP-Archiv) erstellen
+    """
+    return build_zip([
+        ('manifest.json', bedrock_manifest(artefakt["png"])),
+        (BEDROCK_TEXTURE, artefakt["png"]),
+        # Gleiches Icon wie pack.png im Java-Pack (wird nur einmal abgeleitet)
+        ('pack_icon.png', artefakt["pack_png"]),
+    ])
+
+# Render-Ergebnisse, aus denen pack.png und die Packs erst beim Abruf abgeleitet werden
+artifact_store = ArtifactStore({
+    "pack_png": make_pack_png,
+    "java_zip": make_java_zip,
+    "bedrock_mcpack": make_bedrock_mcpack,
+})
+
+# Downloads pro Ausgabe: (Mimetype, Dateiname)
+ARTIFACT_DOWNLOADS = {
+    "png": ('image/png', 'totem_of_undying.png'),
+    "pack_png": ('image/png', 'pack.png'),
+    "java_zip": ('application/zip', 'Custom_Totem.zip'),
+    "bedrock_mcpack": ('application/zip', 'Custom_Totem.mcpack'),
+}
+
+@app.route('/artifact/<artifact_id>/<kind>', methods=['GET'])
+def get_artifact(artifact_id, kind):
+    # Liefert eine Ausgabe eines bereits gerenderten Totems
+    if kind not in ARTIFACT_DOWNLOADS:
+        return "Unbekannte Ausgabe.", 404
+    data = artifact_store.get(artifact_id, kind)
+    if data is None:
+        return "Artefakt abgelaufen oder unbekannt.", 404
+    mimetype, download_name = ARTIFACT_DOWNLOADS[kind]
+    return send_file(io.BytesIO(data), mimetype=mimetype, as_attachment=(kind != "png"), download_name=download_name)
+
+def pack_for(artifact_id, png, kind):
+    """
+    Pack (kind: "java_zip" oder "bedrock_mcpack") eines gerade gerenderten
+    Totems aus dem Artefakt-Store.
+    """
+    with metrics.stage("zip"):
+        zip_bytes = artifact_store.get(artifact_id, kind)
+        if zip_bytes is None:
+            # Artefakt wurde zwischenzeitlich verdrängt
+            artifact_store.put(artifact_id, png)
+            zip_bytes = artifact_store.get(artifact_id, kind)
+    return zip_bytes
+
+def java_zip_for(artifact_id, png):
+    """
+    Java-ZIP eines gerade gerenderten Totems aus dem Artefakt-Store.
+    """
+    return pack_for(artifact_id, png, "java_zip")
+
+def bedrock_mcpack_for(artifact_id, png):
+    """
+    Bedrock-.mcpack eines gerade gerenderten Totems aus dem Artefakt-Store.
+    """
+    return pack_for(artifact_id, png, "bedrock_mcpack")
+
 @app.route('/generate_java_zip', methods=['POST'])
 def generate_java_zip():
-    username = request.form.get('username', '').strip()
-    if username:
-        mojang_url = f"https://api.mojang.com/users/profiles/minecraft/{username}"
-        mojang_response = requests.get(mojang_url)
-        if mojang_response.status_code == 200:
-            uuid = mojang_response.json()['id']
-            skin_url = f"https://crafatar.com/skins/{uuid}"
-            response = requests.get(skin_url)
-            if response.status_code == 200:
-                try:
-                    uploaded_image = Image.open(io.BytesIO(response.content))
-                    print("[DEBUG] Username (ZIP): Bild geladen, Typ:", type(uploaded_image), "Größe:", getattr(uploaded_image, 'size', 'NO SIZE'))
-                except Exception as e:
-                    print("[DEBUG] Fehler beim Laden des Bildes (Username, ZIP):", e)
-                    raise
-            else:
-                print("[DEBUG] Fehler: Skin konnte nicht von Crafatar geladen werden (ZIP).")
-                return "Skin konnte nicht von Crafatar geladen werden.", 400
-        else:
-            print("[DEBUG] Fehler: Username existiert nicht laut Mojang API (ZIP).")
-            return "Username existiert nicht (laut Mojang API).", 400
-    else:
+    # --- NEU: Bildverarbeitung ausgelagert (mit Render-Cache) ---
+    result, fehler = totem_png_from_request(" (ZIP)")
+    if fehler:
+        return fehler
+    artifact_id, png = result
+
+    zip_bytes = java_zip_for(artifact_id, png)
+    return send_file(io.BytesIO(zip_bytes), mimetype='application/zip', as_attachment=True, download_name='Custom_Totem.zip')
+
+@app.route('/generate_bedrock_mcpack', methods=['POST'])
+def generate_bedrock_mcpack():
+    # Gleiches Render-Ergebnis wie /generate_java_zip, nur als Bedrock-Pack
+    result, fehler = totem_png_from_request(" (mcpack)")
+    if fehler:
+        return fehler
+    artifact_id, png = result
+
+    mcpack_bytes = bedrock_mcpack_for(artifact_id, png)
+    return send_file(io.BytesIO(mcpack_bytes), mimetype='application/zip', as_attachment=True, download_name='Custom_Totem.mcpack')
+
+# Maximale Anzahl Skins pro Batch-Anfrage
+MAX_BATCH_ITEMS = 256
+
+# Prozess-Pool für Batch-Anfragen (Größe über TOTEM_BATCH_WORKERS, Standard: CPU-Kerne)
+batch_workers = int(os.environ.get("TOTEM_BATCH_WORKERS", 0)) or os.cpu_count() or 1
+# Der Pool wird beim Start angelegt, nicht erst im Request-Thread. "spawn" statt fork,
+# damit die Worker keine Locks oder Threads des laufenden Servers erben.
+batch_executor = ProcessPoolExecutor(max_workers=batch_workers, mp_context=multiprocessing.get_context("spawn"))
+atexit.register(batch_executor.shutdown, wait=False, cancel_futures=True)
+
+def batch_items_from_request():
+    """
+    Liest die Aufträge eines Batch-Requests: ZIP mit Skins ("skins") und/oder
+    Usernames ("usernames", getrennt durch Leerzeichen, Komma oder Semikolon).
+
+    Returns:
+        (items, None) bei Erfolg, sonst (None, Fehler-Antwort)
+    """
+    usernames = [u for u in re.split(r"[\s,;]+", request.form.get('usernames', '')) if u]
+
+    skins_zip = None
+    anzahl = len(usernames)
+    if 'skins' in request.files:
+        # Eigene Kopie des Uploads, da die Antwort erst nach dem Request gestreamt wird
+        upload = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+        shutil.copyfileobj(request.files['skins'].stream, upload)
         try:
-            file = request.files['skin']
-            uploaded_image = Image.open(file.stream)
-            print("[DEBUG] Datei-Upload (ZIP): Bild geladen, Typ:", type(uploaded_image), "Größe:", getattr(uploaded_image, 'size', 'NO SIZE'))
-        except Exception as e:
-            print("[DEBUG] Fehler beim Laden des Bildes (Datei, ZIP):", e)
-            raise
-    overlay = request.form.get('overlay', 'off') == 'on'
-
-    # --- NEU: Bildverarbeitung ausgelagert ---
-    totem_img = generate_totem_image(uploaded_image, overlay)
-
-    # Bild als PNG in BytesIO speichern
-    img_io = io.BytesIO()
-    totem_img.save(img_io, 'PNG')
-    img_io.seek(0)
-
-    # --- pack.png dynamisch aus Totem-Textur erzeugen (256x256) ---
-    pack_img = totem_img.resize((256, 256), Image.NEAREST)
-    pack_io = io.BytesIO()
-    pack_img.save(pack_io, 'PNG')
-    pack_io.seek(0)
-
-    # --- ZIP-Archiv erstellen ---
-    zip_io = io.BytesIO()
-    with zipfile.ZipFile(zip_io, mode='w', compression=zipfile.ZIP_DEFLATED) as zipf:
-        # Totem-Bild ins ZIP schreiben
-        zipf.writestr('assets/minecraft/textures/item/totem_of_undying.png', img_io.read())
-        # pack.mcmeta direkt aus String-Konstante hinzufügen
-        zipf.writestr('pack.mcmeta', PACK_MCMETA)
-        # pack.png aus Totem-Textur erzeugen und hinzufügen
-        zipf.writestr('pack.png', pack_io.read())
-    zip_io.seek(0)
-    return send_file(zip_io, mimetype='application/zip', as_attachment=True, download_name='Custom_Totem.zip')
+            skins_zip = zipfile.ZipFile(upload)
+        except zipfile.BadZipFile:
+            return None, ("Die hochgeladene Datei ist kein ZIP-Archiv.", 400)
+        anzahl += sum(1 for info in skins_zip.infolist() if info.filename.lower().endswith('.png'))
+    if anzahl == 0:
+        return None, ("Keine Skins oder Usernames angegeben.", 400)
+    if anzahl > MAX_BATCH_ITEMS:
+        return None, (f"Zu viele Skins (maximal {MAX_BATCH_ITEMS} pro Anfrage).", 400)
+
+    items = iter_inputs(usernames=usernames)
+    if skins_zip is not None:
+        items = itertools.chain(iter_zip_inputs(skins_zip), items)
+    return items, None
+
+@app.route('/generate_batch', methods=['POST'])
+def generate_batch():
+    # Rendert ein ZIP voller Skins und/oder eine Liste von Usernames in einem Aufruf
+    try:
+        options = options_from_request()
+    except ValueError as e:
+        return str(e), 400
+    items, fehler = batch_items_from_request()
+    if fehler:
+        return fehler
+
+    # Das ZIP wird Eintrag für Eintrag direkt in die Antwort geschrieben,
+    # sobald die einzelnen Totems fertig sind
+    entries = batch_entries(items, options, batch_workers, executor=batch_executor)
+    return Response(
+        stream_with_context(stream_zip(entries)),
+        mimetype='application/zip',
+        headers={'Content-Disposition': 'attachment; filename=Custom_Totems.zip'},
+    )
+
+@app.route('/generate_totem_pack', methods=['POST'])
+def generate_totem_pack():
+    # Ein Resourcepack mit einem Totem pro Skin/Username, auswählbar über
+    # Item-Namen (CIT) oder custom_model_data (siehe pack_builder.py)
+    try:
+        options = options_from_request()
+    except ValueError as e:
+        return str(e), 400
+    try:
+        cmd_start = int(request.form.get('cmd_start', CMD_START))
+    except ValueError:
+        return "cmd_start muss eine ganze Zahl sein.", 400
+    items, fehler = batch_items_from_request()
+    if fehler:
+        return fehler
+
+    entries = pack_entries(items, options, batch_workers, executor=batch_executor, cmd_start=cmd_start)
+    return Response(
+        stream_with_context(stream_zip(entries)),
+        mimetype='application/zip',
+        headers={'Content-Disposition': 'attachment; filename=Custom_Totems_Pack.zip'},
+    )
 
 if __name__ == '__main__':
-    app.run(debug=True) 
\ No newline at end of file
+    metrics.configure_logging()
+    app.run(debug=True)
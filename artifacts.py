@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Kurzlebige Render-Artefakte
+===========================
+
+Ein Artefakt ist ein fertig gerendertes Totem (PNG-Bytes) unter einer ID.
+Weitere Ausgaben wie pack.png oder das Java-ZIP werden erst beim ersten
+Abruf aus dem PNG abgeleitet und dann am Artefakt gespeichert. Die Seite
+rendert also einmal und holt alle Downloads danach nur noch per ID ab.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from singleflight import SingleFlight
+
+
+class ArtifactStore:
+    """
+    Speichert Artefakte mit Ablaufzeit und leitet Ausgaben bei Bedarf ab
+    """
+
+    def __init__(self, derivers, ttl=900, max_entries=2048, clock=time.monotonic):
+        """
+        Args:
+            derivers: Dictionary Ausgabe-Name -> Funktion(artefakt) -> bytes.
+                Die Funktion bekommt das Artefakt (Dictionary mit "png" und
+                allen bereits abgeleiteten Ausgaben); andere Ausgaben werden
+                per artefakt["name"] angefordert und bei Bedarf abgeleitet.
+            ttl: Lebensdauer eines Artefakts in Sekunden
+            max_entries: maximale Anzahl Artefakte (älteste fliegen zuerst raus)
+            clock: Zeitquelle (für Tests austauschbar)
+        """
+        self.derivers = derivers
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+
+    def put(self, artifact_id, png):
+        """
+        Legt ein Artefakt an (oder verlängert ein vorhandenes) und gibt die ID zurück.
+        """
+        expires = self._clock() + self.ttl
+        with self._lock:
+            item = self._entries.get(artifact_id)
+            entry = item[0] if item is not None else {"png": png}
+            self._entries[artifact_id] = (entry, expires)
+            self._entries.move_to_end(artifact_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return artifact_id
+
+    def _entry(self, artifact_id):
+        with self._lock:
+            item = self._entries.get(artifact_id)
+            if item is None:
+                return None
+            entry, expires = item
+            if self._clock() >= expires:
+                del self._entries[artifact_id]
+                return None
+            return entry
+
+    def get(self, artifact_id, kind="png"):
+        """
+        Liefert eine Ausgabe des Artefakts oder None, wenn die ID unbekannt
+        oder abgelaufen ist.
+
+        Raises:
+            KeyError: unbekannte Ausgabe
+        """
+        if kind != "png" and kind not in self.derivers:
+            raise KeyError(kind)
+        entry = self._entry(artifact_id)
+        if entry is None:
+            return None
+        return self._derive(artifact_id, entry, kind)
+
+    def _derive(self, artifact_id, entry, kind):
+        value = entry.get(kind)
+        if value is not None:
+            return value
+
+        def ableiten():
+            value = entry.get(kind)
+            if value is None:
+                value = self.derivers[kind](ArtifactView(self, artifact_id, entry))
+                entry[kind] = value
+            return value
+
+        # Gleichzeitige Abrufe derselben Ausgabe leiten nur einmal ab
+        return self._flight.do((artifact_id, kind), ableiten)
+
+
+class ArtifactView:
+    """
+    Sicht auf ein Artefakt für Ableitungsfunktionen
+    """
+
+    def __init__(self, store, artifact_id, entry):
+        self.store = store
+        self.id = artifact_id
+        self._entry = entry
+
+    def __getitem__(self, kind):
+        return self.store._derive(self.id, self._entry, kind)
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""
+ASGI-Modus für die Web-Version
+==============================
+
+Die Flask-App (app.py) blockiert bei Username-Anfragen einen Worker-Thread,
+solange Mojang und Crafatar antworten. Im ASGI-Modus laufen die
+Render-Routen (/generate_totem, /generate_java_zip, /generate_bedrock_mcpack)
+als Coroutinen:
+
+- Upstream-Abfragen über AsyncSkinResolver (httpx.AsyncClient mit Pool)
+- gleichzeitige Anfragen für denselben Username teilen sich einen Aufruf
+- Rendern und PNG-Kodierung laufen auf einem begrenzten Thread-Pool; wartende
+  Render-Aufträge stauen sich in der Event-Loop, nicht im Pool
+
+Alle anderen Routen werden unverändert an die Flask-App weitergereicht.
+Render-Cache, Artefakt-Store und Outline-Registry sind dieselben wie in app.py.
+
+Starten:
+    uvicorn asgi:application --host 0.0.0.0 --port 8000
+
+Benötigt zusätzlich httpx, asgiref und einen ASGI-Server (z.B. uvicorn).
+"""
+
+import asyncio
+import contextvars
+import functools
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.wsgi import WsgiToAsgi
+from werkzeug.formparser import parse_form_data
+
+import app as web
+import metrics
+from singleflight import AsyncSingleFlight
+from skin_decoder import SkinDecodeError
+from skin_resolver import AsyncSkinResolver, SkinResolverError
+
+# Threads für Rendern/Kodieren (TOTEM_RENDER_WORKERS, Standard: CPU-Kerne)
+RENDER_WORKERS = int(os.environ.get("TOTEM_RENDER_WORKERS", 0)) or os.cpu_count() or 1
+# Render-Aufträge pro Thread, die gleichzeitig an den Pool übergeben werden
+QUEUE_PER_WORKER = 4
+# Größter akzeptierter Formular-Body der Render-Routen
+MAX_FORM_BYTES = web.MAX_UPLOAD_BYTES
+
+
+class TotemASGI:
+    """
+    ASGI-Anwendung mit asynchronen Render-Routen und Flask als Fallback
+    """
+
+    def __init__(self, wsgi_app, resolver=None, workers=RENDER_WORKERS):
+        """
+        Args:
+            wsgi_app: Flask-App für alle übrigen Routen
+            resolver: AsyncSkinResolver (Standard: neuer Resolver mit eigenem Pool)
+            workers: Anzahl Render-Threads
+        """
+        self.fallback = WsgiToAsgi(wsgi_app)
+        self.resolver = resolver
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="render")
+        self.flight = AsyncSingleFlight()
+        self._slots = None
+        self.routes = {
+            ("POST", "/generate_totem"): self.generate_totem,
+            ("POST", "/generate_java_zip"): self.generate_java_zip,
+            ("POST", "/generate_bedrock_mcpack"): self.generate_bedrock_mcpack,
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] == "http":
+            handler = self.routes.get((scope["method"], scope["path"]))
+            if handler is not None:
+                await handler(scope, receive, send)
+                return
+        await self.fallback(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.aclose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def aclose(self):
+        """
+        Schließt den HTTP-Client und den Render-Pool.
+        """
+        if self.resolver is not None:
+            await self.resolver.aclose()
+        self.executor.shutdown(wait=False)
+
+    # --- Hilfsfunktionen ---
+
+    def _resolver(self):
+        if self.resolver is None:
+            self.resolver = AsyncSkinResolver()
+        return self.resolver
+
+    async def run_render(self, fn, *args):
+        """
+        Führt eine Render-Funktion auf dem Thread-Pool aus. Es sind höchstens
+        workers * QUEUE_PER_WORKER Aufträge gleichzeitig an den Pool übergeben.
+        Der Kontext (Request-Timer) wird in den Thread mitgenommen.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers * QUEUE_PER_WORKER)
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            kontext = contextvars.copy_context()
+            return await loop.run_in_executor(self.executor, functools.partial(kontext.run, fn, *args))
+
+    async def _read_form(self, scope, receive):
+        """
+        Liest den Body und parst ihn wie Flask (multipart oder urlencoded).
+
+        Returns:
+            (form, files) oder None, wenn der Body zu groß ist
+        """
+        body = bytearray()
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if len(body) > MAX_FORM_BYTES:
+                return None
+            if not message.get("more_body", False):
+                break
+
+        headers = dict(scope["headers"])
+        environ = {
+            "REQUEST_METHOD": scope["method"],
+            "CONTENT_TYPE": headers.get(b"content-type", b"").decode("latin-1"),
+            "CONTENT_LENGTH": str(len(body)),
+            "wsgi.input": io.BytesIO(bytes(body)),
+        }
+        _, form, files = parse_form_data(environ)
+        return form, files
+
+    async def _respond(self, send, status, body, content_type="text/html; charset=utf-8", headers=()):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", content_type.encode("latin-1")),
+                (b"content-length", str(len(body)).encode("latin-1")),
+            ] + [(name.encode("latin-1"), value.encode("latin-1")) for name, value in headers],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    # --- Render-Routen ---
+
+    async def _render_username(self, username, options, kontext):
+        with metrics.stage("upstream"):
+            skin_bytes = await self._resolver().resolve(username)
+        return await self.run_render(web.render_skin_bytes, skin_bytes, options, kontext)
+
+    async def totem_png_from_form(self, form, files, kontext=""):
+        """
+        Asynchrones Gegenstück zu app.totem_png_from_request().
+
+        Returns:
+            ((artefakt_id, png), None) bei Erfolg, sonst (None, Fehler-Antwort)
+        """
+        try:
+            options = web.options_from_form(form)
+        except ValueError as e:
+            return None, (str(e), 400)
+
+        username = form.get('username', '').strip()
+        if username:
+            try:
+                result = await self.flight.do(
+                    (username.lower(), options),
+                    lambda: self._render_username(username, options, kontext),
+                )
+            except SkinResolverError as e:
+                return None, web.resolver_error(e, kontext)
+            except SkinDecodeError as e:
+                return None, (f"Ungültiger Skin: {e}", 400)
+            return result, None
+
+        file = files.get('skin')
+        if file is None:
+            return None, ("Kein Skin angegeben.", 400)
+        skin_bytes = file.read()
+        try:
+            result = await self.run_render(web.render_skin_bytes, skin_bytes, options, kontext, "Datei-Upload")
+        except SkinDecodeError as e:
+            return None, (f"Ungültiger Skin: {e}", 400)
+        return result, None
+
+    async def _render_request(self, scope, receive, send, timer, kontext=""):
+        parsed = await self._read_form(scope, receive)
+        if parsed is None:
+            timer.status = 413
+            await self._respond(send, 413, "Anfrage zu groß.")
+            return None
+        result, fehler = await self.totem_png_from_form(*parsed, kontext)
+        if fehler:
+            timer.status = fehler[1]
+            await self._respond(send, fehler[1], fehler[0])
+            return None
+        return result
+
+    async def generate_totem(self, scope, receive, send):
+        with metrics.track_request(scope["path"]) as timer:
+            result = await self._render_request(scope, receive, send, timer)
+            if result is None:
+                return
+            artifact_id, png = result
+            await self._respond(send, 200, png, "image/png", [("X-Artifact-Id", artifact_id)])
+
+    async def generate_java_zip(self, scope, receive, send):
+        await self._archive_route(scope, receive, send, web.java_zip_for, "Custom_Totem.zip", " (ZIP)")
+
+    async def generate_bedrock_mcpack(self, scope, receive, send):
+        await self._archive_route(scope, receive, send, web.bedrock_mcpack_for, "Custom_Totem.mcpack", " (mcpack)")
+
+    async def _archive_route(self, scope, receive, send, fn, filename, kontext):
+        """
+        Rendert das Totem und liefert ein daraus abgeleitetes Pack als Download.
+
+        Args:
+            fn: Funktion (artefakt_id, png) -> Pack-Bytes, z.B. web.java_zip_for
+            filename: Dateiname des Downloads
+            kontext: Zusatz für Log-Meldungen
+        """
+        with metrics.track_request(scope["path"]) as timer:
+            result = await self._render_request(scope, receive, send, timer, kontext)
+            if result is None:
+                return
+            pack_bytes = await self.run_render(fn, *result)
+            await self._respond(
+                send, 200, pack_bytes, "application/zip",
+                [("Content-Disposition", f"attachment; filename={filename}")],
+            )
+
+
+application = TotemASGI(web.app)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    metrics.configure_logging()
+    uvicorn.run(application, host="127.0.0.1", port=int(os.environ.get("PORT", 8000)))
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Atomares Schreiben von Dateien
+==============================
+
+Gemeinsamer Helfer für den Render-Cache (Festplatten-Ebene) und die
+Ordner-Überwachung: Die Daten landen erst in einer temporären Datei im
+Zielordner und ersetzen dann per os.replace() die Zieldatei. Leser sehen
+also nie eine halb geschriebene Datei.
+
+Die temporäre Datei wird wie bei open() mit 0o666 angelegt, die umask des
+Prozesses gilt also unverändert (mkstemp() würde 0600 verwenden, und
+os.replace() übernimmt diese Rechte).
+"""
+
+import os
+import secrets
+from pathlib import Path
+
+_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+
+
+def _open_temp(directory, name):
+    # Eindeutiger Name im Zielordner (gleiches Dateisystem für os.replace)
+    while True:
+        tmp = directory / f".{name}.{secrets.token_hex(6)}.tmp"
+        try:
+            return os.open(tmp, _FLAGS, 0o666), tmp
+        except FileExistsError:
+            continue
+
+
+def atomic_write(path, data, mkdirs=True):
+    """
+    Schreibt Bytes oder Text (UTF-8) atomar nach path.
+
+    Args:
+        path: Zieldatei
+        data: bytes oder str
+        mkdirs: fehlende Ordner anlegen
+
+    Raises:
+        OSError: Schreiben fehlgeschlagen (die temporäre Datei ist dann entfernt)
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    path = Path(path)
+    if mkdirs:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = _open_temp(path.parent, path.name)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
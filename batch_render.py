@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Batch-Rendering für viele Skins
+===============================
+
+Rendert viele Skins in einem Durchlauf auf einem Prozess-Pool und schreibt
+die Totems als ZIP-Archiv. Quellen können ein Verzeichnis mit Skins, ein
+ZIP-Archiv mit Skins oder eine Liste von Usernames sein. Fehler einzelner
+Skins brechen den Batch nicht ab, sondern landen in manifest.json.
+
+Es sind immer nur wenige Aufträge gleichzeitig unterwegs (Fenster pro
+Worker), daher bleibt der Speicherbedarf auch bei großen Batches begrenzt.
+
+Verwendung:
+    python batch_render.py skins/ server_skins.zip -o totems.zip
+    python batch_render.py --username Notch --username jeb_ -o totems.zip
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+from pack_writer import stream_zip
+from png_encoder import encode_png
+from skin_decoder import MAX_SKIN_BYTES, decode_skin, read_limited
+from totem_core import AUTO_PROFILE, PROFILES, RenderOptions, render
+
+# Aufträge pro Worker, die gleichzeitig unterwegs sein dürfen
+WINDOW_PER_WORKER = 4
+
+# Resolver pro Worker-Prozess, wird beim ersten Username angelegt
+_resolver = None
+
+
+def _safe_name(name):
+    """
+    Macht aus einem Datei- oder Usernamen einen sicheren Dateinamen ohne Endung.
+    """
+    stem = Path(name).stem or "skin"
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", stem)
+
+
+def iter_inputs(paths=(), usernames=()):
+    """
+    Liefert die Aufträge eines Batches als (name, quelle, wert).
+
+    quelle ist "datei" (wert = Pfad), "bytes" (wert = PNG-Bytes aus einem ZIP)
+    oder "username" (wert = Username).
+    """
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            for datei in sorted(path.rglob("*.png")):
+                yield datei.name, "datei", str(datei)
+        elif zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path) as zf:
+                yield from iter_zip_inputs(zf)
+        else:
+            yield path.name, "datei", str(path)
+    for username in usernames:
+        username = username.strip()
+        if username:
+            yield username, "username", username
+
+
+def iter_zip_inputs(zf):
+    """
+    Liefert die PNG-Dateien eines geöffneten ZIP-Archivs als Aufträge.
+    """
+    for info in zf.infolist():
+        if info.is_dir() or not info.filename.lower().endswith(".png"):
+            continue
+        name = Path(info.filename).name
+        if info.file_size > MAX_SKIN_BYTES:
+            yield name, "fehler", f"Datei zu groß ({info.file_size} Bytes)"
+            continue
+        yield name, "bytes", zf.read(info)
+
+
+def render_item(name, quelle, wert, options):
+    """
+    Rendert einen einzelnen Auftrag (läuft im Worker-Prozess).
+
+    Returns:
+        (name, png_bytes, fehler) - genau eins von png_bytes und fehler ist None
+    """
+    global _resolver
+    try:
+        if quelle == "fehler":
+            return name, None, wert
+        if quelle == "datei":
+            with open(wert, "rb") as f:
+                daten = read_limited(f)
+        elif quelle == "bytes":
+            daten = wert
+        elif quelle == "username":
+            if _resolver is None:
+                from skin_resolver import SkinResolver
+                _resolver = SkinResolver()
+            daten = _resolver.resolve(wert)
+        else:
+            return name, None, f"Unbekannte Quelle: {quelle}"
+        totem_img = render(decode_skin(daten), options)
+        return name, encode_png(totem_img).data, None
+    except Exception as e:
+        return name, None, f"{type(e).__name__}: {e}"
+
+
+def iter_results(items, options=None, workers=None, executor=None):
+    """
+    Rendert alle Aufträge und liefert die Ergebnisse in Fertigstellungsreihenfolge.
+
+    Args:
+        items: Iterable von (name, quelle, wert), z.B. aus iter_inputs()
+        options: RenderOptions für alle Skins
+        workers: Anzahl Worker-Prozesse (Standard: Anzahl CPU-Kerne)
+        executor: vorhandener Executor statt eines eigenen Prozess-Pools
+
+    Yields:
+        (index, name, png_bytes, fehler) - index ist die Position in items
+    """
+    if options is None:
+        options = RenderOptions()
+    workers = workers or os.cpu_count() or 1
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+
+    pending = {}
+    try:
+        for index, (name, quelle, wert) in enumerate(items):
+            future = executor.submit(render_item, name, quelle, wert, options)
+            pending[future] = index
+            if len(pending) >= workers * WINDOW_PER_WORKER:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield (pending.pop(future),) + future.result()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield (pending.pop(future),) + future.result()
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+
+def batch_entries(items, options=None, workers=None, executor=None, manifest=None):
+    """
+    Liefert die ZIP-Einträge eines Batches für pack_writer.stream_zip():
+    ein PNG pro erfolgreichem Skin und zum Schluss manifest.json.
+
+    Args:
+        manifest: optionale Liste, die mit dem Manifest gefüllt wird
+            (in Eingabereihenfolge)
+    """
+    if manifest is None:
+        manifest = []
+    eintraege = {}
+    used_names = set()
+    for index, name, png, fehler in iter_results(items, options, workers, executor):
+        if fehler is not None:
+            eintraege[index] = {"name": name, "status": "fehler", "error": fehler}
+            continue
+        datei = _safe_name(name) + ".png"
+        zaehler = 1
+        while datei in used_names:
+            zaehler += 1
+            datei = f"{_safe_name(name)}_{zaehler}.png"
+        used_names.add(datei)
+        eintraege[index] = {"name": name, "status": "ok", "file": datei}
+        yield datei, png
+    manifest.extend(eintraege[i] for i in sorted(eintraege))
+    yield "manifest.json", json.dumps(manifest, indent=2, ensure_ascii=False)
+
+
+def run_batch(items, out_path, options=None, workers=None, executor=None):
+    """
+    Rendert alle Aufträge und schreibt die Totems plus manifest.json als ZIP-Datei.
+
+    Returns:
+        Das Manifest (Liste von Dictionaries, in Eingabereihenfolge)
+    """
+    manifest = []
+    with open(out_path, "wb") as f:
+        for chunk in stream_zip(batch_entries(items, options, workers, executor, manifest)):
+            f.write(chunk)
+    return manifest
+
+
+def main(argv=None):
+    """
+    Kommandozeilen-Einstiegspunkt
+    """
+    parser = argparse.ArgumentParser(description="Rendert viele Minecraft-Skins zu Totems.")
+    parser.add_argument("inputs", nargs="*", help="Skin-Dateien, Verzeichnisse oder ZIP-Archive")
+    parser.add_argument("--username", action="append", default=[], help="Minecraft-Username (mehrfach möglich)")
+    parser.add_argument("--usernames-file", help="Datei mit einem Username pro Zeile")
+    parser.add_argument("-o", "--output", default="totems.zip", help="Ziel-ZIP (Standard: totems.zip)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Anzahl Worker-Prozesse")
+    parser.add_argument("--no-overlay", action="store_true", help="Kopf-Overlay weglassen")
+    parser.add_argument("--second-layer", action="store_true", help="Jacke und Ärmel (zweite Ebene) anwenden")
+    parser.add_argument("--hd", action="store_true", help="HD-Skins als HD-Totem rendern")
+    parser.add_argument("--profile", default=AUTO_PROFILE, choices=[AUTO_PROFILE] + PROFILES.names(),
+                        help=f"Mapping-Profil (Standard: {AUTO_PROFILE} = Arm-Modell erkennen)")
+    args = parser.parse_args(argv)
+
+    usernames = list(args.username)
+    if args.usernames_file:
+        usernames += Path(args.usernames_file).read_text(encoding="utf-8").splitlines()
+    if not args.inputs and not usernames:
+        parser.error("Keine Skins oder Usernames angegeben")
+
+    options = RenderOptions(
+        overlay=not args.no_overlay, hd=args.hd, profile=args.profile, second_layer=args.second_layer
+    )
+    manifest = run_batch(iter_inputs(args.inputs, usernames), args.output, options, args.workers)
+
+    fehler = [e for e in manifest if e["status"] != "ok"]
+    print(f"{len(manifest) - len(fehler)} von {len(manifest)} Totems gerendert -> {args.output}")
+    for eintrag in fehler:
+        print(f"  Fehler bei {eintrag['name']}: {eintrag['error']}", file=sys.stderr)
+    return 1 if fehler else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark für die Render-Pipeline
+=================================
+
+Misst die einzelnen Stufen der Pipeline auf einem synthetischen Skin-Korpus:
+
+- decode: PNG-Bytes -> PIL.Image (Image.open + load)
+- render: Skin -> Totem (Render-Engine)
+- encode: Totem -> PNG-Bytes (encode_png)
+- zip:    pack.png + Java-Resourcepack als ZIP
+
+Der Korpus wird aus einem festen Seed erzeugt und enthält alte 64x32-Skins,
+64x64-Skins und HD-Skins, jeweils mit und ohne Transparenz. Pro Stufe werden
+Durchsatz sowie p50/p99-Latenz ausgegeben.
+
+Läuft ohne Netzwerk und ohne Display (kein tkinter, kein Flask).
+
+Verwendung:
+    python benchmark.py
+    python benchmark.py --compare pillow                 # gegen die Pillow-Referenz
+    python benchmark.py --compare mein_modul:render      # zwei Engines vergleichen
+    python benchmark.py --save basis.json                  # Ergebnis speichern
+    python benchmark.py --baseline basis.json --max-regression 0.15
+"""
+
+import argparse
+import importlib
+import io
+import json
+import platform
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+from pack_writer import build_zip
+from png_encoder import encode_png
+from profiles import HEAD_PART
+from totem_core import (
+    LAYERS, PROFILES, SKIN_SIZE, TOTEM_SIZE, RenderOptions, pixel_scale, render, resolve_profile, skin_to_array,
+)
+
+STAGES = ("decode", "render", "encode", "zip")
+
+# Skin-Größen im Korpus (Breite, Höhe)
+CORPUS_SIZES = [(64, 32), (64, 64), (128, 128), (256, 256), (512, 512)]
+
+
+def _pillow_teil(skin, rect, part, faktor):
+    # Ein Body-Part wie im ursprünglichen Algorithmus: crop, ggf. resize, crop-Liste
+    x, y, b, h = (wert * faktor for wert in rect)
+    teil = skin.crop((x, y, x + b, y + h))
+    if part["resize"] == "nearest":
+        teil = teil.resize((part["totem"][2] * faktor, part["totem"][3] * faktor), Image.NEAREST)
+    teil = teil.convert("RGBA")
+    for crop in part["crop"]:
+        x1, y1, x2, y2 = crop if len(crop) == 4 else crop * 2
+        box = (max(x1, 0) * faktor, max(y1, 0) * faktor,
+               min((x2 + 1) * faktor, teil.width), min((y2 + 1) * faktor, teil.height))
+        if box[0] < box[2] and box[1] < box[3]:
+            teil.paste((0, 0, 0, 0), box)
+    return teil
+
+
+def render_pillow(skin, options):
+    """
+    Referenz-Engine: der ursprüngliche Pillow-Algorithmus (crop, resize,
+    paste, alpha_composite) über dasselbe Profil. Aufbereitung alter und
+    HD-Skins sowie die Wahl des Arm-Modells kommen aus totem_core, damit
+    beide Engines dasselbe Totem beschreiben.
+    """
+    skin_pixel = skin_to_array(skin, options.hd)
+    faktor = pixel_scale(skin_pixel)
+    seite = SKIN_SIZE * faktor
+    skin = Image.fromarray(skin_pixel[:-1].reshape(seite, seite, 4))
+    profil = PROFILES.get(resolve_profile(skin_pixel, options.profile))
+
+    totem = Image.new("RGBA", (TOTEM_SIZE * faktor, TOTEM_SIZE * faktor), (0, 0, 0, 0))
+    for name, part in profil.parts.items():
+        teil = _pillow_teil(skin, part["skin"], part, faktor)
+        zweite_ebene = options.overlay if name == HEAD_PART else options.second_layer
+        if zweite_ebene and part["overlay"] is not None:
+            oben = _pillow_teil(skin, part["overlay"] + part["skin"][2:], part, faktor)
+            teil = Image.alpha_composite(teil, oben)
+        totem.paste(teil, (part["totem"][0] * faktor, part["totem"][1] * faktor), teil)
+    for quelle, ziel in profil.feinschliff:
+        x, y, b, h = (wert * faktor for wert in quelle)
+        totem.paste(totem.crop((x, y, x + b, y + h)), (ziel[0] * faktor, ziel[1] * faktor))
+    if options.outline:
+        outline = Image.fromarray(LAYERS.get(options.outline).reshape(TOTEM_SIZE, TOTEM_SIZE, 4))
+        totem = Image.alpha_composite(totem, outline.resize(totem.size, Image.NEAREST))
+    return totem
+
+
+# Eingebaute Engines, sonst "modul:funktion"
+ENGINES = {
+    "numpy": render,
+    "pillow": render_pillow,
+}
+
+# Minimales pack.mcmeta für die zip-Stufe
+BENCH_MCMETA = '{"pack": {"description": "benchmark", "pack_format": 15}}'
+
+
+def make_skin(size, transparent, rng):
+    """
+    Erzeugt einen synthetischen Skin: Blöcke aus wenigen Farben im 64er-Raster,
+    bei HD-Größen per Nearest-Neighbor vergrößert (wie echte HD-Skins).
+
+    Mit transparent=True ist der Overlay-Bereich teilweise durchsichtig bzw.
+    halbtransparent, sonst ist der ganze Skin deckend.
+    """
+    breite, hoehe = size
+    faktor = breite // 64
+    palette = rng.integers(0, 256, (12, 4), dtype=np.uint8)
+    palette[:, 3] = 255
+    raster = palette[rng.integers(0, len(palette), (hoehe // faktor, 64))]
+    if transparent:
+        # Overlay-Ebene (rechte Hälfte oben): Löcher und halbtransparente Pixel
+        overlay = raster[:16, 32:]
+        overlay[..., 3] = rng.choice(np.array([0, 0, 96, 255], dtype=np.uint8), overlay.shape[:2])
+        if hoehe // faktor == 64:
+            raster[32:48, :, 3] = rng.choice(np.array([0, 160, 255], dtype=np.uint8), (16, 64))
+    pixel = raster.repeat(faktor, axis=0).repeat(faktor, axis=1)
+    return Image.fromarray(pixel)
+
+
+def make_corpus(seed=0, per_variant=4, sizes=CORPUS_SIZES):
+    """
+    Erzeugt den Korpus als Liste von (variante, png_bytes).
+    Gleicher Seed ergibt byte-gleiche Skins.
+    """
+    rng = np.random.default_rng(seed)
+    korpus = []
+    for size in sizes:
+        for transparent in (False, True):
+            variante = f"{size[0]}x{size[1]}" + (" alpha" if transparent else "")
+            for _ in range(per_variant):
+                img_io = io.BytesIO()
+                make_skin(size, transparent, rng).save(img_io, "PNG")
+                korpus.append((variante, img_io.getvalue()))
+    return korpus
+
+
+def load_engine(spec):
+    """
+    Lädt eine Render-Engine: Name aus ENGINES oder "modul:funktion".
+    Die Funktion bekommt (skin, options) und liefert ein PIL.Image oder RGBA-Array.
+    """
+    if spec in ENGINES:
+        return ENGINES[spec]
+    modul, _, funktion = spec.partition(":")
+    if not funktion:
+        raise ValueError(f"Engine '{spec}' ist weder bekannt noch im Format modul:funktion")
+    return getattr(importlib.import_module(modul), funktion)
+
+
+def _java_pack(png):
+    totem = Image.open(io.BytesIO(png))
+    # pack.png wie in app.make_pack_png: etwa 256x256, auch bei HD-Totems
+    pack_png = encode_png(totem, scale=max(1, 256 // totem.width), record=False, measure=False).data
+    return build_zip([
+        ("assets/minecraft/textures/item/totem_of_undying.png", png),
+        ("pack.mcmeta", BENCH_MCMETA),
+        ("pack.png", pack_png),
+    ])
+
+
+def run_pipeline(korpus, engine, options=None, repeat=5, warmup=1):
+    """
+    Lässt den Korpus repeat-mal durch alle Stufen laufen.
+
+    Returns:
+        Dictionary Stufe -> Dictionary Variante -> Liste von Laufzeiten (Sekunden)
+    """
+    if options is None:
+        options = RenderOptions()
+    zeiten = {stufe: {} for stufe in STAGES}
+    uhr = time.perf_counter
+
+    for durchlauf in range(warmup + repeat):
+        messen = durchlauf >= warmup
+        for variante, daten in korpus:
+            t0 = uhr()
+            skin = Image.open(io.BytesIO(daten))
+            skin.load()
+            t1 = uhr()
+            totem = engine(skin, options)
+            t2 = uhr()
+            png = encode_png(totem, record=False, measure=False).data
+            t3 = uhr()
+            _java_pack(png)
+            t4 = uhr()
+            if messen:
+                for stufe, dauer in zip(STAGES, (t1 - t0, t2 - t1, t3 - t2, t4 - t3)):
+                    zeiten[stufe].setdefault(variante, []).append(dauer)
+    return zeiten
+
+
+def summarize(werte):
+    """
+    Kennzahlen einer Liste von Laufzeiten in Sekunden.
+    """
+    werte = np.asarray(werte)
+    return {
+        "n": int(len(werte)),
+        "ops_per_s": float(len(werte) / werte.sum()) if werte.sum() > 0 else float("inf"),
+        "p50_ms": float(np.percentile(werte, 50) * 1000),
+        "p99_ms": float(np.percentile(werte, 99) * 1000),
+    }
+
+
+def summarize_run(zeiten):
+    """
+    Fasst run_pipeline() zusammen: pro Stufe gesamt und pro Variante.
+    """
+    ergebnis = {}
+    for stufe, varianten in zeiten.items():
+        alle = [wert for liste in varianten.values() for wert in liste]
+        ergebnis[stufe] = {
+            "gesamt": summarize(alle),
+            "varianten": {variante: summarize(liste) for variante, liste in varianten.items()},
+        }
+    return ergebnis
+
+
+def find_regressions(ergebnis, basis, max_regression, pro_variante=False):
+    """
+    Vergleicht p50-Latenzen mit einem Basis-Ergebnis.
+
+    Returns:
+        Liste von (stufe, variante, p50_basis, p50_neu) mit mehr als
+        max_regression (z.B. 0.1 = 10 %) Verschlechterung
+    """
+    regressionen = []
+    for stufe in STAGES:
+        if stufe not in ergebnis or stufe not in basis:
+            continue
+        paare = [("gesamt", ergebnis[stufe]["gesamt"], basis[stufe]["gesamt"])]
+        if pro_variante:
+            for variante, werte in ergebnis[stufe]["varianten"].items():
+                if variante in basis[stufe]["varianten"]:
+                    paare.append((variante, werte, basis[stufe]["varianten"][variante]))
+        for variante, neu, alt in paare:
+            if neu["p50_ms"] > alt["p50_ms"] * (1 + max_regression):
+                regressionen.append((stufe, variante, alt["p50_ms"], neu["p50_ms"]))
+    return regressionen
+
+
+def print_report(titel, ergebnis, pro_variante=False, datei=sys.stdout):
+    print(f"\n{titel}", file=datei)
+    print(f"{'Stufe':<8} {'Variante':<16} {'n':>6} {'ops/s':>10} {'p50 ms':>9} {'p99 ms':>9}", file=datei)
+    for stufe in STAGES:
+        zeilen = [("gesamt", ergebnis[stufe]["gesamt"])]
+        if pro_variante:
+            zeilen += sorted(ergebnis[stufe]["varianten"].items())
+        for variante, werte in zeilen:
+            print(
+                f"{stufe:<8} {variante:<16} {werte['n']:>6} {werte['ops_per_s']:>10.0f} "
+                f"{werte['p50_ms']:>9.3f} {werte['p99_ms']:>9.3f}",
+                file=datei,
+            )
+
+
+def outputs_match(korpus, engine_a, engine_b, options):
+    """
+    Prüft, ob zwei Engines auf dem Korpus pixelgleiche Totems liefern.
+
+    Returns:
+        Liste der Varianten mit Abweichungen
+    """
+    abweichend = []
+    for variante, daten in korpus:
+        a = np.asarray(engine_a(Image.open(io.BytesIO(daten)), options))
+        b = np.asarray(engine_b(Image.open(io.BytesIO(daten)), options))
+        if a.shape != b.shape or not np.array_equal(a, b):
+            if variante not in abweichend:
+                abweichend.append(variante)
+    return abweichend
+
+
+def main(argv=None):
+    """
+    Kommandozeilen-Einstiegspunkt. Rückgabewert 1 bei Regression oder
+    wenn die Engines bei --compare unterschiedliche Totems liefern.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark für Render, Kodierung und Resourcepack.")
+    parser.add_argument("--engine", default="numpy", help="Engine (Standard: numpy = totem_core.render)")
+    parser.add_argument("--compare", help="zweite Engine zum Vergleich (pillow = Referenz oder modul:funktion)")
+    parser.add_argument("-n", "--repeat", type=int, default=5, help="Durchläufe über den Korpus")
+    parser.add_argument("--warmup", type=int, default=1, help="Aufwärm-Durchläufe ohne Messung")
+    parser.add_argument("--per-variant", type=int, default=4, help="Skins pro Größe und Transparenz")
+    parser.add_argument("--seed", type=int, default=0, help="Seed für den Korpus")
+    parser.add_argument("--by-variant", action="store_true", help="Werte pro Skin-Variante ausgeben")
+    parser.add_argument("--no-overlay", action="store_true", help="Kopf-Overlay weglassen")
+    parser.add_argument("--save", help="Ergebnis als JSON speichern")
+    parser.add_argument("--baseline", help="gespeichertes Ergebnis, gegen das verglichen wird")
+    parser.add_argument("--max-regression", type=float, default=0.10,
+                        help="erlaubte Verschlechterung der p50-Latenz (Standard: 0.10 = 10 %%)")
+    args = parser.parse_args(argv)
+
+    options = RenderOptions(overlay=not args.no_overlay)
+    korpus = make_corpus(args.seed, args.per_variant)
+    engine = load_engine(args.engine)
+    print(f"Korpus: {len(korpus)} Skins, {args.repeat} Durchläufe, Python {platform.python_version()}")
+
+    ergebnis = summarize_run(run_pipeline(korpus, engine, options, args.repeat, args.warmup))
+    print_report(f"Engine {args.engine}", ergebnis, args.by_variant)
+
+    regressionen = []
+    abweichend = []
+    if args.compare:
+        kandidat = load_engine(args.compare)
+        vergleich = summarize_run(run_pipeline(korpus, kandidat, options, args.repeat, args.warmup))
+        print_report(f"Engine {args.compare}", vergleich, args.by_variant)
+        abweichend = outputs_match(korpus, engine, kandidat, options)
+        alt, neu = ergebnis["render"]["gesamt"]["p50_ms"], vergleich["render"]["gesamt"]["p50_ms"]
+        print(f"\nrender p50: {args.engine} {alt:.3f} ms, {args.compare} {neu:.3f} ms ({alt / neu:.2f}x)")
+        regressionen += find_regressions(vergleich, ergebnis, args.max_regression, args.by_variant)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            basis = json.load(f)["ergebnis"]
+        regressionen += find_regressions(ergebnis, basis, args.max_regression, args.by_variant)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({
+                "engine": args.engine,
+                "seed": args.seed,
+                "repeat": args.repeat,
+                "python": platform.python_version(),
+                "ergebnis": ergebnis,
+            }, f, indent=2)
+
+    for stufe, variante, alt, neu in regressionen:
+        print(f"REGRESSION {stufe} ({variante}): p50 {alt:.3f} ms -> {neu:.3f} ms", file=sys.stderr)
+    for variante in abweichend:
+        print(f"ABWEICHUNG {args.engine} / {args.compare}: Ausgabe unterschiedlich bei {variante}", file=sys.stderr)
+    return 1 if regressionen or abweichend else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+Layer-Registry für Outlines
+===========================
+
+Outline-Ebenen werden einmal geladen, geprüft und als fertiges RGBA-Array
+(32*32 x 4) im Speicher gehalten. Beim Rendern wird nur noch das Array
+verwendet; die Datei wird höchstens alle `check_interval` Sekunden per
+stat() geprüft und bei geänderter mtime neu geladen.
+
+Neben outline.png ("default") werden alle PNGs im Ordner outlines/ als
+weitere Stile registriert, z.B. outlines/gold.png -> Stil "gold".
+"""
+
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Größe der Totem-Textur in Pixeln
+TOTEM_SIZE = 32
+# Größere Dateien werden nicht als Outline akzeptiert
+MAX_LAYER_SIZE = 1024
+
+BASE_DIR = Path(__file__).resolve().parent
+
+
+class UnknownLayer(KeyError):
+    """Es gibt keinen Layer mit diesem Namen"""
+
+
+def load_layer(path):
+    """
+    Lädt eine Layer-Datei und bringt sie auf 32x32 RGBA.
+
+    Returns:
+        Schreibgeschütztes uint8-Array (32*32 x 4)
+
+    Raises:
+        ValueError: die Datei ist kein gültiger Layer
+        OSError: die Datei kann nicht gelesen werden
+    """
+    with Image.open(path) as img:
+        if img.width > MAX_LAYER_SIZE or img.height > MAX_LAYER_SIZE:
+            raise ValueError(f"{path}: Layer ist zu groß ({img.width}x{img.height})")
+        layer_img = img.convert("RGBA")
+    if layer_img.size != (TOTEM_SIZE, TOTEM_SIZE):
+        layer_img = layer_img.resize((TOTEM_SIZE, TOTEM_SIZE), Image.NEAREST)
+    pixel = np.asarray(layer_img, dtype=np.uint8).reshape(-1, 4).copy()
+    pixel.flags.writeable = False
+    return pixel
+
+
+class _Layer:
+    """Ein registrierter Layer mit Ladezustand"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.pixel = None
+        self.mtime_ns = None
+        self.error = None
+        self.checked_at = None
+
+
+class LayerRegistry:
+    """
+    Registry benannter Layer mit Hot-Reload bei Dateiänderung
+    """
+
+    def __init__(self, check_interval=1.0, clock=time.monotonic):
+        """
+        Args:
+            check_interval: Mindestabstand zwischen zwei stat()-Aufrufen pro Layer (Sekunden)
+            clock: Zeitquelle (für Tests austauschbar)
+        """
+        self.check_interval = check_interval
+        self._clock = clock
+        self._layers = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, path):
+        """
+        Registriert einen Layer und lädt ihn sofort.
+        Eine fehlende Datei ist erlaubt, der Layer ist dann leer.
+        """
+        layer = _Layer(path)
+        self._refresh(layer)
+        with self._lock:
+            self._layers[name] = layer
+        return layer.error is None
+
+    def scan(self, directory):
+        """
+        Registriert alle PNGs eines Ordners unter ihrem Dateinamen ohne Endung.
+        """
+        directory = Path(directory)
+        if not directory.is_dir():
+            return
+        for path in sorted(directory.glob("*.png")):
+            self.register(path.stem, path)
+
+    def names(self):
+        """
+        Namen aller registrierten Layer.
+        """
+        with self._lock:
+            return sorted(self._layers)
+
+    def _layer(self, name):
+        with self._lock:
+            layer = self._layers.get(name)
+        if layer is None:
+            raise UnknownLayer(name)
+        now = self._clock()
+        if layer.checked_at is None or now - layer.checked_at >= self.check_interval:
+            self._refresh(layer)
+        return layer
+
+    def _refresh(self, layer):
+        """
+        Lädt den Layer neu, falls sich die mtime geändert hat.
+        Schlägt das Laden fehl, bleibt die zuletzt gültige Version aktiv.
+        """
+        with self._lock:
+            layer.checked_at = self._clock()
+            try:
+                mtime_ns = layer.path.stat().st_mtime_ns
+            except OSError:
+                # Datei entfernt: Layer ist leer (Outline ist optional)
+                layer.pixel = None
+                layer.mtime_ns = None
+                return
+            if mtime_ns == layer.mtime_ns:
+                return
+            try:
+                layer.pixel = load_layer(layer.path)
+                layer.error = None
+            except (OSError, ValueError) as e:
+                layer.error = str(e)
+            layer.mtime_ns = mtime_ns
+
+    def get(self, name):
+        """
+        Liefert das RGBA-Array eines Layers oder None, falls die Datei fehlt.
+
+        Raises:
+            UnknownLayer: kein Layer mit diesem Namen registriert
+        """
+        return self._layer(name).pixel
+
+    def version(self, name):
+        """
+        Versionskennung des Layers (ändert sich bei jedem Neuladen), z.B. für Cache-Schlüssel.
+        """
+        return self._layer(name).mtime_ns
+
+
+def default_registry():
+    """
+    Registry mit outline.png als "default" und allen Stilen aus outlines/.
+    """
+    registry = LayerRegistry()
+    registry.register("default", BASE_DIR / "outline.png")
+    registry.scan(BASE_DIR / "outlines")
+    return registry
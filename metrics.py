@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+"""
+Metriken und Request-Timing
+===========================
+
+Kleine, abhängigkeitsfreie Metrik-Registry mit Ausgabe im
+Prometheus-Textformat (für GET /metrics):
+
+- Counter und Gauges mit Labels
+- Histogramme für Latenzen (Request gesamt und pro Stufe)
+- Collector-Funktionen für Werte, die beim Abruf berechnet werden
+  (z.B. Trefferquote des Render-Caches)
+
+Pro Request sammelt ein RequestTimer die Dauer der einzelnen Stufen
+(upstream, decode, render, encode, zip). Der aktuelle Timer liegt in einer
+ContextVar, daher funktioniert stage() sowohl in Flask-Threads als auch in
+Coroutinen des ASGI-Modus. Ist der Logger "totem.requests" auf INFO
+aktiviert, wird pro Request eine JSON-Zeile mit allen Stufen geschrieben.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Grenzen der Latenz-Histogramme in Sekunden
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+request_log = logging.getLogger("totem.requests")
+
+
+def _format_labels(labelnames, werte, extra=()):
+    paare = list(zip(labelnames, werte)) + list(extra)
+    if not paare:
+        return ""
+    teile = []
+    for name, wert in paare:
+        wert = str(wert).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        teile.append(f'{name}="{wert}"')
+    return "{" + ",".join(teile) + "}"
+
+
+def _format_value(wert):
+    if wert == float("inf"):
+        return "+Inf"
+    if float(wert).is_integer():
+        return str(int(wert))
+    return repr(float(wert))
+
+
+class _Metric:
+    """Gemeinsame Basis: Name, Hilfetext, Labels und Werte pro Label-Kombination"""
+
+    typ = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: Labels {sorted(labels)} statt {list(self.labelnames)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _lines(self):
+        with self._lock:
+            werte = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(wert)}" for key, wert in werte]
+
+    def expose(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.typ}"] + self._lines()
+
+
+class Counter(_Metric):
+    """Monoton steigender Zähler"""
+
+    typ = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """Momentanwert, z.B. laufende Requests"""
+
+    typ = "gauge"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, wert, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = wert
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    """Verteilung von Messwerten mit festen Bucket-Grenzen"""
+
+    typ = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, wert, **labels):
+        key = self._key(labels)
+        with self._lock:
+            eintrag = self._values.get(key)
+            if eintrag is None:
+                eintrag = self._values[key] = [[0] * len(self.buckets), 0, 0.0]
+            for i, grenze in enumerate(self.buckets):
+                if wert <= grenze:
+                    eintrag[0][i] += 1
+            eintrag[1] += 1
+            eintrag[2] += wert
+
+    def _lines(self):
+        with self._lock:
+            werte = sorted((key, (list(b), n, s)) for key, (b, n, s) in self._values.items())
+        zeilen = []
+        for key, (buckets, anzahl, summe) in werte:
+            for grenze, kumuliert in zip(self.buckets, buckets):
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(grenze))])
+                zeilen.append(f"{self.name}_bucket{labels} {kumuliert}")
+            labels = _format_labels(self.labelnames, key, [("le", "+Inf")])
+            zeilen.append(f"{self.name}_bucket{labels} {anzahl}")
+            labels = _format_labels(self.labelnames, key)
+            zeilen.append(f"{self.name}_sum{labels} {_format_value(summe)}")
+            zeilen.append(f"{self.name}_count{labels} {anzahl}")
+        return zeilen
+
+
+class Registry:
+    """
+    Sammlung aller Metriken und Collector-Funktionen
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _add(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._add(Counter(name, help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self._add(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(name, help_text, labelnames, buckets))
+
+    def collector(self, fn):
+        """
+        Registriert eine Funktion, die beim Abruf Werte liefert:
+        Liste von (name, typ, hilfetext, wert). Auch als Dekorator nutzbar.
+        """
+        with self._lock:
+            self._collectors.append(fn)
+        return fn
+
+    def expose(self):
+        """
+        Alle Metriken im Prometheus-Textformat.
+        """
+        with self._lock:
+            metrics = list(self._metrics)
+            collectors = list(self._collectors)
+        zeilen = []
+        for metric in metrics:
+            zeilen += metric.expose()
+        for collector in collectors:
+            for name, typ, help_text, wert in collector():
+                zeilen += [f"# HELP {name} {help_text}", f"# TYPE {name} {typ}", f"{name} {_format_value(wert)}"]
+        return "\n".join(zeilen) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUESTS = REGISTRY.counter("totem_requests_total", "Abgeschlossene Requests", ("route", "status"))
+REQUEST_SECONDS = REGISTRY.histogram("totem_request_seconds", "Dauer eines Requests", ("route",))
+IN_FLIGHT = REGISTRY.gauge("totem_requests_in_flight", "Laufende Requests", ("route",))
+STAGE_SECONDS = REGISTRY.histogram(
+    "totem_stage_seconds", "Dauer einer Stufe (upstream, decode, render, encode, zip)", ("stage",)
+)
+UPSTREAM_ERRORS = REGISTRY.counter(
+    "totem_upstream_errors_total", "Fehler bei der Skin-Abfrage (Mojang/Crafatar)", ("kind",)
+)
+
+# Timer des laufenden Requests (None außerhalb eines Requests)
+_current = contextvars.ContextVar("totem_request_timer", default=None)
+
+
+class RequestTimer:
+    """
+    Sammelt die Stufen-Zeiten eines Requests
+    """
+
+    def __init__(self, route):
+        self.route = route
+        self.status = None
+        self.stages = {}
+        self.start = time.perf_counter()
+
+    def add(self, stage, dauer):
+        self.stages[stage] = self.stages.get(stage, 0.0) + dauer
+
+
+@contextmanager
+def stage(name):
+    """
+    Misst eine Stufe und ordnet sie dem laufenden Request zu (falls vorhanden).
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        dauer = time.perf_counter() - start
+        STAGE_SECONDS.observe(dauer, stage=name)
+        timer = _current.get()
+        if timer is not None:
+            timer.add(name, dauer)
+
+
+def start_request(route):
+    """
+    Beginnt die Messung eines Requests. Rückgabe für finish_request().
+    """
+    timer = RequestTimer(route)
+    IN_FLIGHT.inc(route=route)
+    return timer, _current.set(timer)
+
+
+def finish_request(handle, status):
+    """
+    Schließt die Messung ab: Zähler, Histogramm und optional eine Log-Zeile.
+    """
+    timer, token = handle
+    _current.reset(token)
+    dauer = time.perf_counter() - timer.start
+    IN_FLIGHT.dec(route=timer.route)
+    REQUESTS.inc(route=timer.route, status=status)
+    REQUEST_SECONDS.observe(dauer, route=timer.route)
+    if request_log.isEnabledFor(logging.INFO):
+        request_log.info("%s", json.dumps({
+            "route": timer.route,
+            "status": status,
+            "ms": round(dauer * 1000, 3),
+            "stages_ms": {name: round(wert * 1000, 3) for name, wert in timer.stages.items()},
+        }))
+
+
+@contextmanager
+def track_request(route):
+    """
+    Misst einen Request als Kontextmanager. Der Status kann über timer.status
+    gesetzt werden (Standard: 200, bei Exception 500).
+    """
+    handle = start_request(route)
+    timer = handle[0]
+    try:
+        yield timer
+    except BaseException:
+        timer.status = 500
+        raise
+    finally:
+        finish_request(handle, timer.status or 200)
+
+
+def configure_logging():
+    """
+    Richtet das Logging nach Umgebungsvariablen ein:
+    TOTEM_LOG_LEVEL (Standard: WARNING) und TOTEM_REQUEST_LOG=1 für eine
+    JSON-Zeile pro Request.
+    """
+    logging.basicConfig(
+        level=os.environ.get("TOTEM_LOG_LEVEL", "WARNING").upper(),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    if os.environ.get("TOTEM_REQUEST_LOG") == "1":
+        request_log.setLevel(logging.INFO)
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Resourcepack mit vielen Totems
+==============================
+
+Baut ein Java-Resourcepack mit einem eigenen Totem pro Skin bzw. Spieler.
+Jedes Totem ist auf zwei Wegen auswählbar:
+
+- über den Item-Namen (CIT, OptiFine bzw. CIT Resewn): eine .properties-Datei
+  pro Totem unter optifine/cit/totems/
+- über custom_model_data (Vanilla): Overrides im Modell
+  models/item/totem_of_undying.json, z.B.
+  /give @p totem_of_undying{CustomModelData:1000}
+
+Die Skins werden wie in batch_render.py parallel auf einem Prozess-Pool
+gerendert. Gleiche Eingaben (gleicher Username, gleiche Datei, gleiche
+Bytes) werden nur einmal gerendert, gleiche Texturen nur einmal ins Pack
+geschrieben; mehrere Namen teilen sich dann Textur und Modell. Die Eingaben
+werden dabei nach und nach gelesen, vom einzelnen Skin bleibt nur sein
+Schlüssel im Speicher, nicht seine Bytes. Das Archiv
+wird in einem Durchlauf gestreamt: Texturen und Modelle, sobald sie fertig
+sind, Overrides, CIT-Dateien und manifest.json am Ende.
+
+custom_model_data ist CMD_START + Position in der Eingabeliste, bleibt also
+stabil, auch wenn einzelne Skins fehlschlagen.
+
+Verwendung:
+    python pack_builder.py skins/ --username Notch --username jeb_ -o Totems.zip
+    python pack_builder.py server_skins.zip --cmd-start 5000 -o Totems.zip
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import sys
+from pathlib import Path
+
+from PIL import Image
+
+from batch_render import iter_inputs, iter_results
+from pack_writer import stream_zip
+from png_encoder import encode_png
+from totem_core import AUTO_PROFILE, PROFILES, RenderOptions
+
+# Erste custom_model_data-Nummer
+CMD_START = 1000
+# Pfade im Pack
+TEXTURE_DIR = "assets/minecraft/textures/item/totems"
+MODEL_DIR = "assets/minecraft/models/item/totems"
+CIT_DIR = "assets/minecraft/optifine/cit/totems"
+TOTEM_MODEL = "assets/minecraft/models/item/totem_of_undying.json"
+# pack.mcmeta des Multi-Totem-Packs
+PACK_BUILDER_MCMETA = """{
+    "pack": {
+        "description": "Custom Totems",
+        "pack_format": 15,
+        "supported_formats": {
+          "min_inclusive": 15,
+          "max_inclusive": 99
+        }
+    }
+}"""
+
+
+def texture_id(png):
+    """
+    Name einer Textur im Pack, abgeleitet aus ihrem Inhalt.
+    """
+    return hashlib.blake2b(png, digest_size=8).hexdigest()
+
+
+def display_name(name, quelle):
+    """
+    Item-Name für CIT: Username bzw. Dateiname ohne Endung.
+    """
+    return name if quelle == "username" else Path(name).stem
+
+
+def _input_key(quelle, wert):
+    # Gleiche Eingaben ergeben das gleiche Totem und werden nur einmal gerendert
+    if quelle == "username":
+        return quelle, wert.lower()
+    if quelle == "datei":
+        return quelle, str(Path(wert).resolve())
+    if quelle == "bytes":
+        return quelle, hashlib.blake2b(wert, digest_size=20).digest()
+    return quelle, wert
+
+
+def _properties_value(text):
+    """
+    Maskiert einen Wert für eine Java-.properties-Datei (ASCII mit \\uXXXX).
+    """
+    zeichen = []
+    for i, c in enumerate(text):
+        if c in "\\:=#!" or (c == " " and i == 0):
+            zeichen.append("\\" + c)
+        elif c == "\n":
+            zeichen.append("\\n")
+        elif ord(c) < 0x20 or ord(c) > 0x7E:
+            zeichen.extend(f"\\u{einheit:04x}" for einheit in _utf16(c))
+        else:
+            zeichen.append(c)
+    return "".join(zeichen)
+
+
+def _utf16(c):
+    daten = c.encode("utf-16-be")
+    return [int.from_bytes(daten[i:i + 2], "big") for i in range(0, len(daten), 2)]
+
+
+def cit_properties(name, textur):
+    """
+    CIT-Regel: Totem mit diesem Item-Namen bekommt die Textur.
+    """
+    return (
+        "type=item\n"
+        "items=totem_of_undying\n"
+        f"texture=textures/item/totems/{textur}.png\n"
+        f"nbt.display.Name={_properties_value(name)}\n"
+    )
+
+
+def texture_model(textur):
+    """
+    Item-Modell für eine Totem-Textur.
+    """
+    return json.dumps({
+        "parent": "minecraft:item/generated",
+        "textures": {"layer0": f"minecraft:item/totems/{textur}"},
+    }, indent=2)
+
+
+def totem_model(overrides):
+    """
+    Ersetzt das Vanilla-Modell des Totems und ergänzt die custom_model_data-Overrides.
+
+    Args:
+        overrides: Liste von (custom_model_data, textur), aufsteigend sortiert
+    """
+    return json.dumps({
+        "parent": "minecraft:item/generated",
+        "textures": {"layer0": "minecraft:item/totem_of_undying"},
+        "overrides": [
+            {"predicate": {"custom_model_data": cmd}, "model": f"minecraft:item/totems/{textur}"}
+            for cmd, textur in overrides
+        ],
+    }, indent=2)
+
+
+def pack_entries(items, options=None, workers=None, executor=None, cmd_start=CMD_START, manifest=None):
+    """
+    Liefert die ZIP-Einträge des Multi-Totem-Packs für pack_writer.stream_zip().
+
+    Args:
+        items: Iterable von (name, quelle, wert), z.B. aus batch_render.iter_inputs()
+        options: RenderOptions für alle Skins
+        workers, executor: wie batch_render.iter_results()
+        cmd_start: custom_model_data des ersten Eintrags
+        manifest: optionale Liste, die mit dem Manifest gefüllt wird
+            (in Eingabereihenfolge)
+    """
+    if manifest is None:
+        manifest = []
+    eintraege = []
+    namen = set()
+    # Pro Render-Auftrag nur die Ziel-Einträge und ggf. das Ergebnis; die
+    # Skin-Bytes gehen direkt an iter_results() und werden nicht aufgehoben
+    auftrag_von = {}
+    ziele = []
+    ergebnisse = []
+
+    def auftraege():
+        for index, (name, quelle, wert) in enumerate(items):
+            eintrag = {"name": display_name(name, quelle), "custom_model_data": cmd_start + index}
+            eintraege.append(eintrag)
+            if eintrag["name"] in namen:
+                eintrag.update(status="fehler", error="Name kommt mehrfach vor")
+                continue
+            namen.add(eintrag["name"])
+            key = _input_key(quelle, wert)
+            nummer = auftrag_von.get(key)
+            if nummer is None:
+                auftrag_von[key] = len(ziele)
+                ziele.append([eintrag])
+                ergebnisse.append(None)
+                yield name, quelle, wert
+            elif ergebnisse[nummer] is None:
+                ziele[nummer].append(eintrag)
+            else:
+                # Gleiche Eingabe wurde schon gerendert
+                eintrag.update(ergebnisse[nummer])
+
+    texturen = {}
+    pack_png = None
+    for nummer, _, png, fehler in iter_results(auftraege(), options, workers, executor):
+        if fehler is not None:
+            ergebnisse[nummer] = {"status": "fehler", "error": fehler}
+        else:
+            ergebnisse[nummer] = {"status": "ok", "texture": texture_id(png)}
+        for eintrag in ziele[nummer]:
+            eintrag.update(ergebnisse[nummer])
+        ziele[nummer] = None
+        if fehler is not None:
+            continue
+        textur = ergebnisse[nummer]["texture"]
+        if textur in texturen:
+            continue
+        texturen[textur] = True
+        if pack_png is None:
+            pack_png = png
+        yield f"{TEXTURE_DIR}/{textur}.png", png
+        yield f"{MODEL_DIR}/{textur}.json", texture_model(textur)
+
+    ok = [eintrag for eintrag in eintraege if eintrag.get("status") == "ok"]
+    yield TOTEM_MODEL, totem_model([(e["custom_model_data"], e["texture"]) for e in ok])
+    for eintrag in ok:
+        yield f"{CIT_DIR}/{eintrag['custom_model_data']}.properties", cit_properties(eintrag["name"], eintrag["texture"])
+
+    manifest.extend(eintraege)
+    yield "manifest.json", json.dumps(manifest, indent=2, ensure_ascii=False)
+    yield "pack.mcmeta", PACK_BUILDER_MCMETA
+    if pack_png is not None:
+        totem_img = Image.open(io.BytesIO(pack_png))
+        yield "pack.png", encode_png(totem_img, scale=max(1, 256 // totem_img.width)).data
+
+
+def build_pack(items, out_path, options=None, workers=None, executor=None, cmd_start=CMD_START):
+    """
+    Rendert alle Aufträge und schreibt das Multi-Totem-Pack als ZIP-Datei.
+
+    Returns:
+        Das Manifest (Liste von Dictionaries, in Eingabereihenfolge)
+    """
+    manifest = []
+    with open(out_path, "wb") as f:
+        for chunk in stream_zip(pack_entries(items, options, workers, executor, cmd_start, manifest)):
+            f.write(chunk)
+    return manifest
+
+
+def main(argv=None):
+    """
+    Kommandozeilen-Einstiegspunkt
+    """
+    parser = argparse.ArgumentParser(description="Baut ein Resourcepack mit vielen Totems (CIT und custom_model_data).")
+    parser.add_argument("inputs", nargs="*", help="Skin-Dateien, Verzeichnisse oder ZIP-Archive")
+    parser.add_argument("--username", action="append", default=[], help="Minecraft-Username (mehrfach möglich)")
+    parser.add_argument("--usernames-file", help="Datei mit einem Username pro Zeile")
+    parser.add_argument("-o", "--output", default="Custom_Totems.zip", help="Ziel-ZIP (Standard: Custom_Totems.zip)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Anzahl Worker-Prozesse")
+    parser.add_argument("--cmd-start", type=int, default=CMD_START,
+                        help=f"custom_model_data des ersten Totems (Standard: {CMD_START})")
+    parser.add_argument("--no-overlay", action="store_true", help="Kopf-Overlay weglassen")
+    parser.add_argument("--second-layer", action="store_true", help="Jacke und Ärmel (zweite Ebene) anwenden")
+    parser.add_argument("--hd", action="store_true", help="HD-Skins als HD-Totem rendern")
+    parser.add_argument("--profile", default=AUTO_PROFILE, choices=[AUTO_PROFILE] + PROFILES.names(),
+                        help=f"Mapping-Profil (Standard: {AUTO_PROFILE} = Arm-Modell erkennen)")
+    args = parser.parse_args(argv)
+
+    usernames = list(args.username)
+    if args.usernames_file:
+        usernames += Path(args.usernames_file).read_text(encoding="utf-8").splitlines()
+    if not args.inputs and not usernames:
+        parser.error("Keine Skins oder Usernames angegeben")
+
+    options = RenderOptions(
+        overlay=not args.no_overlay, hd=args.hd, profile=args.profile, second_layer=args.second_layer
+    )
+    manifest = build_pack(iter_inputs(args.inputs, usernames), args.output, options, args.workers,
+                          cmd_start=args.cmd_start)
+
+    fehler = [e for e in manifest if e["status"] != "ok"]
+    texturen = len({e["texture"] for e in manifest if e["status"] == "ok"})
+    print(f"{len(manifest) - len(fehler)} von {len(manifest)} Totems ({texturen} Texturen) -> {args.output}")
+    for eintrag in fehler:
+        print(f"  Fehler bei {eintrag['name']}: {eintrag['error']}", file=sys.stderr)
+    return 1 if fehler else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming-ZIP für Resourcepacks
+===============================
+
+Schreibt ZIP-Archive Eintrag für Eintrag und gibt die fertigen Bytes als
+Chunks zurück, statt das ganze Archiv im Speicher aufzubauen. Da der
+Ausgabestrom nicht zurückgespult werden kann, stehen CRC und Größen in
+Data-Deskriptoren hinter den Daten jedes Eintrags.
+
+Die Kompression wird pro Eintrag gewählt: PNGs sind bereits komprimiert
+und werden nur gespeichert, Text (JSON, pack.mcmeta) wird mit Deflate
+gepackt.
+"""
+
+import zipfile
+
+STORE = zipfile.ZIP_STORED
+DEFLATE = zipfile.ZIP_DEFLATED
+
+# Feste Zeitstempel, damit gleiche Inhalte byte-gleiche Archive ergeben
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+class _ChunkSink:
+    """
+    Nicht zurückspulbares Datei-Objekt, das geschriebene Bytes sammelt
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self.size = 0
+
+    def write(self, data):
+        if data:
+            self._chunks.append(bytes(data))
+            self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        """
+        Gibt die seit dem letzten Aufruf geschriebenen Bytes zurück.
+        """
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self.size = 0
+        return data
+
+
+def default_compression(name):
+    """
+    PNGs speichern, alles andere komprimieren.
+    """
+    return STORE if name.lower().endswith(".png") else DEFLATE
+
+
+def stream_zip(entries, chunk_size=64 * 1024):
+    """
+    Erzeugt ein ZIP-Archiv als Folge von Byte-Chunks.
+
+    Args:
+        entries: Iterable von (name, daten) oder (name, daten, kompression).
+            daten ist bytes, str oder ein Iterable von bytes (wird dann
+            stückweise geschrieben); kompression ist STORE oder DEFLATE,
+            Standard siehe default_compression().
+        chunk_size: ab dieser Puffergröße wird ein Chunk ausgegeben
+
+    Yields:
+        bytes
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, mode="w") as zf:
+        for entry in entries:
+            name, daten = entry[0], entry[1]
+            kompression = entry[2] if len(entry) > 2 else default_compression(name)
+
+            info = zipfile.ZipInfo(name, date_time=ZIP_DATE_TIME)
+            info.compress_type = kompression
+            info.external_attr = 0o644 << 16
+            if isinstance(daten, str):
+                daten = daten.encode("utf-8")
+            if isinstance(daten, (bytes, bytearray, memoryview)):
+                daten = (daten,)
+
+            with zf.open(info, mode="w") as ziel:
+                for stueck in daten:
+                    ziel.write(stueck)
+                    if sink.size >= chunk_size:
+                        yield sink.drain()
+            if sink.size >= chunk_size:
+                yield sink.drain()
+    rest = sink.drain()
+    if rest:
+        yield rest
+
+
+def build_zip(entries):
+    """
+    Wie stream_zip(), liefert aber das ganze Archiv als bytes (für kleine Packs).
+    """
+    return b"".join(stream_zip(entries))
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+PNG-Kodierung für Totems
+========================
+
+Ein Totem hat fast immer weniger als 256 Farben. Statt jedes Bild als
+RGBA-PNG mit Standardeinstellungen zu speichern, wird hier die günstigere
+verlustfreie Darstellung gewählt:
+
+- Palette (Modus P, Transparenz über tRNS), wenn es höchstens 256 Farben gibt
+- sonst RGBA
+
+Palettenbilder werden von Pillow ungefiltert geschrieben, was bei wenigen
+Farben und großen gleichfarbigen Flächen (pack.png) am kleinsten ist.
+RGBA-Bilder filtert Pillow adaptiv pro Zeile; eine eigene Filterwahl pro
+Zeile bietet Pillow nicht an. Einstellbar ist aber die zlib-Strategie: Für
+RGBA werden mehrere probiert und die kleinste Ausgabe behalten. Bei
+Palettenbildern war die Standard-Strategie in allen Messungen am kleinsten,
+dort bleibt es bei einer Kodierung.
+
+Zusätzlich gibt es eine Nearest-Neighbor-Vergrößerung per np.repeat
+(z.B. für pack.png) und Zähler für gesparte Bytes und Kodierzeit.
+"""
+
+import io
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+
+# zlib-Stufe für die gewählte Darstellung (Bilder sind winzig, 9 kostet kaum mehr)
+COMPRESS_LEVEL = 9
+# zlib-Strategien, die pro Darstellung probiert werden (kleinste Ausgabe gewinnt).
+# optimize=True bringt gegenüber Stufe 9 nichts und fehlt daher.
+ZLIB_STRATEGIES = {
+    "P": (zlib.Z_DEFAULT_STRATEGY,),
+    "RGBA": (zlib.Z_DEFAULT_STRATEGY, zlib.Z_RLE, zlib.Z_HUFFMAN_ONLY),
+}
+# Stufe, mit der Pillow standardmäßig speichert (Vergleichswert für "gespart")
+DEFAULT_COMPRESS_LEVEL = 6
+# Nur jede n-te Kodierung misst zusätzlich den Vergleichswert (kostet eine zweite Kodierung)
+MEASURE_EVERY = 64
+
+
+@dataclass
+class EncodeResult:
+    """
+    Ergebnis von encode_png()
+
+    Attributes:
+        data: PNG-Bytes
+        mode: gewählte Darstellung ("P" oder "RGBA")
+        bytes_saved: Ersparnis gegenüber einem RGBA-PNG mit Standardeinstellungen,
+            None wenn nicht gemessen
+        seconds: Kodierzeit (ohne die Vergleichsmessung)
+    """
+    data: bytes
+    mode: str
+    bytes_saved: Optional[int]
+    seconds: float
+
+
+class EncodeStats:
+    """
+    Thread-sichere Summen über alle Kodierungen
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.encodes = 0
+        self.palette_encodes = 0
+        self.bytes_out = 0
+        self.seconds = 0.0
+        # Nur über die gemessenen Kodierungen
+        self.measured = 0
+        self.measured_bytes_out = 0
+        self.bytes_saved = 0
+
+    def record(self, result):
+        with self._lock:
+            self.encodes += 1
+            if result.mode == "P":
+                self.palette_encodes += 1
+            self.bytes_out += len(result.data)
+            self.seconds += result.seconds
+            if result.bytes_saved is not None:
+                self.measured += 1
+                self.measured_bytes_out += len(result.data)
+                self.bytes_saved += result.bytes_saved
+
+    def should_measure(self):
+        with self._lock:
+            return self.encodes % MEASURE_EVERY == 0
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "encodes": self.encodes,
+                "palette_encodes": self.palette_encodes,
+                "bytes_out": self.bytes_out,
+                "seconds": self.seconds,
+                "measured": self.measured,
+                "measured_bytes_out": self.measured_bytes_out,
+                "bytes_saved": self.bytes_saved,
+            }
+
+
+ENCODE_STATS = EncodeStats()
+
+
+def _to_array(image):
+    if isinstance(image, np.ndarray):
+        return image
+    return np.asarray(image.convert("RGBA"), dtype=np.uint8)
+
+
+def _save(img, **params):
+    img_io = io.BytesIO()
+    img.save(img_io, "PNG", **params)
+    return img_io.getvalue()
+
+
+def _palettize(pixel):
+    """
+    Zerlegt ein RGBA-Array (H x W x 4) in Indexbild und RGBA-Palette.
+
+    Returns:
+        (indizes H x W uint8, palette N x 4 uint8) oder None bei mehr als 256 Farben
+    """
+    farben = np.ascontiguousarray(pixel).view(np.uint32).reshape(-1)
+    palette, indizes = np.unique(farben, return_inverse=True)
+    if len(palette) > 256:
+        return None
+    # Transparente Farben zuerst, dann kann der tRNS-Chunk kurz bleiben
+    palette_rgba = palette.view(np.uint8).reshape(-1, 4)
+    reihenfolge = np.argsort(palette_rgba[:, 3] == 255, kind="stable")
+    neu = np.empty_like(reihenfolge)
+    neu[reihenfolge] = np.arange(len(reihenfolge))
+    indizes = neu[indizes].astype(np.uint8).reshape(pixel.shape[:2])
+    return indizes, palette_rgba[reihenfolge]
+
+
+def to_palette_image(pixel, scale=1):
+    """
+    Wandelt ein RGBA-Array (H x W x 4) verlustfrei in ein Palettenbild um,
+    optional um einen ganzzahligen Faktor vergrößert.
+
+    Returns:
+        PIL.Image im Modus P oder None bei mehr als 256 Farben
+    """
+    zerlegt = _palettize(pixel)
+    if zerlegt is None:
+        return None
+    indizes, palette = zerlegt
+    if scale > 1:
+        indizes = upscale(indizes, scale)
+    hoehe, breite = indizes.shape
+    img = Image.frombytes("P", (breite, hoehe), indizes.tobytes())
+    img.putpalette(palette.tobytes(), rawmode="RGBA")
+    return img
+
+
+def encode_png(image, scale=1, record=True, measure=None):
+    """
+    Kodiert ein Bild verlustfrei: als Palettenbild, wenn es höchstens 256
+    Farben hat, sonst als RGBA (mit der kleinsten der ZLIB_STRATEGIES).
+
+    Args:
+        image: PIL.Image oder RGBA-Array (H x W x 4, uint8)
+        scale: ganzzahliger Nearest-Neighbor-Vergrößerungsfaktor (z.B. 8 für pack.png).
+            Die Palette wird am kleinen Bild bestimmt, vergrößert wird nur das Indexbild.
+        record: Ergebnis in ENCODE_STATS zählen
+        measure: zusätzlich ein Standard-RGBA-PNG kodieren und die Ersparnis
+            berechnen (None = Stichprobe, jede MEASURE_EVERY-te Kodierung)
+
+    Returns:
+        EncodeResult
+    """
+    if measure is None:
+        measure = record and ENCODE_STATS.should_measure()
+    start = time.perf_counter()
+    pixel = _to_array(image)
+
+    img = to_palette_image(pixel, scale)
+    if img is None:
+        img = Image.fromarray(upscale(pixel, scale) if scale > 1 else pixel)
+    data = min(
+        (_save(img, compress_level=COMPRESS_LEVEL, compress_type=strategie) for strategie in ZLIB_STRATEGIES[img.mode]),
+        key=len,
+    )
+    seconds = time.perf_counter() - start
+
+    bytes_saved = None
+    if measure:
+        gross = upscale(pixel, scale) if scale > 1 else pixel
+        baseline = _save(Image.fromarray(gross), compress_level=DEFAULT_COMPRESS_LEVEL)
+        bytes_saved = len(baseline) - len(data)
+    result = EncodeResult(data, img.mode, bytes_saved, seconds)
+    if record:
+        ENCODE_STATS.record(result)
+    return result
+
+
+def upscale(image, factor):
+    """
+    Nearest-Neighbor-Vergrößerung um einen ganzzahligen Faktor (wie resize(..., NEAREST)).
+
+    Args:
+        image: PIL.Image oder Array (H x W oder H x W x Kanäle)
+
+    Returns:
+        Array (H*factor x W*factor [x Kanäle])
+    """
+    pixel = _to_array(image)
+    return pixel.repeat(factor, axis=0).repeat(factor, axis=1)
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Vorschau-Cache für die Desktop-Version
+======================================
+
+Skins und Totems sind Pixel-Art. Für die Vorschau werden sie daher nur um
+ganzzahlige Faktoren mit Nearest-Neighbor skaliert: Das ist deutlich
+billiger als LANCZOS und bleibt scharf. Skalierte Varianten liegen in einem
+kleinen LRU-Cache (Schlüssel: Bild, Zielgröße, Filter), sodass wiederholtes
+Zeichnen und Größenänderungen des Fensters fast nichts kosten.
+
+Das Modul importiert kein tkinter und ist thread-sicher (der Worker-Thread
+der Desktop-Version füllt den Cache).
+"""
+
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+# Anzahl skalierter Varianten im Cache
+PREVIEW_CACHE_SIZE = 16
+
+
+def integer_fit(breite, hoehe, max_breite, max_hoehe):
+    """
+    Größte Zielgröße, die in (max_breite, max_hoehe) passt und aus dem Bild
+    durch einen ganzzahligen Faktor entsteht (vergrößern um n oder
+    verkleinern auf 1/n).
+
+    Returns:
+        (breite, hoehe)
+    """
+    faktor = min(max_breite // breite, max_hoehe // hoehe)
+    if faktor >= 1:
+        return breite * faktor, hoehe * faktor
+    teiler = max(-(-breite // max(max_breite, 1)), -(-hoehe // max(max_hoehe, 1)))
+    return max(breite // teiler, 1), max(hoehe // teiler, 1)
+
+
+class PreviewCache:
+    """
+    Thread-sicherer LRU-Cache für skalierte Vorschaubilder
+    """
+
+    def __init__(self, maxsize=PREVIEW_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, image, size, resample=Image.NEAREST):
+        """
+        Liefert die gecachte Variante oder None.
+        """
+        key = (id(image), tuple(size), resample)
+        with self._lock:
+            eintrag = self._entries.get(key)
+            # id() kann nach dem Löschen eines Bildes neu vergeben werden
+            if eintrag is None or eintrag[0] is not image:
+                return None
+            self._entries.move_to_end(key)
+            return eintrag[1]
+
+    def scaled(self, image, size, resample=Image.NEAREST):
+        """
+        Skaliert das Bild auf size (RGBA) und legt das Ergebnis im Cache ab.
+        """
+        vorschau = self.get(image, size, resample)
+        if vorschau is not None:
+            return vorschau
+        vorschau = image if image.mode == "RGBA" else image.convert("RGBA")
+        if vorschau.size != tuple(size):
+            vorschau = vorschau.resize(tuple(size), resample)
+        key = (id(image), tuple(size), resample)
+        with self._lock:
+            # Das Bild selbst wird mitgespeichert, damit seine id() gültig bleibt
+            self._entries[key] = (image, vorschau)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return vorschau
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+"""
+Mapping-Profile
+===============
+
+Ein Profil beschreibt, welche Skin-Bereiche an welche Stelle des Totems
+kommen. Profile liegen als JSON-Dateien im Ordner profiles/ (Dateiname ohne
+Endung = Profilname) und werden einmal beim Start geladen und geprüft.
+totem_core übersetzt jedes Profil danach einmal in Gather-Index-Tabellen,
+ein weiteres Profil kostet beim Rendern also keine Zeit.
+
+Aufbau einer Profil-Datei (Koordinaten im 64er-Raster des Skins bzw. im
+32x32-Totem):
+
+    {
+      "description": "Kurzbeschreibung",
+      "parts": {
+        "kopf": {
+          "skin": [x, y, breite, hoehe],
+          "totem": [x, y, breite, hoehe],
+          "resize": "nearest",          // oder null: Größe wie im Skin
+          "crop": [[x1, y1, x2, y2], [x, y]],
+          "overlay": [x, y]             // optional: zweite Ebene im Skin
+        }
+      },
+      "feinschliff": [[[x, y, b, h], [x, y, b, h]]]   // (Quelle, Ziel) im Totem
+    }
+
+Spätere Teile überschreiben frühere; "crop" macht Pixel des Teils
+transparent (Rechteck von/bis inklusive oder einzelnes Pixel). Die zweite
+Ebene des Parts "kopf" ist das Kopf-Overlay, die der übrigen Parts (Jacke,
+Ärmel) wird über RenderOptions.second_layer zugeschaltet.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+
+# Größe der Totem-Textur in Pixeln
+TOTEM_SIZE = 32
+# Raster des Skins, in dem die Profile rechnen
+SKIN_SIZE = 64
+# Profil, das ohne Angabe verwendet wird
+DEFAULT_PROFILE = "classic"
+# Part, dessen zweite Ebene das Kopf-Overlay ist; die zweite Ebene aller
+# anderen Parts (Jacke, Ärmel) wird getrennt davon zugeschaltet
+HEAD_PART = "kopf"
+
+BASE_DIR = Path(__file__).resolve().parent
+
+logger = logging.getLogger("totem.profiles")
+
+_PART_KEYS = {"skin", "totem", "resize", "crop", "overlay"}
+_RESIZE = (None, "nearest")
+
+
+class ProfileError(ValueError):
+    """Die Profil-Datei ist ungültig"""
+
+
+class UnknownProfile(KeyError):
+    """Es gibt kein Profil mit diesem Namen"""
+
+
+@dataclass(frozen=True)
+class Profile:
+    """
+    Ein geprüftes Mapping-Profil
+
+    Attributes:
+        name: Profilname
+        description: Kurzbeschreibung
+        parts: Body-Parts in Render-Reihenfolge (Name -> Dictionary wie in der Datei)
+        feinschliff: Liste von (Quelle, Ziel) als [x, y, Breite, Höhe] im Totem
+    """
+    name: str
+    description: str
+    parts: dict
+    feinschliff: tuple
+
+    def skin_regions(self):
+        """
+        Alle Skin-Bereiche (x, y, Breite, Höhe), die das Profil liest.
+        """
+        regionen = []
+        for part in self.parts.values():
+            regionen.append(tuple(part["skin"]))
+            if part.get("overlay") is not None:
+                regionen.append((*part["overlay"], *part["skin"][2:]))
+        return regionen
+
+    @cached_property
+    def digest(self):
+        """
+        Hash über Parts und Feinschliff (Hex-String). Ändert sich die
+        Profil-Datei, ändert sich auch der Hash.
+        """
+        inhalt = json.dumps([self.parts, self.feinschliff], sort_keys=True)
+        return hashlib.blake2b(inhalt.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _ints(wert, anzahl, wo):
+    if (not isinstance(wert, list) or len(wert) != anzahl
+            or not all(isinstance(v, int) and not isinstance(v, bool) for v in wert)):
+        raise ProfileError(f"{wo}: erwartet {anzahl} ganze Zahlen, nicht {wert!r}")
+    return wert
+
+
+def _rect_in(rect, breite, hoehe, wo):
+    x, y, w, h = _ints(rect, 4, wo)
+    if w <= 0 or h <= 0 or x < 0 or y < 0 or x + w > breite or y + h > hoehe:
+        raise ProfileError(f"{wo}: Bereich {rect} liegt nicht in {breite}x{hoehe}")
+    return rect
+
+
+def _check_part(name, part):
+    wo = f"parts.{name}"
+    if not isinstance(part, dict):
+        raise ProfileError(f"{wo}: erwartet ein Objekt")
+    unbekannt = set(part) - _PART_KEYS
+    if unbekannt:
+        raise ProfileError(f"{wo}: unbekannte Felder {sorted(unbekannt)}")
+    if "skin" not in part or "totem" not in part:
+        raise ProfileError(f"{wo}: 'skin' und 'totem' sind Pflicht")
+
+    sx, sy, sw, sh = _rect_in(part["skin"], SKIN_SIZE, SKIN_SIZE, f"{wo}.skin")
+    tx, ty, tw, th = _ints(part["totem"], 4, f"{wo}.totem")
+    resize = part.get("resize")
+    if resize not in _RESIZE:
+        raise ProfileError(f"{wo}.resize: erlaubt sind {list(_RESIZE)}")
+    if resize is None and (tw, th) != (sw, sh):
+        raise ProfileError(f"{wo}: ohne 'resize' muss die Totem-Größe der Skin-Größe entsprechen")
+    # Teile dürfen wie bei paste() über den Rand ragen, aber nicht komplett daneben liegen
+    if tw <= 0 or th <= 0 or tx >= TOTEM_SIZE or ty >= TOTEM_SIZE or tx + tw <= 0 or ty + th <= 0:
+        raise ProfileError(f"{wo}.totem: Bereich {part['totem']} liegt außerhalb des Totems")
+
+    crop = part.get("crop", [])
+    if not isinstance(crop, list):
+        raise ProfileError(f"{wo}.crop: erwartet eine Liste")
+    for i, eintrag in enumerate(crop):
+        if not isinstance(eintrag, list) or len(eintrag) not in (2, 4):
+            raise ProfileError(f"{wo}.crop[{i}]: erwartet [x, y] oder [x1, y1, x2, y2]")
+        _ints(eintrag, len(eintrag), f"{wo}.crop[{i}]")
+
+    overlay = part.get("overlay")
+    if overlay is not None:
+        ox, oy = _ints(overlay, 2, f"{wo}.overlay")
+        _rect_in([ox, oy, sw, sh], SKIN_SIZE, SKIN_SIZE, f"{wo}.overlay")
+
+    return {
+        "skin": list(part["skin"]),
+        "totem": list(part["totem"]),
+        "resize": resize,
+        "crop": [list(eintrag) for eintrag in crop],
+        "overlay": list(overlay) if overlay is not None else None,
+    }
+
+
+def parse_profile(name, daten):
+    """
+    Prüft ein Profil (bereits geparstes JSON).
+
+    Returns:
+        Profile
+
+    Raises:
+        ProfileError: das Profil ist ungültig
+    """
+    if not isinstance(daten, dict):
+        raise ProfileError("Profil muss ein JSON-Objekt sein")
+    unbekannt = set(daten) - {"description", "parts", "feinschliff"}
+    if unbekannt:
+        raise ProfileError(f"unbekannte Felder {sorted(unbekannt)}")
+    parts = daten.get("parts")
+    if not isinstance(parts, dict) or not parts:
+        raise ProfileError("'parts' muss mindestens einen Body-Part enthalten")
+
+    feinschliff = daten.get("feinschliff", [])
+    if not isinstance(feinschliff, list):
+        raise ProfileError("'feinschliff' muss eine Liste sein")
+    paare = []
+    for i, paar in enumerate(feinschliff):
+        wo = f"feinschliff[{i}]"
+        if not isinstance(paar, list) or len(paar) != 2:
+            raise ProfileError(f"{wo}: erwartet [Quelle, Ziel]")
+        quelle = _rect_in(paar[0], TOTEM_SIZE, TOTEM_SIZE, f"{wo}.quelle")
+        ziel = _rect_in(paar[1], TOTEM_SIZE, TOTEM_SIZE, f"{wo}.ziel")
+        if quelle[2:] != ziel[2:]:
+            raise ProfileError(f"{wo}: Quelle und Ziel müssen gleich groß sein")
+        paare.append((list(quelle), list(ziel)))
+
+    description = daten.get("description", "")
+    if not isinstance(description, str):
+        raise ProfileError("'description' muss ein Text sein")
+    return Profile(
+        name=name,
+        description=description,
+        parts={teil: _check_part(teil, part) for teil, part in parts.items()},
+        feinschliff=tuple(paare),
+    )
+
+
+def load_profile(path):
+    """
+    Lädt und prüft eine Profil-Datei.
+
+    Raises:
+        ProfileError: die Datei ist kein gültiges Profil
+        OSError: die Datei kann nicht gelesen werden
+    """
+    path = Path(path)
+    try:
+        with open(path, encoding="utf-8") as f:
+            daten = json.load(f)
+    except json.JSONDecodeError as e:
+        raise ProfileError(f"{path.name}: kein gültiges JSON ({e})") from e
+    try:
+        return parse_profile(path.stem, daten)
+    except ProfileError as e:
+        raise ProfileError(f"{path.name}: {e}") from e
+
+
+class ProfileRegistry:
+    """
+    Registry der geladenen Profile
+    """
+
+    def __init__(self):
+        self._profiles = {}
+        self.errors = {}
+        self._lock = threading.Lock()
+
+    def add(self, profile):
+        """
+        Registriert ein bereits geprüftes Profil.
+        """
+        with self._lock:
+            self._profiles[profile.name] = profile
+
+    def scan(self, directory):
+        """
+        Lädt alle *.json eines Ordners. Ungültige Dateien werden übersprungen
+        und mit ihrer Fehlermeldung in `errors` vermerkt.
+        """
+        directory = Path(directory)
+        if not directory.is_dir():
+            return
+        for path in sorted(directory.glob("*.json")):
+            try:
+                self.add(load_profile(path))
+            except (OSError, ProfileError) as e:
+                self.errors[path.stem] = str(e)
+                logger.warning("Profil %s wird ignoriert: %s", path.name, e)
+
+    def names(self):
+        """
+        Namen aller registrierten Profile.
+        """
+        with self._lock:
+            return sorted(self._profiles)
+
+    def get(self, name):
+        """
+        Raises:
+            UnknownProfile: kein Profil mit diesem Namen registriert
+        """
+        with self._lock:
+            profile = self._profiles.get(name)
+        if profile is None:
+            raise UnknownProfile(name)
+        return profile
+
+    def all(self):
+        """
+        Alle Profile in Namensreihenfolge.
+        """
+        with self._lock:
+            return [self._profiles[name] for name in sorted(self._profiles)]
+
+
+def default_registry(base_dir=BASE_DIR):
+    """
+    Registry mit allen Profilen aus profiles/.
+    """
+    registry = ProfileRegistry()
+    registry.scan(Path(base_dir) / "profiles")
+    return registry
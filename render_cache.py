@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Render-Cache für fertige Totem-PNGs
+===================================
+
+Inhaltsadressierter LRU-Cache: Der Schlüssel ist ein Hash über die
+dekodierten Skin-Pixel plus die Render-Optionen, der Wert sind die fertig
+kodierten PNG-Bytes. Wiederholte Anfragen mit demselben Skin sparen sich
+damit Rendern und PNG-Kodierung.
+
+Optional werden Einträge zusätzlich in einem Verzeichnis abgelegt, damit
+der Cache einen Neustart des Workers übersteht.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import astuple
+from pathlib import Path
+
+from atomic_file import atomic_write
+
+
+def cache_key(skin_pixel, options, salt=None):
+    """
+    Berechnet den Cache-Schlüssel für einen Skin und Render-Optionen.
+
+    Args:
+        skin_pixel: NumPy-Array der dekodierten Skin-Pixel (siehe totem_core.skin_to_array)
+        options: RenderOptions
+        salt: zusätzlicher Wert, z.B. die Versionen von Outline-Layer und Mapping
+
+    Returns:
+        Hex-String (40 Zeichen)
+    """
+    h = hashlib.blake2b(digest_size=20)
+    h.update(repr(skin_pixel.shape).encode())
+    h.update(skin_pixel.tobytes())
+    h.update(repr(astuple(options)).encode())
+    h.update(repr(salt).encode())
+    return h.hexdigest()
+
+
+class RenderCache:
+    """
+    Thread-sicherer LRU-Cache mit Begrenzung nach Anzahl und Bytes
+    und optionaler Ablage auf der Festplatte
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=16 * 1024 * 1024, disk_dir=None):
+        """
+        Args:
+            max_entries: maximale Anzahl Einträge im Speicher
+            max_bytes: maximale Summe der Wertgrößen im Speicher
+            disk_dir: Verzeichnis für die Festplatten-Ebene (None = aus)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        # Zähler
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _disk_path(self, key):
+        return self.disk_dir / key[:2] / f"{key}.png"
+
+    def get(self, key):
+        """
+        Liefert die gespeicherten Bytes oder None.
+        Ein Treffer auf der Festplatte wird in den Speicher übernommen.
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        if self.disk_dir is not None:
+            try:
+                value = self._disk_path(key).read_bytes()
+            except OSError:
+                value = None
+            if value is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                self._store(key, value)
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, value):
+        """
+        Speichert die Bytes unter dem Schlüssel (im Speicher und ggf. auf der Festplatte).
+        """
+        self._store(key, value)
+        if self.disk_dir is not None:
+            self._write_disk(key, value)
+
+    def _store(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._entries[key] = value
+            self._bytes += len(value)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def _write_disk(self, key, value):
+        # Atomar schreiben, damit parallele Worker nie eine halbe Datei lesen
+        try:
+            atomic_write(self._disk_path(key), value)
+        except OSError:
+            pass  # Festplatten-Ebene ist optional
+
+    def clear(self):
+        """
+        Leert den Speicher-Cache (die Festplatten-Ebene bleibt erhalten).
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """
+        Liefert die Zähler und die aktuelle Belegung als Dictionary.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
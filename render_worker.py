@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Hintergrund-Worker für die Desktop-Version
+==========================================
+
+Laden, Vorschau-Skalierung und Rendern laufen in einem eigenen Thread, damit
+die tkinter-Oberfläche nicht blockiert. Die GUI übergibt Aufträge mit
+submit() und holt fertige Ergebnisse im Takt von root.after() mit poll() ab;
+tkinter-Objekte werden nur im Haupt-Thread angefasst.
+
+Aufträge haben eine Art ("load", "preview", "render", ...). Ein neuer Auftrag
+einer Art macht ältere derselben Art hinfällig: Sie werden übersprungen,
+falls sie noch nicht laufen, und ihr Ergebnis wird verworfen, falls sie
+schon laufen.
+
+Das Modul importiert kein tkinter und kann daher auch headless verwendet werden.
+"""
+
+import itertools
+import queue
+import threading
+
+
+class RenderWorker:
+    """
+    Ein Worker-Thread mit Auftrags- und Ergebnis-Queue
+    """
+
+    def __init__(self, name="totem-worker"):
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._ids = itertools.count(1)
+        self._latest = {}
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, kind, fn, *args):
+        """
+        Stellt einen Auftrag ein und macht ältere Aufträge derselben Art hinfällig.
+
+        Returns:
+            Auftrags-ID
+        """
+        job_id = next(self._ids)
+        with self._lock:
+            self._latest[kind] = job_id
+        self._jobs.put((kind, job_id, fn, args))
+        return job_id
+
+    def cancel(self, kind=None):
+        """
+        Verwirft alle offenen Aufträge einer Art (None = aller Arten).
+        """
+        with self._lock:
+            if kind is None:
+                self._latest.clear()
+            else:
+                self._latest.pop(kind, None)
+
+    def is_current(self, kind, job_id):
+        """
+        Ob job_id der neueste, nicht abgebrochene Auftrag seiner Art ist.
+        """
+        with self._lock:
+            return self._latest.get(kind) == job_id
+
+    def pending(self, kind):
+        """
+        Ob für diese Art noch ein Ergebnis aussteht.
+        """
+        with self._lock:
+            return kind in self._latest
+
+    def poll(self):
+        """
+        Holt alle fertigen, noch aktuellen Ergebnisse ohne zu blockieren.
+
+        Returns:
+            Liste von (art, ergebnis, fehler); fehler ist None oder die Exception
+        """
+        fertig = []
+        while True:
+            try:
+                kind, job_id, ergebnis, fehler = self._results.get_nowait()
+            except queue.Empty:
+                return fertig
+            with self._lock:
+                if self._latest.get(kind) != job_id:
+                    continue
+                del self._latest[kind]
+            fertig.append((kind, ergebnis, fehler))
+
+    def close(self):
+        """
+        Beendet den Worker-Thread, nachdem der laufende Auftrag fertig ist.
+        """
+        self.cancel()
+        self._jobs.put(None)
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            kind, job_id, fn, args = job
+            if not self.is_current(kind, job_id):
+                continue
+            try:
+                ergebnis, fehler = fn(*args), None
+            except Exception as e:
+                ergebnis, fehler = None, e
+            self._results.put((kind, job_id, ergebnis, fehler))
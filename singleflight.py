@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Single-Flight: gleichzeitige Aufrufe zusammenfassen
+===================================================
+
+Rufen mehrere Threads gleichzeitig do() mit demselben Schlüssel auf, führt
+nur der erste die Funktion aus. Alle anderen warten auf dessen Ergebnis
+(oder dessen Exception) und bekommen es ebenfalls. Sobald der Aufruf
+beendet ist, wird der Schlüssel wieder freigegeben; das Ergebnis selbst
+wird hier nicht gecacht.
+
+AsyncSingleFlight macht dasselbe für Coroutinen innerhalb einer Event-Loop.
+"""
+
+import asyncio
+import threading
+
+
+class _Call:
+    """Ein laufender Aufruf, auf den weitere Threads warten können"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Fasst gleichzeitige Aufrufe mit gleichem Schlüssel zu einem zusammen
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        # Anzahl der Aufrufe, die sich an einen laufenden Aufruf angehängt haben
+        self.shared = 0
+
+    def do(self, key, fn):
+        """
+        Führt fn() aus oder wartet auf einen laufenden Aufruf mit demselben Schlüssel.
+
+        Args:
+            key: hashbarer Schlüssel
+            fn: Funktion ohne Argumente
+
+        Returns:
+            Das Ergebnis von fn(); Exceptions werden an alle Wartenden weitergegeben.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.shared += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self):
+        """
+        Anzahl der gerade laufenden Aufrufe.
+        """
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """
+    Wie SingleFlight, aber für Coroutinen (nur innerhalb einer Event-Loop verwenden)
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self.shared = 0
+
+    async def do(self, key, fn):
+        """
+        Führt await fn() aus oder wartet auf einen laufenden Aufruf mit demselben Schlüssel.
+
+        Bricht ein Wartender ab, läuft der gemeinsame Aufruf für die anderen weiter.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def in_flight(self):
+        """
+        Anzahl der gerade laufenden Aufrufe.
+        """
+        return len(self._calls)
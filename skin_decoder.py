@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Abgesicherte Skin-Dekodierung
+=============================
+
+Bevor ein Pixel dekodiert wird, prüft decode_skin() die Datei anhand ihrer
+Bytes:
+
+1. Größe der Datei (MAX_SKIN_BYTES)
+2. PNG-Signatur und IHDR-Header: nur erlaubte Skin-Größen (ALLOWED_SIZES)
+   und gültige Farbtyp/Bit-Tiefe-Kombinationen
+3. Chunk-Liste: komprimierte Metadaten (zTXt, iTXt, iCCP) sind begrenzt,
+   damit kein Dekompressionsbomben-Text entpackt wird
+
+Erst danach dekodiert Pillow das Bild, und zwar genau einmal nach RGBA.
+Da die Abmessungen vorher feststehen, ist auch der dekodierte Speicher
+begrenzt (höchstens 512 x 512 x 4 Bytes).
+"""
+
+import io
+import struct
+import zlib
+
+from PIL import Image
+
+# Größte akzeptierte Skin-Datei
+MAX_SKIN_BYTES = 1024 * 1024
+# Erlaubte Skin-Größen: 64x64 und 64x32 (alt), jeweils auch als HD bis 512 Pixel Breite
+SKIN_SCALES = (1, 2, 4, 8)
+ALLOWED_SIZES = frozenset(
+    size for s in SKIN_SCALES for size in ((64 * s, 64 * s), (64 * s, 32 * s))
+)
+# Obergrenze für komprimierte Metadaten-Chunks (Text, ICC-Profil)
+MAX_METADATA_BYTES = 64 * 1024
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Erlaubte Bit-Tiefen pro PNG-Farbtyp
+_BIT_DEPTHS = {
+    0: (1, 2, 4, 8, 16),  # Graustufen
+    2: (8, 16),           # RGB
+    3: (1, 2, 4, 8),      # Palette
+    4: (8, 16),           # Graustufen + Alpha
+    6: (8, 16),           # RGBA
+}
+_METADATA_CHUNKS = (b"zTXt", b"iTXt", b"iCCP")
+
+
+class SkinDecodeError(ValueError):
+    """Die Datei ist kein zulässiger Skin"""
+
+
+def read_png_header(data, allowed_sizes=ALLOWED_SIZES):
+    """
+    Prüft Signatur, IHDR und Chunk-Liste einer PNG-Datei, ohne Pixel zu dekodieren.
+
+    Returns:
+        (breite, hoehe)
+
+    Raises:
+        SkinDecodeError: keine PNG-Datei, unzulässige Größe oder ungültige Struktur
+    """
+    if not data.startswith(PNG_SIGNATURE):
+        raise SkinDecodeError("Keine PNG-Datei")
+    if len(data) < 33:
+        raise SkinDecodeError("PNG-Datei ist unvollständig")
+
+    laenge, typ = struct.unpack(">I4s", data[8:16])
+    if typ != b"IHDR" or laenge != 13:
+        raise SkinDecodeError("PNG-Datei beginnt nicht mit IHDR")
+    breite, hoehe, tiefe, farbtyp, _, _, interlace = struct.unpack(">IIBBBBB", data[16:29])
+    if (breite, hoehe) not in allowed_sizes:
+        raise SkinDecodeError(f"Unzulässige Skin-Größe {breite}x{hoehe}")
+    if tiefe not in _BIT_DEPTHS.get(farbtyp, ()):
+        raise SkinDecodeError(f"Ungültiger PNG-Farbtyp {farbtyp} mit Bit-Tiefe {tiefe}")
+    if interlace not in (0, 1):
+        raise SkinDecodeError("Ungültige PNG-Interlace-Methode")
+
+    # Chunks durchgehen (nur Längen und Typen, keine Dekompression)
+    position = 8
+    metadaten = 0
+    while True:
+        if position + 12 > len(data):
+            raise SkinDecodeError("PNG-Datei ist unvollständig")
+        laenge, typ = struct.unpack(">I4s", data[position:position + 8])
+        position += 12 + laenge
+        if position > len(data):
+            raise SkinDecodeError("PNG-Chunk ist länger als die Datei")
+        if typ in _METADATA_CHUNKS:
+            metadaten += laenge
+            if metadaten > MAX_METADATA_BYTES:
+                raise SkinDecodeError("PNG-Datei enthält zu viele Metadaten")
+        if typ == b"IEND":
+            break
+    return breite, hoehe
+
+
+def read_limited(stream, max_bytes=MAX_SKIN_BYTES):
+    """
+    Liest höchstens max_bytes aus einem Datei-Objekt.
+
+    Raises:
+        SkinDecodeError: der Inhalt ist größer
+    """
+    data = stream.read(max_bytes + 1)
+    if len(data) > max_bytes:
+        raise SkinDecodeError(f"Datei ist größer als {max_bytes // 1024} KiB")
+    return data
+
+
+def decode_skin(data, max_bytes=MAX_SKIN_BYTES, allowed_sizes=ALLOWED_SIZES):
+    """
+    Prüft die PNG-Bytes eines Skins und dekodiert sie einmalig nach RGBA.
+
+    Args:
+        data: PNG-Bytes
+        max_bytes: größte zulässige Datei
+        allowed_sizes: zulässige (Breite, Höhe)
+
+    Returns:
+        Geladenes PIL.Image im Modus RGBA
+
+    Raises:
+        SkinDecodeError: die Datei ist kein zulässiger Skin
+    """
+    if len(data) > max_bytes:
+        raise SkinDecodeError(f"Datei ist größer als {max_bytes // 1024} KiB")
+    size = read_png_header(data, allowed_sizes)
+    try:
+        with Image.open(io.BytesIO(data), formats=["PNG"]) as img:
+            if img.size != size:
+                raise SkinDecodeError("PNG-Header und Bild passen nicht zusammen")
+            img.load()
+            skin = img if img.mode == "RGBA" else img.convert("RGBA")
+    except SkinDecodeError:
+        raise
+    except (OSError, SyntaxError, ValueError, zlib.error, Image.DecompressionBombError) as e:
+        raise SkinDecodeError(f"PNG-Datei ist beschädigt: {e}") from e
+    return skin
@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+"""
+Skin-Auflösung über Mojang und Crafatar
+=======================================
+
+Löst einen Minecraft-Username in die Skin-PNG-Bytes auf:
+
+1. Username -> UUID über die Mojang API (TTL-Cache, unbekannte Namen werden
+   ebenfalls für eine Weile gemerkt)
+2. UUID -> Skin über Crafatar (TTL-Cache, danach Revalidierung per ETag)
+
+Alle Anfragen laufen über eine gemeinsame requests.Session mit
+Connection-Pool und festen Timeouts. AsyncSkinResolver macht dasselbe mit
+einem httpx.AsyncClient für den ASGI-Modus (asgi.py). Die Basis-URLs sind konfigurierbar,
+damit sich der Resolver gegen einen lokalen Stub-Server testen lässt.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+except ImportError:  # nur für den ASGI-Modus (AsyncSkinResolver) nötig
+    httpx = None
+
+MOJANG_URL = "https://api.mojang.com/users/profiles/minecraft/{name}"
+CRAFATAR_URL = "https://crafatar.com/skins/{uuid}"
+
+# Offen gehaltene Verbindungen des AsyncSkinResolver (der Pool darf kurzzeitig mehr öffnen)
+KEEPALIVE_CONNECTIONS = 32
+
+
+class SkinResolverError(Exception):
+    """Upstream (Mojang/Crafatar) nicht erreichbar oder fehlerhafte Antwort"""
+
+
+class UnknownUsername(SkinResolverError):
+    """Der Username existiert laut Mojang API nicht"""
+
+
+class SkinUnavailable(SkinResolverError):
+    """Der Skin konnte nicht von Crafatar geladen werden"""
+
+
+class TTLCache:
+    """
+    Kleiner thread-sicherer Cache mit Ablaufzeit pro Eintrag und LRU-Begrenzung
+    """
+
+    def __init__(self, max_entries=10000, clock=time.monotonic):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Liefert (wert, abgelaufen) oder None, falls der Schlüssel unbekannt ist.
+        Abgelaufene Einträge bleiben erhalten, damit sie revalidiert werden können.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            value, expires = entry
+            return value, self._clock() >= expires
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, self._clock() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class _ResolverBase:
+    """
+    Gemeinsame Cache- und Antwortlogik für SkinResolver und AsyncSkinResolver.
+    Die Unterklassen liefern nur den HTTP-Transport.
+    """
+
+    def __init__(
+        self,
+        mojang_url=MOJANG_URL,
+        skin_url=CRAFATAR_URL,
+        timeout=(2.0, 5.0),
+        uuid_ttl=3600,
+        negative_ttl=300,
+        skin_ttl=600,
+        max_entries=10000,
+        clock=time.monotonic,
+    ):
+        self.mojang_url = mojang_url
+        self.skin_url = skin_url
+        self.timeout = timeout
+        self.uuid_ttl = uuid_ttl
+        self.negative_ttl = negative_ttl
+        self.skin_ttl = skin_ttl
+
+        self._uuids = TTLCache(max_entries, clock)
+        self._skins = TTLCache(max_entries, clock)
+
+    def _uuid_url(self, username):
+        return self.mojang_url.format(name=quote(username, safe=""))
+
+    def _skin_url(self, player_uuid):
+        return self.skin_url.format(uuid=quote(player_uuid, safe=""))
+
+    def _cached_uuid(self, username):
+        """
+        UUID aus dem Cache oder None, wenn nachgefragt werden muss.
+
+        Raises:
+            UnknownUsername: der Name ist als unbekannt gemerkt
+        """
+        cached = self._uuids.get(username.lower())
+        if cached is None or cached[1]:
+            return None
+        if cached[0] is None:
+            raise UnknownUsername(username)
+        return cached[0]
+
+    def _uuid_from_response(self, username, response):
+        """
+        Wertet die Antwort der Mojang API aus und merkt sich das Ergebnis.
+        """
+        key = username.lower()
+        if response.status_code == 200:
+            try:
+                player_uuid = response.json()["id"]
+            except (ValueError, KeyError) as e:
+                raise SkinResolverError(f"Ungültige Antwort der Mojang API: {e}") from e
+            self._uuids.set(key, player_uuid, self.uuid_ttl)
+            return player_uuid
+        if response.status_code in (204, 404):
+            self._uuids.set(key, None, self.negative_ttl)
+            raise UnknownUsername(username)
+        raise SkinResolverError(f"Mojang API antwortet mit Status {response.status_code}")
+
+    def _revalidation_headers(self, cached):
+        if cached is not None and cached[0][1]:
+            return {"If-None-Match": cached[0][1]}
+        return None
+
+    def _skin_from_response(self, player_uuid, cached, response):
+        """
+        Wertet die Antwort von Crafatar aus (inkl. 304 bei Revalidierung).
+        """
+        if response.status_code == 304 and cached is not None:
+            self._skins.set(player_uuid, cached[0], self.skin_ttl)
+            return cached[0][0]
+        if response.status_code != 200:
+            raise SkinUnavailable(f"Crafatar antwortet mit Status {response.status_code}")
+
+        content = response.content
+        self._skins.set(player_uuid, (content, response.headers.get("ETag")), self.skin_ttl)
+        return content
+
+
+class SkinResolver(_ResolverBase):
+    """
+    Löst Usernames in Skin-Bytes auf, mit Connection-Pool, Timeouts und Caches
+    """
+
+    def __init__(
+        self,
+        mojang_url=MOJANG_URL,
+        skin_url=CRAFATAR_URL,
+        timeout=(2.0, 5.0),
+        pool_size=32,
+        uuid_ttl=3600,
+        negative_ttl=300,
+        skin_ttl=600,
+        max_entries=10000,
+        session=None,
+        clock=time.monotonic,
+    ):
+        """
+        Args:
+            mojang_url: URL-Vorlage für Username -> UUID (Platzhalter {name})
+            skin_url: URL-Vorlage für UUID -> Skin (Platzhalter {uuid})
+            timeout: (Verbindungsaufbau, Lesen) in Sekunden
+            pool_size: maximale Anzahl offener Verbindungen pro Host
+            uuid_ttl: Gültigkeit eines Username -> UUID Eintrags in Sekunden
+            negative_ttl: wie lange ein unbekannter Username gemerkt wird
+            skin_ttl: Gültigkeit eines Skins, danach Revalidierung per ETag
+            max_entries: maximale Anzahl Einträge pro Cache
+            session: eigene requests.Session (Standard: neue Session mit Pool)
+            clock: Zeitquelle (für Tests austauschbar)
+        """
+        super().__init__(mojang_url, skin_url, timeout, uuid_ttl, negative_ttl, skin_ttl, max_entries, clock)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+
+    def _get(self, url, headers=None):
+        try:
+            return self.session.get(url, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise SkinResolverError(f"Anfrage an {url} fehlgeschlagen: {e}") from e
+
+    def lookup_uuid(self, username):
+        """
+        Löst einen Username in die UUID auf.
+
+        Raises:
+            UnknownUsername: der Name existiert nicht
+            SkinResolverError: die Mojang API ist nicht erreichbar
+        """
+        player_uuid = self._cached_uuid(username)
+        if player_uuid is not None:
+            return player_uuid
+        return self._uuid_from_response(username, self._get(self._uuid_url(username)))
+
+    def fetch_skin(self, player_uuid):
+        """
+        Lädt die Skin-PNG-Bytes zu einer UUID.
+
+        Raises:
+            SkinUnavailable: der Skin konnte nicht geladen werden
+        """
+        cached = self._skins.get(player_uuid)
+        if cached is not None and not cached[1]:
+            return cached[0][0]
+
+        try:
+            response = self._get(self._skin_url(player_uuid), self._revalidation_headers(cached))
+        except SkinResolverError as e:
+            raise SkinUnavailable(str(e)) from e
+        return self._skin_from_response(player_uuid, cached, response)
+
+    def resolve(self, username):
+        """
+        Username -> Skin-PNG-Bytes (beide Schritte mit Cache).
+        """
+        return self.fetch_skin(self.lookup_uuid(username))
+
+
+class AsyncSkinResolver(_ResolverBase):
+    """
+    Wie SkinResolver, aber mit httpx.AsyncClient für den ASGI-Modus.
+    Wartende Anfragen belegen keinen Thread.
+    """
+
+    def __init__(
+        self,
+        mojang_url=MOJANG_URL,
+        skin_url=CRAFATAR_URL,
+        timeout=(2.0, 5.0),
+        pool_size=256,
+        uuid_ttl=3600,
+        negative_ttl=300,
+        skin_ttl=600,
+        max_entries=10000,
+        client=None,
+        clock=time.monotonic,
+    ):
+        """
+        Args:
+            pool_size: maximale Anzahl gleichzeitiger Verbindungen
+            client: eigener httpx.AsyncClient (Standard: neuer Client mit Pool)
+            übrige Argumente wie bei SkinResolver
+        """
+        super().__init__(mojang_url, skin_url, timeout, uuid_ttl, negative_ttl, skin_ttl, max_entries, clock)
+        if client is None:
+            if httpx is None:
+                raise RuntimeError("Für den ASGI-Modus wird httpx benötigt (pip install httpx)")
+            client = httpx.AsyncClient(
+                timeout=httpx.Timeout(timeout[1], connect=timeout[0]),
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=KEEPALIVE_CONNECTIONS),
+            )
+        self.client = client
+
+    async def _get(self, url, headers=None):
+        try:
+            return await self.client.get(url, headers=headers)
+        except httpx.HTTPError as e:
+            raise SkinResolverError(f"Anfrage an {url} fehlgeschlagen: {e}") from e
+
+    async def lookup_uuid(self, username):
+        """
+        Löst einen Username in die UUID auf (siehe SkinResolver.lookup_uuid).
+        """
+        player_uuid = self._cached_uuid(username)
+        if player_uuid is not None:
+            return player_uuid
+        return self._uuid_from_response(username, await self._get(self._uuid_url(username)))
+
+    async def fetch_skin(self, player_uuid):
+        """
+        Lädt die Skin-PNG-Bytes zu einer UUID (siehe SkinResolver.fetch_skin).
+        """
+        cached = self._skins.get(player_uuid)
+        if cached is not None and not cached[1]:
+            return cached[0][0]
+
+        try:
+            response = await self._get(self._skin_url(player_uuid), self._revalidation_headers(cached))
+        except SkinResolverError as e:
+            raise SkinUnavailable(str(e)) from e
+        return self._skin_from_response(player_uuid, cached, response)
+
+    async def resolve(self, username):
+        """
+        Username -> Skin-PNG-Bytes (beide Schritte mit Cache).
+        """
+        return await self.fetch_skin(await self.lookup_uuid(username))
+
+    async def aclose(self):
+        """
+        Schließt den HTTP-Client und seine Verbindungen.
+        """
+        await self.client.aclose()
@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+"""
+Die Module des Projekts liegen flach im Projektordner.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""
+Hilfen für die Tests
+"""
+
+import io
+
+import numpy as np
+from PIL import Image
+
+
+def random_skin(seed=0, size=(64, 64), opaque=True):
+    """
+    Zufälliger Skin (PIL.Image, RGBA). Mit opaque=False ist auch der
+    Alpha-Kanal zufällig.
+    """
+    rng = np.random.default_rng(seed)
+    pixel = rng.integers(0, 256, (size[1], size[0], 4), dtype=np.uint8)
+    if opaque:
+        pixel[..., 3] = 255
+    return Image.fromarray(pixel)
+
+
+def png_bytes(image):
+    """
+    Kodiert ein Bild als PNG.
+    """
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
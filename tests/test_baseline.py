@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Vergleich mit der ursprünglichen Pillow-Implementierung (generate_totem_image
+aus der ersten Version von app.py). Das Profil "slim" entspricht ihrem Mapping.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from helpers import random_skin
+from totem_core import RenderOptions, render
+
+OUTLINE = Path(__file__).resolve().parent.parent / "outline.png"
+
+KOPF_CROP = [[0, 0, 15, 0], [0, 1], [1, 1], [14, 1], [15, 1], [0, 2], [15, 2], [0, 15, 15, 15]]
+
+
+def _crop(img, crops):
+    pixels = img.load()
+    for crop in crops:
+        if len(crop) == 2:
+            crop = crop * 2
+        x1, y1, x2, y2 = crop
+        for x in range(x1, x2 + 1):
+            for y in range(y1, y2 + 1):
+                if 0 <= x < img.width and 0 <= y < img.height:
+                    pixels[x, y] = (0, 0, 0, 0)
+
+
+def baseline_totem(uploaded_image, overlay):
+    """
+    Die ursprüngliche Pillow-Implementierung, Schritt für Schritt übernommen.
+    """
+    totem_img = Image.new("RGBA", (32, 32), (0, 0, 0, 0))
+
+    kopf_img = uploaded_image.crop((8, 8, 16, 16)).resize((16, 16), Image.NEAREST).convert("RGBA")
+    _crop(kopf_img, KOPF_CROP)
+    if overlay:
+        overlay_img = uploaded_image.crop((40, 8, 48, 16)).resize((16, 16), Image.NEAREST).convert("RGBA")
+        _crop(overlay_img, KOPF_CROP)
+        kopf_img = Image.alpha_composite(kopf_img, overlay_img)
+    totem_img.paste(kopf_img, (8, 1), kopf_img)
+
+    for (sx, sy, sw, sh), ziel in (
+        ((44, 20, 3, 9), (8, 17)),
+        ((36, 52, 3, 9), (21, 17)),
+        ((20, 20, 8, 12), (12, 16)),
+    ):
+        teil = uploaded_image.crop((sx, sy, sx + sw, sy + sh)).convert("RGBA")
+        totem_img.paste(teil, ziel, teil)
+
+    totem_img.putpixel((10, 16), totem_img.getpixel((10, 17)))
+    for y in range(16, 27):
+        totem_img.putpixel((11, y), totem_img.getpixel((12, y)))
+    for y in range(16, 27):
+        totem_img.putpixel((20, y), totem_img.getpixel((19, y)))
+    totem_img.putpixel((21, 16), totem_img.getpixel((21, 17)))
+
+    outline_img = Image.open(OUTLINE).convert("RGBA")
+    if outline_img.size != (32, 32):
+        outline_img = outline_img.resize((32, 32), Image.NEAREST)
+    return Image.alpha_composite(totem_img, outline_img)
+
+
+def skins():
+    for seed in range(3):
+        skin = random_skin(seed, opaque=seed != 0)
+        yield skin
+        yield skin.convert("RGB")
+        yield skin.convert("LA")
+        yield skin.convert("RGB").quantize(64)
+
+
+@pytest.mark.parametrize("overlay", [False, True])
+def test_identical_to_baseline(overlay):
+    for skin in skins():
+        erwartet = baseline_totem(skin, overlay)
+        totem = render(skin, RenderOptions(overlay=overlay, profile="slim"))
+        assert totem.mode == "RGBA"
+        assert totem.tobytes() == erwartet.tobytes()
+
+
+def test_parallel_renders_do_not_share_buffers():
+    skins = [random_skin(seed, opaque=False) for seed in range(16)]
+    options = RenderOptions(overlay=True, profile="slim")
+    erwartet = [baseline_totem(skin, True).tobytes() for skin in skins]
+
+    with ThreadPoolExecutor(8) as pool:
+        for _ in range(5):
+            ergebnisse = list(pool.map(lambda skin: render(skin, options).tobytes(), skins))
+            assert ergebnisse == erwartet
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from batch_render import batch_entries, iter_zip_inputs
+from helpers import png_bytes, random_skin
+from pack_writer import stream_zip
+
+
+def von_hand_umgewandelt(legacy):
+    """
+    64x64-Skin wie im Spiel: obere Hälfte übernommen, die Vorderseite des
+    linken Arms ist die gespiegelte Vorderseite des rechten Arms.
+    """
+    alt = np.asarray(legacy)
+    pixel = np.zeros((64, 64, 4), dtype=np.uint8)
+    pixel[:32] = alt
+    pixel[52:64, 36:40] = alt[20:32, 44:48][:, ::-1]
+    return Image.fromarray(pixel)
+
+
+def test_legacy_skin_zip_round_trip():
+    legacy = random_skin(4, size=(64, 32), opaque=False)
+    eingabe = io.BytesIO()
+    with zipfile.ZipFile(eingabe, "w") as zf:
+        zf.writestr("skins/legacy.png", png_bytes(legacy))
+        zf.writestr("skins/modern.png", png_bytes(von_hand_umgewandelt(legacy)))
+        zf.writestr("skins/kaputt.png", b"kein png")
+
+    with zipfile.ZipFile(eingabe) as zf, ThreadPoolExecutor(2) as executor:
+        ausgabe = b"".join(stream_zip(batch_entries(iter_zip_inputs(zf), workers=2, executor=executor)))
+
+    with zipfile.ZipFile(io.BytesIO(ausgabe)) as zf:
+        assert zf.testzip() is None
+        manifest = json.loads(zf.read("manifest.json"))
+        assert [(e["name"], e["status"]) for e in manifest] == [
+            ("legacy.png", "ok"), ("modern.png", "ok"), ("kaputt.png", "fehler"),
+        ]
+        totem_legacy = Image.open(io.BytesIO(zf.read(manifest[0]["file"])))
+        totem_modern = Image.open(io.BytesIO(zf.read(manifest[1]["file"])))
+        assert totem_legacy.size == (32, 32)
+        assert totem_legacy.convert("RGBA").tobytes() == totem_modern.convert("RGBA").tobytes()
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from helpers import png_bytes, random_skin
+from pack_builder import TEXTURE_DIR, pack_entries
+
+
+class ZaehlenderExecutor(ThreadPoolExecutor):
+    def __init__(self):
+        super().__init__(2)
+        self.auftraege = []
+
+    def submit(self, fn, *args, **kwargs):
+        self.auftraege.append(args[0])
+        return super().submit(fn, *args, **kwargs)
+
+
+def test_duplicate_inputs_render_once(tmp_path):
+    skin_a = png_bytes(random_skin(1))
+    skin_b = png_bytes(random_skin(2))
+    datei = tmp_path / "c.png"
+    datei.write_bytes(skin_a)
+    items = [
+        ("a.png", "bytes", skin_a),
+        ("b.png", "bytes", skin_a),
+        ("c.png", "datei", str(datei)),
+        ("d.png", "bytes", skin_b),
+        ("a.png", "bytes", skin_b),
+    ]
+
+    with ZaehlenderExecutor() as executor:
+        eintraege = dict(pack_entries(items, workers=2, executor=executor))
+
+    # b.png hat dieselben Bytes wie a.png, das zweite a.png ist ein doppelter Name
+    assert sorted(executor.auftraege) == ["a.png", "c.png", "d.png"]
+
+    manifest = json.loads(eintraege["manifest.json"])
+    assert [e["custom_model_data"] for e in manifest] == [1000, 1001, 1002, 1003, 1004]
+    assert [e["status"] for e in manifest] == ["ok", "ok", "ok", "ok", "fehler"]
+    # a, b und c teilen sich eine Textur (c wird gerendert, ergibt aber dasselbe Bild)
+    assert manifest[0]["texture"] == manifest[1]["texture"] == manifest[2]["texture"]
+    assert manifest[3]["texture"] != manifest[0]["texture"]
+    texturen = [name for name in eintraege if name.startswith(TEXTURE_DIR)]
+    assert sorted(texturen) == sorted(f"{TEXTURE_DIR}/{manifest[i]['texture']}.png" for i in (0, 3))
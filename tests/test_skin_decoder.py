@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import io
+import struct
+import zlib
+
+import pytest
+
+import app
+from helpers import png_bytes, random_skin
+from skin_decoder import MAX_SKIN_BYTES, SkinDecodeError, decode_skin, read_limited
+
+
+def png_mit_groesse(breite, hoehe):
+    """
+    Minimale PNG-Datei (nur Signatur, IHDR und IEND) mit beliebigen Abmessungen.
+    """
+    def chunk(typ, daten):
+        return struct.pack(">I", len(daten)) + typ + daten + struct.pack(">I", zlib.crc32(typ + daten))
+
+    ihdr = struct.pack(">IIBBBBB", breite, hoehe, 8, 6, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", ihdr) + chunk(b"IEND", b"")
+
+
+def multipart(skin):
+    grenze = "totemtest"
+    body = (
+        f"--{grenze}\r\n"
+        'Content-Disposition: form-data; name="skin"; filename="skin.png"\r\n'
+        "Content-Type: image/png\r\n\r\n"
+    ).encode() + skin + f"\r\n--{grenze}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={grenze}"
+
+
+def test_accepts_skin():
+    skin = decode_skin(png_bytes(random_skin(1).convert("RGB")))
+    assert skin.mode == "RGBA"
+    assert skin.size == (64, 64)
+
+
+@pytest.mark.parametrize("data", [
+    b"",
+    b"GIF89a" + bytes(64),
+    png_bytes(random_skin(1)).replace(b"IHDR", b"IHDX", 1),
+])
+def test_rejects_non_png(data):
+    with pytest.raises(SkinDecodeError):
+        decode_skin(data)
+
+
+@pytest.mark.parametrize("size", [(65, 64), (64, 48), (1024, 1024), (100000, 100000)])
+def test_rejects_disallowed_ihdr_size(size):
+    # Die Größe steht nur im Header, die Pixel werden nie dekodiert
+    with pytest.raises(SkinDecodeError, match="Skin-Größe"):
+        decode_skin(png_mit_groesse(*size))
+
+
+def test_rejects_oversized_body():
+    zu_gross = png_bytes(random_skin(1)) + bytes(MAX_SKIN_BYTES)
+    with pytest.raises(SkinDecodeError, match="größer"):
+        read_limited(io.BytesIO(zu_gross))
+    with pytest.raises(SkinDecodeError, match="größer"):
+        decode_skin(zu_gross)
+
+
+def test_upload_limit_applies_without_content_length():
+    client = app.app.test_client()
+
+    def senden(skin):
+        body, content_type = multipart(skin)
+        # Ohne Content-Length, wie bei Transfer-Encoding: chunked
+        return client.post(
+            "/generate_totem",
+            input_stream=io.BytesIO(body),
+            content_type=content_type,
+            headers={"Transfer-Encoding": "chunked"},
+            environ_base={"wsgi.input_terminated": True},
+        )
+
+    assert senden(png_bytes(random_skin(1))).status_code == 200
+    assert senden(png_bytes(random_skin(1)) + bytes(2 * MAX_SKIN_BYTES)).status_code == 413
+    assert senden(b"kein png").status_code == 400
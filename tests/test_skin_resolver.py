@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+SkinResolver gegen lokale http.server-Stubs für Mojang API und Crafatar
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from helpers import png_bytes, random_skin
+from skin_resolver import SkinResolver, SkinResolverError, SkinUnavailable, UnknownUsername
+
+SKIN = png_bytes(random_skin(7))
+ETAG = '"v1"'
+PLAYER_UUID = "069a79f444e94726a5befca90e38aaf5"
+
+
+class MojangStub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.anfragen.append(self.path)
+        name = self.path.rsplit("/", 1)[1]
+        if name == "langsam":
+            # Antwortet nie, der Client läuft in den Lese-Timeout
+            time.sleep(1.0)
+            self.close_connection = True
+            return
+        if name.lower() == "notch":
+            body = json.dumps({"id": PLAYER_UUID, "name": "Notch"}).encode()
+            self.send_response(200)
+        else:
+            body = b""
+            self.send_response(204)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class CrafatarStub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if_none_match = self.headers.get("If-None-Match")
+        self.server.anfragen.append((self.path, if_none_match))
+        if if_none_match == ETAG:
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(SKIN)))
+        self.end_headers()
+        self.wfile.write(SKIN)
+
+
+def _start(handler):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.anfragen = []
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def upstreams():
+    mojang = _start(MojangStub)
+    crafatar = _start(CrafatarStub)
+    yield mojang, crafatar
+    for server in (mojang, crafatar):
+        server.shutdown()
+        server.server_close()
+
+
+class Uhr:
+    def __init__(self):
+        self.jetzt = 0.0
+
+    def __call__(self):
+        return self.jetzt
+
+
+def resolver_for(upstreams, uhr, **kwargs):
+    mojang, crafatar = upstreams
+    return SkinResolver(
+        mojang_url=f"http://127.0.0.1:{mojang.server_port}/users/profiles/minecraft/{{name}}",
+        skin_url=f"http://127.0.0.1:{crafatar.server_port}/skins/{{uuid}}",
+        clock=uhr,
+        **kwargs,
+    )
+
+
+def test_uuid_ttl_hit(upstreams):
+    mojang, _ = upstreams
+    uhr = Uhr()
+    resolver = resolver_for(upstreams, uhr, uuid_ttl=60)
+
+    assert resolver.lookup_uuid("Notch") == PLAYER_UUID
+    uhr.jetzt = 59
+    # Groß-/Kleinschreibung spielt für den Cache keine Rolle
+    assert resolver.lookup_uuid("notch") == PLAYER_UUID
+    assert len(mojang.anfragen) == 1
+
+    uhr.jetzt = 60
+    assert resolver.lookup_uuid("Notch") == PLAYER_UUID
+    assert len(mojang.anfragen) == 2
+
+
+def test_skin_revalidated_with_etag(upstreams):
+    _, crafatar = upstreams
+    uhr = Uhr()
+    resolver = resolver_for(upstreams, uhr, skin_ttl=10)
+
+    assert resolver.resolve("Notch") == SKIN
+    assert resolver.resolve("Notch") == SKIN
+    assert crafatar.anfragen == [(f"/skins/{PLAYER_UUID}", None)]
+
+    uhr.jetzt = 10
+    assert resolver.resolve("Notch") == SKIN
+    assert crafatar.anfragen[-1] == (f"/skins/{PLAYER_UUID}", ETAG)
+
+    # Nach dem 304 gilt der Eintrag wieder skin_ttl lang
+    uhr.jetzt = 15
+    assert resolver.resolve("Notch") == SKIN
+    assert len(crafatar.anfragen) == 2
+
+
+def test_unknown_username_is_cached(upstreams):
+    mojang, crafatar = upstreams
+    uhr = Uhr()
+    resolver = resolver_for(upstreams, uhr, negative_ttl=30)
+
+    for _ in range(3):
+        with pytest.raises(UnknownUsername):
+            resolver.resolve("gibtesnicht")
+    assert len(mojang.anfragen) == 1
+    assert crafatar.anfragen == []
+
+    uhr.jetzt = 30
+    with pytest.raises(UnknownUsername):
+        resolver.resolve("gibtesnicht")
+    assert len(mojang.anfragen) == 2
+
+
+def test_timeout(upstreams):
+    resolver = resolver_for(upstreams, Uhr(), timeout=(1.0, 0.2))
+
+    with pytest.raises(SkinResolverError) as info:
+        resolver.lookup_uuid("langsam")
+    assert not isinstance(info.value, UnknownUsername)
+    # Ein Timeout wird nicht als unbekannter Name gemerkt
+    assert resolver._uuids.get("langsam") is None
+
+
+def test_skin_upstream_unreachable(upstreams):
+    mojang, _ = upstreams
+    resolver = SkinResolver(
+        mojang_url=f"http://127.0.0.1:{mojang.server_port}/users/profiles/minecraft/{{name}}",
+        skin_url="http://127.0.0.1:1/skins/{uuid}",
+        timeout=(0.2, 0.2),
+    )
+
+    with pytest.raises(SkinUnavailable):
+        resolver.resolve("Notch")
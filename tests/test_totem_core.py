@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+from PIL import Image
+
+from helpers import random_skin
+from totem_core import AUTO_PROFILE, SLIM_PROBE, RenderOptions, detect_model, render, skin_to_array
+
+
+def slim_variante(skin):
+    """
+    Derselbe Skin mit transparenten Flächen, die nur 4 Pixel breite Arme belegen.
+    """
+    pixel = np.array(skin)
+    for x, y, b, h in SLIM_PROBE:
+        pixel[y:y + h, x:x + b, 3] = 0
+    return Image.fromarray(pixel)
+
+
+def test_detect_model():
+    skin = random_skin(1)
+    assert detect_model(skin_to_array(skin)) == "classic"
+    assert detect_model(skin_to_array(slim_variante(skin))) == "slim"
+
+
+def test_auto_renders_classic_and_slim_differently():
+    classic = random_skin(2)
+    slim = slim_variante(classic)
+    auto = RenderOptions(profile=AUTO_PROFILE)
+
+    # Die Probe-Flächen liest keines der Profile, der Unterschied kommt nur aus der Profilwahl
+    assert np.array_equal(np.asarray(render(classic, RenderOptions(profile="slim"))),
+                          np.asarray(render(slim, RenderOptions(profile="slim"))))
+    assert np.array_equal(np.asarray(render(classic, auto)), np.asarray(render(classic, RenderOptions(profile="classic"))))
+    assert np.array_equal(np.asarray(render(slim, auto)), np.asarray(render(slim, RenderOptions(profile="slim"))))
+    assert not np.array_equal(np.asarray(render(classic, auto)), np.asarray(render(slim, auto)))
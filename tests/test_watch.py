@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+import totem_core
+from helpers import png_bytes, random_skin
+from watch import SkinWatcher
+
+
+def test_rerenders_only_changed_skins(tmp_path):
+    quelle = tmp_path / "skins"
+    quelle.mkdir()
+    (quelle / "a.png").write_bytes(png_bytes(random_skin(1)))
+    (quelle / "b.png").write_bytes(png_bytes(random_skin(2)))
+    watcher = SkinWatcher(quelle, tmp_path / "out")
+
+    assert watcher.scan()["rendered"] == ["a.png", "b.png"]
+    (quelle / "b.png").write_bytes(png_bytes(random_skin(3)))
+    bericht = watcher.scan()
+    assert bericht["rendered"] == ["b.png"]
+    assert bericht["unchanged"] == 1
+    # Der Index übersteht einen Neustart
+    assert SkinWatcher(quelle, tmp_path / "out").scan()["unchanged"] == 2
+
+
+def test_mapping_change_while_running_rerenders_everything(tmp_path, monkeypatch):
+    quelle = tmp_path / "skins"
+    quelle.mkdir()
+    (quelle / "a.png").write_bytes(png_bytes(random_skin(1)))
+    watcher = SkinWatcher(quelle, tmp_path / "out")
+    watcher.scan()
+
+    monkeypatch.setattr(totem_core, "MAPPING_FORMAT_VERSION", totem_core.MAPPING_FORMAT_VERSION + 1)
+    assert watcher.scan()["rendered"] == ["a.png"]
+    assert watcher.scan()["unchanged"] == 1
@@ -0,0 +1,579 @@
+# -*- coding: utf-8 -*-
+"""
+Render-Engine für den Totem Generator
+=====================================
+
+Gemeinsamer Kern für die Web-Version (app.py) und die Desktop-Version
+(totem_generator.py). Das Modul importiert weder Flask noch tkinter und
+kann daher auch headless (Server, Benchmarks) verwendet werden.
+
+Das Mapping (Skin-Bereich -> Totem-Bereich) kommt aus den JSON-Profilen
+(profiles/) und wird beim ersten Gebrauch je Profil in eine
+Gather-Index-Tabelle übersetzt. Jedes Totem entsteht danach aus einem
+einzigen NumPy-Fancy-Index über das RGBA-Array des Skins, ohne Python-Schleifen
+über einzelne Pixel.
+
+Die Ausgabe ist pixelgenau identisch zur bisherigen Pillow-Implementierung
+(crop/resize/paste/alpha_composite) mit demselben Mapping, inklusive der
+Rundung von Pillow.
+
+HD-Skins (128x128 bis 512x512) werden über denselben Mechanismus mit
+skalierten Tabellen gerendert: entweder als HD-Totem (32*Faktor Pixel) oder,
+nach einem Box-Downsampling der benötigten Bereiche, als normales 32x32-Totem.
+"""
+
+import math
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+
+from layers import default_registry
+from profiles import DEFAULT_PROFILE, HEAD_PART, default_registry as default_profiles
+
+# Größe der Totem-Textur in Pixeln
+TOTEM_SIZE = 32
+# Bereich des Skins, den das Mapping liest (Standard-Skin 64x64)
+SKIN_SIZE = 64
+
+# Mapping-Profile (profiles/*.json), einmal beim Import geladen und geprüft
+PROFILES = default_profiles()
+
+# Umbau alter 64x32-Skins auf das 64x64-Layout, wie ihn das Spiel vornimmt:
+# (Quelle x, y, Breite, Höhe, Ziel x, y) im 64er-Raster, jeweils horizontal
+# gespiegelt. Linkes Bein und linker Arm entstehen aus den rechten Gliedmaßen.
+LEGACY_SPIEGELUNG = [
+    # Bein: oben, unten, außen, vorne, innen, hinten
+    (4, 16, 4, 4, 20, 48),
+    (8, 16, 4, 4, 24, 48),
+    (0, 20, 4, 12, 24, 52),
+    (4, 20, 4, 12, 20, 52),
+    (8, 20, 4, 12, 16, 52),
+    (12, 20, 4, 12, 28, 52),
+    # Arm: oben, unten, außen, vorne, innen, hinten
+    (44, 16, 4, 4, 36, 48),
+    (48, 16, 4, 4, 40, 48),
+    (40, 20, 4, 12, 40, 52),
+    (44, 20, 4, 12, 36, 52),
+    (48, 20, 4, 12, 32, 52),
+    (52, 20, 4, 12, 44, 52),
+]
+
+# Hut-Ebene alter Skins (x, y, Breite, Höhe). Ist sie komplett deckend,
+# behandelt das Spiel sie als leer.
+LEGACY_HUT = [32, 0, 32, 16]
+
+# Bereiche, die nur das klassische Modell (4 Pixel breite Arme) belegt:
+# Unterseite und Rückseite des rechten Arms (x, y, Breite, Höhe). Sind sie
+# komplett transparent, hat der Skin schmale Arme (Alex-Modell).
+SLIM_PROBE = [[50, 16, 2, 4], [54, 20, 2, 12]]
+# Profil pro Arm-Modell für die automatische Auswahl
+MODEL_PROFILES = {"classic": "classic", "slim": "slim"}
+# Profilname, bei dem das Arm-Modell aus dem Skin erkannt wird
+AUTO_PROFILE = "auto"
+# Version der Übersetzung Profil -> Index-Tabelle; bei Änderungen an
+# compile_mapping() erhöhen, damit gecachte Totems ungültig werden
+MAPPING_FORMAT_VERSION = 1
+
+
+def _nearest_indices(quelle, ziel):
+    """
+    Liefert für jede Zielkoordinate die Quellkoordinate, wie Pillows
+    NEAREST-Resize sie wählt.
+    """
+    return ((np.arange(ziel) + 0.5) * quelle / ziel).astype(np.intp)
+
+
+def _crop_maske(part, breite, hoehe):
+    """
+    Erzeugt eine boolesche Maske (hoehe x breite) der Pixel, die laut
+    "crop"-Liste eines Body-Parts transparent werden.
+    """
+    maske = np.zeros((hoehe, breite), dtype=bool)
+    for crop in part.get("crop", []):
+        if len(crop) == 4:
+            x1, y1, x2, y2 = crop
+            maske[max(y1, 0):y2 + 1, max(x1, 0):x2 + 1] = True
+        elif len(crop) == 2:
+            x, y = crop
+            if 0 <= x < breite and 0 <= y < hoehe:
+                maske[y, x] = True
+    return maske
+
+
+def compile_mapping(mapping, feinschliff, scale=1, overlay_parts=None):
+    """
+    Übersetzt ein Mapping in Gather-Index-Tabellen.
+
+    Args:
+        mapping: Body-Parts wie in einem Profil (siehe profiles.py); Parts mit
+            "overlay" bekommen ihre zweite Ebene in der Overlay-Tabelle
+        feinschliff: Liste von (Quelle, Ziel) im Totem
+        scale: Skalierungsfaktor des Skins (1 = 64x64, 2 = 128x128, ...).
+            Alle Koordinaten werden mit dem Faktor multipliziert, das Totem
+            ist dann 32*scale Pixel groß.
+        overlay_parts: Namen der Parts, deren zweite Ebene in die
+            Overlay-Tabelle kommt (None = alle)
+
+    Returns:
+        (basis, overlay): zwei int-Arrays der Länge (32*scale)². Jeder Eintrag
+        ist der lineare Pixel-Index im (64*scale)²-Skin, aus dem das
+        Totem-Pixel stammt. Der Index (64*scale)² steht für ein transparentes Pixel.
+    """
+    skin_size = SKIN_SIZE * scale
+    totem_size = TOTEM_SIZE * scale
+    leer = skin_size * skin_size
+    basis = np.full((totem_size, totem_size), leer, dtype=np.intp)
+    overlay = np.full((totem_size, totem_size), leer, dtype=np.intp)
+
+    for name, part in mapping.items():
+        sx, sy, sw, sh = (wert * scale for wert in part["skin"])
+        tx, ty = part["totem"][0] * scale, part["totem"][1] * scale
+        if part.get("resize") == "nearest":
+            tw, th = part["totem"][2], part["totem"][3]
+        else:
+            tw, th = part["skin"][2], part["skin"][3]
+        # Die crop-Liste gilt im 64er-Raster, ein Pixel dort ist ein scale x scale-Block
+        maske = _crop_maske(part, tw, th).repeat(scale, axis=0).repeat(scale, axis=1)
+        tw, th = tw * scale, th * scale
+        xs = _nearest_indices(sw, tw)
+        ys = _nearest_indices(sh, th)
+
+        quelle = (sy + ys)[:, None] * skin_size + (sx + xs)[None, :]
+        quelle[maske] = leer
+
+        # Teile, die aus dem Totem herausragen, werden wie bei paste() abgeschnitten
+        x0, y0 = max(tx, 0), max(ty, 0)
+        x1, y1 = min(tx + tw, totem_size), min(ty + th, totem_size)
+        if x0 >= x1 or y0 >= y1:
+            continue
+        ausschnitt = (slice(y0 - ty, y1 - ty), slice(x0 - tx, x1 - tx))
+
+        # Spätere Teile überschreiben frühere. Das entspricht paste(), weil sich
+        # die Teile nur dort überlappen, wo das frühere Teil transparent ist.
+        basis[y0:y1, x0:x1] = quelle[ausschnitt]
+
+        if part.get("overlay") is not None and (overlay_parts is None or name in overlay_parts):
+            ox, oy = part["overlay"][0] * scale, part["overlay"][1] * scale
+            ov_quelle = (oy + ys)[:, None] * skin_size + (ox + xs)[None, :]
+            ov_quelle[maske] = leer
+            overlay[y0:y1, x0:x1] = ov_quelle[ausschnitt]
+        else:
+            overlay[y0:y1, x0:x1] = leer
+
+    for quelle_rect, ziel_rect in feinschliff:
+        qx, qy, qw, qh = (wert * scale for wert in quelle_rect)
+        zx, zy, zw, zh = (wert * scale for wert in ziel_rect)
+        basis[zy:zy + zh, zx:zx + zw] = basis[qy:qy + qh, qx:qx + qw]
+        overlay[zy:zy + zh, zx:zx + zw] = overlay[qy:qy + qh, qx:qx + qw]
+
+    return basis.ravel(), overlay.ravel()
+
+
+@lru_cache(maxsize=None)
+def mapping_tables(scale=1, profile=DEFAULT_PROFILE, head=True, second_layer=False):
+    """
+    Gather-Index-Tabellen für einen Skalierungsfaktor und ein Profil,
+    pro Kombination nur einmal berechnet.
+
+    Args:
+        head: Kopf-Overlay (Part HEAD_PART) in die Overlay-Tabelle aufnehmen
+        second_layer: zweite Ebene aller übrigen Parts (Jacke, Ärmel) aufnehmen
+
+    Raises:
+        UnknownProfile: kein Profil mit diesem Namen
+    """
+    mapping = PROFILES.get(profile)
+    overlay_parts = [
+        name for name in mapping.parts
+        if (head if name == HEAD_PART else second_layer)
+    ]
+    basis, overlay = compile_mapping(mapping.parts, mapping.feinschliff, scale, overlay_parts)
+    basis.flags.writeable = False
+    overlay.flags.writeable = False
+    return basis, overlay
+
+
+@lru_cache(maxsize=None)
+def legacy_table(scale=1):
+    """
+    Index-Tabelle, die einen alten (64*scale)x(32*scale)-Skin in einem
+    einzigen Gather auf das 64x64-Layout bringt.
+
+    Returns:
+        int-Array der Länge (64*scale)². Jeder Eintrag ist der lineare Index
+        im alten Skin; der Index (64*scale)*(32*scale) steht für transparent.
+    """
+    breite = SKIN_SIZE * scale
+    alt_hoehe = breite // 2
+    leer = breite * alt_hoehe
+    tabelle = np.full((breite, breite), leer, dtype=np.intp)
+    # Obere Hälfte unverändert übernehmen
+    tabelle[:alt_hoehe] = np.arange(leer).reshape(alt_hoehe, breite)
+    for qx, qy, w, h, zx, zy in LEGACY_SPIEGELUNG:
+        qx, qy, w, h, zx, zy = (wert * scale for wert in (qx, qy, w, h, zx, zy))
+        quelle = np.arange(qy, qy + h)[:, None] * breite + np.arange(qx, qx + w)[None, :]
+        tabelle[zy:zy + h, zx:zx + w] = quelle[:, ::-1]
+    tabelle = tabelle.ravel()
+    tabelle.flags.writeable = False
+    return tabelle
+
+
+@lru_cache(maxsize=None)
+def _slim_probe_index(scale=1):
+    """
+    Lineare Pixel-Indizes der SLIM_PROBE-Bereiche im (64*scale)²-Skin.
+    """
+    breite = SKIN_SIZE * scale
+    teile = []
+    for x, y, w, h in SLIM_PROBE:
+        x, y, w, h = (wert * scale for wert in (x, y, w, h))
+        teile.append((np.arange(y, y + h)[:, None] * breite + np.arange(x, x + w)[None, :]).ravel())
+    index = np.concatenate(teile)
+    index.flags.writeable = False
+    return index
+
+
+# Skin-Bereiche, die irgendein Profil oder die Modell-Erkennung liest
+# (x, y, Breite, Höhe im 64er-Raster). Bei HD-Skins wird nur aus diesen
+# Bereichen konvertiert.
+SKIN_REGIONS = list(dict.fromkeys(
+    [region for profile in PROFILES.all() for region in profile.skin_regions()]
+    + [tuple(region) for region in SLIM_PROBE]
+))
+
+# Outline-Stile (outline.png und outlines/*.png), einmal beim Import geladen
+LAYERS = default_registry()
+
+
+def _div255(wert):
+    """Ganzzahlige Division durch 255 mit Rundung, wie in Pillows C-Code."""
+    return ((wert >> 8) + wert) >> 8
+
+
+def _div255_inplace(wert, tmp):
+    """Wie _div255, aber in wert selbst (tmp: Hilfs-Array gleicher Form)."""
+    np.right_shift(wert, 8, out=tmp)
+    wert += tmp
+    wert >>= 8
+
+
+class _Arbeitspuffer:
+    """
+    Vorab angelegte Arrays für das Rendern von n Totem-Pixeln. Jeder Thread
+    hat eigene Puffer (siehe _arbeitspuffer), damit pro Render keine
+    Zwischen-Arrays angelegt werden müssen.
+    """
+
+    def __init__(self, n):
+        self.totem = np.empty((n, 4), dtype=np.uint8)
+        self.oben = np.empty((n, 4), dtype=np.uint8)
+        self.unten32 = np.empty((n, 4), dtype=np.uint32)
+        self.oben32 = np.empty((n, 4), dtype=np.uint32)
+        self.tmp32 = np.empty((n, 4), dtype=np.uint32)
+        self.outa = np.empty((n, 1), dtype=np.uint32)
+        self.coef1 = np.empty((n, 1), dtype=np.uint32)
+        self.coef2 = np.empty((n, 1), dtype=np.uint32)
+
+
+_puffer_lokal = threading.local()
+
+
+def _arbeitspuffer(n):
+    """
+    Arbeitspuffer des aktuellen Threads für n Pixel (einmal pro Größe angelegt).
+    """
+    pool = getattr(_puffer_lokal, "pool", None)
+    if pool is None:
+        pool = _puffer_lokal.pool = {}
+    puffer = pool.get(n)
+    if puffer is None:
+        puffer = pool[n] = _Arbeitspuffer(n)
+    return puffer
+
+
+def _composite_inplace(unten, oben, p):
+    """
+    Legt `oben` über `unten` und schreibt das Ergebnis nach `unten`.
+    Rechnet nur in den Arrays des Arbeitspuffers p.
+
+    Pillow kopiert Pixel mit src_a == 0 unverändert; die Formel liefert für
+    diese Pixel bitgenau dasselbe, daher ist keine Maske nötig.
+    """
+    np.copyto(p.unten32, unten)
+    np.copyto(p.oben32, oben)
+    src_a = p.oben32[:, 3:4]
+    dst_a = p.unten32[:, 3:4]
+    tmp = p.tmp32[:, 3:4]
+
+    # outa255 = src_a * 255 + dst_a * (255 - src_a)
+    np.subtract(255, src_a, out=tmp)
+    np.multiply(tmp, dst_a, out=p.outa)
+    np.multiply(src_a, 255, out=tmp)
+    p.outa += tmp
+    # coef1 = src_a * 255 * 255 * 128 / outa255 (outa255 ist 0 nur bei src_a == 0)
+    np.maximum(p.outa, 1, out=tmp)
+    np.multiply(src_a, 255 * 255 * 128, out=p.coef1)
+    np.floor_divide(p.coef1, tmp, out=p.coef1)
+    np.subtract(255 * 128, p.coef1, out=p.coef2)
+
+    # Farbe für alle vier Kanäle rechnen (durchgehende Arrays sind am schnellsten),
+    # der Alpha-Kanal wird danach überschrieben
+    p.oben32 *= p.coef1
+    p.unten32 *= p.coef2
+    p.unten32 += p.oben32
+    p.unten32 += 0x80 << 7
+    _div255_inplace(p.unten32, p.tmp32)
+    p.unten32 >>= 7
+    np.add(p.outa, 0x80, out=dst_a)
+    _div255_inplace(dst_a, tmp)
+    np.copyto(unten, p.unten32, casting="unsafe")
+
+
+def _paste_inplace(pixel, p):
+    """
+    Entspricht totem_img.paste(teil, pos, teil) auf ein transparentes Ziel:
+    jeder Kanal wird mit dem Alpha des Teils gewichtet (Ergebnis in pixel).
+    """
+    np.copyto(p.unten32, pixel)
+    np.copyto(p.outa, p.unten32[:, 3:4])
+    p.unten32 *= p.outa
+    p.unten32 += 128
+    _div255_inplace(p.unten32, p.tmp32)
+    np.copyto(pixel, p.unten32, casting="unsafe")
+
+
+def skin_format(skin):
+    """
+    Erkennt das Skin-Format.
+
+    Returns:
+        (faktor, legacy): Skalierungsfaktor (128 Pixel Breite -> 2, 512 -> 8) und
+        ob es ein altes Skin im Format 2:1 (64x32) ist. Andere Größen gelten als
+        64x64-Skin mit Faktor 1 und werden zugeschnitten.
+    """
+    breite, hoehe = skin.size
+    faktor = breite // SKIN_SIZE
+    if faktor >= 1 and breite == faktor * SKIN_SIZE:
+        if hoehe == breite // 2:
+            return faktor, True
+        if hoehe == breite and faktor > 1:
+            return faktor, False
+    return 1, False
+
+
+def _verkleinern(teil, faktor):
+    """
+    Box-Filter (reduce) um einen ganzzahligen Faktor. Gemittelt wird mit
+    vormultipliziertem Alpha (RGBa), damit transparente Pixel keine Farbe
+    in ihre Nachbarn bluten.
+    """
+    if teil.getextrema()[3][0] == 255:
+        # Voll deckend: direkt mitteln, das ist exakt
+        return teil.reduce(faktor)
+    return teil.convert("RGBa").reduce(faktor).convert("RGBA")
+
+
+def _hd_skin_to_array(skin, faktor, hd):
+    """
+    Konvertiert nur die Bereiche aus SKIN_REGIONS statt des ganzen HD-Skins.
+    Mit hd=True bleiben die Bereiche in voller Auflösung, sonst werden sie
+    auf das 64er-Raster verkleinert.
+    """
+    ziel = faktor if hd else 1
+    seite = SKIN_SIZE * ziel
+    pixel = np.zeros((seite * seite + 1, 4), dtype=np.uint8)
+    flaeche = pixel[:-1].reshape(seite, seite, 4)
+    for x, y, w, h in SKIN_REGIONS:
+        teil = skin.crop((x * faktor, y * faktor, (x + w) * faktor, (y + h) * faktor))
+        if teil.mode != "RGBA":
+            teil = teil.convert("RGBA")
+        if not hd:
+            teil = _verkleinern(teil, faktor)
+        flaeche[y * ziel:(y + h) * ziel, x * ziel:(x + w) * ziel] = np.asarray(teil, dtype=np.uint8)
+    return pixel
+
+
+def _legacy_skin_to_array(skin, faktor, hd):
+    """
+    Bringt einen alten 2:1-Skin per legacy_table() auf das 64x64-Layout.
+    """
+    breite = SKIN_SIZE * faktor
+    alt = np.asarray(skin if skin.mode == "RGBA" else skin.convert("RGBA"), dtype=np.uint8)
+    alt = np.concatenate([alt.reshape(-1, 4), np.zeros((1, 4), dtype=np.uint8)])
+
+    # Komplett deckende Hut-Ebene gilt als leer (wie im Spiel)
+    x, y, w, h = (wert * faktor for wert in LEGACY_HUT)
+    hut = alt[:-1].reshape(breite // 2, breite, 4)[y:y + h, x:x + w]
+    if hut[..., 3].min() >= 128:
+        hut[..., 3] = 0
+
+    pixel = alt[legacy_table(faktor)]
+    if faktor > 1 and not hd:
+        teil = _verkleinern(Image.fromarray(pixel.reshape(breite, breite, 4)), faktor)
+        pixel = np.asarray(teil, dtype=np.uint8).reshape(-1, 4)
+    return np.concatenate([pixel, np.zeros((1, 4), dtype=np.uint8)])
+
+
+def skin_to_array(skin, hd=False):
+    """
+    Wandelt den Skin einmalig in ein flaches RGBA-Array ((64*s)²+1 x 4) um.
+    Das letzte Pixel ist transparent und dient als Ziel für leere Indizes.
+    Bereiche außerhalb des Bildes verhalten sich wie bei crop().
+
+    Alte 64x32-Skins (auch in HD) werden dabei auf das 64x64-Layout gebracht.
+
+    Args:
+        hd: HD-Skins in voller Auflösung behalten (s = Faktor aus skin_format),
+            sonst auf 64x64 verkleinern (s = 1)
+    """
+    faktor, legacy = skin_format(skin)
+    if legacy:
+        return _legacy_skin_to_array(skin, faktor, hd)
+    if faktor > 1:
+        return _hd_skin_to_array(skin, faktor, hd)
+    if skin.size != (SKIN_SIZE, SKIN_SIZE):
+        skin = skin.crop((0, 0, SKIN_SIZE, SKIN_SIZE))
+    if skin.mode != "RGBA":
+        skin = skin.convert("RGBA")
+    rgba = np.asarray(skin, dtype=np.uint8).reshape(-1, 4)
+    return np.concatenate([rgba, np.zeros((1, 4), dtype=np.uint8)])
+
+
+def pixel_scale(skin_pixel):
+    """
+    Skalierungsfaktor eines mit skin_to_array erzeugten Arrays.
+    """
+    return math.isqrt(len(skin_pixel) - 1) // SKIN_SIZE
+
+
+def detect_model(skin_pixel):
+    """
+    Erkennt das Arm-Modell eines mit skin_to_array erzeugten Arrays: "slim",
+    wenn alle Pixel aus SLIM_PROBE transparent sind, sonst "classic".
+    Prüft nur den Alpha-Kanal von 32*s² Pixeln.
+    """
+    index = _slim_probe_index(pixel_scale(skin_pixel))
+    return "classic" if skin_pixel[index, 3].any() else "slim"
+
+
+def resolve_profile(skin_pixel, profile):
+    """
+    Löst AUTO_PROFILE anhand des Arm-Modells in ein konkretes Profil auf,
+    andere Namen bleiben unverändert.
+    """
+    if profile == AUTO_PROFILE:
+        return MODEL_PROFILES[detect_model(skin_pixel)]
+    return profile
+
+
+def mapping_version(profile):
+    """
+    Version des Mappings hinter einem Profilnamen für Cache-Schlüssel:
+    Format-Version plus Hash der Profil-Inhalte. Bei AUTO_PROFILE zählen
+    alle Profile, zwischen denen die Erkennung wählt.
+
+    Raises:
+        UnknownProfile: kein Profil mit diesem Namen
+    """
+    namen = sorted(set(MODEL_PROFILES.values())) if profile == AUTO_PROFILE else [profile]
+    return (MAPPING_FORMAT_VERSION, tuple(PROFILES.get(name).digest for name in namen))
+
+
+def render_array(skin_pixel, overlay, outline=None, profile=DEFAULT_PROFILE, second_layer=False):
+    """
+    Rendert das Totem aus einem mit skin_to_array erzeugten Array.
+
+    Args:
+        skin_pixel: RGBA-Array des Skins inkl. transparentem Zusatzpixel
+        overlay: Kopf-Overlay anwenden
+        outline: optionales RGBA-Array (32*32 x 4) der Outline,
+            bei HD-Totems wird es per Nearest-Neighbor vergrößert
+        profile: Name des Mapping-Profils (siehe PROFILES) oder AUTO_PROFILE
+        second_layer: zweite Ebene von Körper und Armen (Jacke, Ärmel) anwenden.
+            Alle Overlays liegen in einer Tabelle und werden gemeinsam in
+            einem einzigen Composite-Schritt aufgelegt.
+
+    Returns:
+        RGBA-Array (32*s x 32*s x 4, uint8), s = pixel_scale(skin_pixel)
+    """
+    faktor = pixel_scale(skin_pixel)
+    basis_index, overlay_index = mapping_tables(
+        faktor, resolve_profile(skin_pixel, profile), overlay, second_layer
+    )
+    # Alle Zwischenschritte laufen in den Puffern des Threads,
+    # neu angelegt wird nur das zurückgegebene Array
+    p = _arbeitspuffer(len(basis_index))
+    totem = p.totem
+    np.take(skin_pixel, basis_index, axis=0, out=totem)
+    if overlay or second_layer:
+        np.take(skin_pixel, overlay_index, axis=0, out=p.oben)
+        _composite_inplace(totem, p.oben, p)
+    _paste_inplace(totem, p)
+    if outline is not None:
+        if faktor > 1:
+            outline = outline.reshape(TOTEM_SIZE, TOTEM_SIZE, 4)
+            outline = outline.repeat(faktor, axis=0).repeat(faktor, axis=1).reshape(-1, 4)
+        _composite_inplace(totem, outline, p)
+    seite = TOTEM_SIZE * faktor
+    return totem.reshape(seite, seite, 4).copy()
+
+
+@dataclass(frozen=True)
+class RenderOptions:
+    """
+    Optionen für render()
+
+    Attributes:
+        overlay: Kopf-Overlay (zweite Ebene) über den Kopf legen
+        outline: Name des Outline-Stils aus LAYERS ("default" = outline.png),
+            None für keine Outline
+        hd: HD-Skins als HD-Totem (32*Faktor Pixel) rendern statt als 32x32
+        profile: Name des Mapping-Profils aus PROFILES (profiles/*.json) oder
+            AUTO_PROFILE: "classic" bzw. "slim" je nach Arm-Modell des Skins
+        second_layer: zweite Ebene von Körper und Armen (Jacke, Ärmel)
+    """
+    overlay: bool = True
+    outline: Optional[str] = "default"
+    hd: bool = False
+    profile: str = AUTO_PROFILE
+    second_layer: bool = False
+
+
+def render(skin, options=None):
+    """
+    Erzeugt aus einem Minecraft-Skin ein Totem-Bild (32x32, bei options.hd
+    und HD-Skins 32*Faktor).
+
+    Args:
+        skin: PIL.Image des Skins (beliebiger Modus)
+        options: RenderOptions, Standard: RenderOptions()
+
+    Returns:
+        PIL.Image im Modus RGBA
+    """
+    if options is None:
+        options = RenderOptions()
+    return render_pixels(skin_to_array(skin, options.hd), options)
+
+
+def render_pixels(skin_pixel, options=None):
+    """
+    Wie render(), aber für einen bereits mit skin_to_array dekodierten Skin.
+    """
+    if options is None:
+        options = RenderOptions()
+    outline = LAYERS.get(options.outline) if options.outline else None
+    totem = render_array(skin_pixel, options.overlay, outline, options.profile, options.second_layer)
+    return Image.fromarray(totem)
+
+
+def generate_totem_image(uploaded_image, overlay):
+    """
+    Erzeugt aus einem Minecraft-Skin-Bild (uploaded_image) und Overlay-Flag ein Totem-Bild (32x32).
+    Gibt ein PIL.Image-Objekt zurück.
+    """
+    return render(uploaded_image, RenderOptions(overlay=overlay))
@@ -15,8 +15,52 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from PIL import Image, ImageTk
 import os
-from pathlib import Path
-import winsound
+import queue
+import threading
+
+from preview_cache import PreviewCache, integer_fit
+from render_worker import RenderWorker
+from totem_core import AUTO_PROFILE, PROFILES, RenderOptions, render
+from watch import SkinWatcher
+
+# winsound gibt es nur unter Windows
+try:
+    import winsound
+except ImportError:
+    winsound = None
+
+# Abfrage-Intervall für Ergebnisse des Worker-Threads (ca. 60 Bilder pro Sekunde)
+POLL_INTERVAL_MS = 16
+# Wartezeit nach dem letzten Resize-Ereignis, bevor die Vorschau neu berechnet wird
+RESIZE_DELAY_MS = 120
+# Vergrößerung der Totem-Vorschau (32x32 -> 160x160)
+TOTEM_PREVIEW_SCALE = 5
+
+
+# --- Arbeitsfunktionen für den Worker-Thread (ohne tkinter) ---
+
+def load_skin_file(file_path):
+    """
+    Lädt eine Skin-Datei vollständig in den Speicher.
+
+    Returns:
+        (file_path, PIL.Image)
+    """
+    image = Image.open(file_path)
+    image.load()
+    return file_path, image
+
+
+def render_totem(image, options):
+    """
+    Rendert das Totem und die große Export-Variante (256x256).
+
+    Returns:
+        (totem, totem_256)
+    """
+    totem_img = render(image, options)
+    return totem_img, totem_img.resize((256, 256), Image.NEAREST)
+
 
 class TotemGenerator:
     """
@@ -44,6 +88,28 @@ class TotemGenerator:
         self.image_path = None
         self.preview_image = None
         
+        # Mapping-Profil (profiles/*.json), wählbar unter "Einstellungen"
+        self.profile_var = tk.StringVar(value=AUTO_PROFILE)
+        
+        # Laden, Vorschau und Rendern laufen im Worker-Thread
+        self.worker = RenderWorker()
+        self.worker_handlers = {
+            "load": self.on_image_loaded,
+            "preview": self.on_preview_scaled,
+            "render": self.on_totem_rendered,
+        }
+        self.preview_mode = None  # "skin" oder "totem"
+        self.resize_job = None
+        
+        # Skalierte Vorschaubilder und das gerade angezeigte Bild samt Canvas-Objekt
+        self.preview_cache = PreviewCache()
+        self.preview_item = None
+        self.preview_shown = None
+        
+        # Ordner-Überwachung (eigener Thread, Berichte über eine Queue)
+        self.watch_stop = None
+        self.watch_reports = queue.Queue()
+        
         # Info-Label für Advancement-Style Hinweise
         self.info_label = tk.Label(self.root, text="", font=("Arial", 12, "bold"), fg="#fff", bg="#333", bd=2, relief=tk.RIDGE)
         self.info_label.place(relx=0.5, rely=0.02, anchor="n")
@@ -52,6 +118,10 @@ class TotemGenerator:
         # GUI erstellen
         self.setup_gui()
         
+        # Ergebnisse des Workers regelmäßig abholen
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after(POLL_INTERVAL_MS, self.poll_worker)
+        
     def disable_windows_sounds(self):
         """
         Deaktiviert Windows-System-Sounds für messagebox-Dialoge
@@ -83,6 +153,29 @@ class TotemGenerator:
         self.info_label.lift()
         self.info_label.after(2500, lambda: self.info_label.lower())
     
+    def poll_worker(self):
+        """
+        Holt fertige Ergebnisse des Worker-Threads ab und plant den nächsten Aufruf.
+        Läuft im Haupt-Thread, nur hier werden Widgets aktualisiert.
+        """
+        for kind, ergebnis, fehler in self.worker.poll():
+            self.worker_handlers[kind](ergebnis, fehler)
+        while True:
+            try:
+                bericht = self.watch_reports.get_nowait()
+            except queue.Empty:
+                break
+            self.on_watch_report(bericht)
+        self.root.after(POLL_INTERVAL_MS, self.poll_worker)
+    
+    def on_close(self):
+        """
+        Beendet den Worker-Thread und schließt das Fenster
+        """
+        self.stop_watch()
+        self.worker.close()
+        self.root.destroy()
+    
     def setup_gui(self):
         """
         Erstellt die Benutzeroberfläche mit allen Widgets
@@ -154,6 +247,24 @@ class TotemGenerator:
             variable=self.overlay_var
         )
         overlay_check.grid(row=1, column=2, padx=(10, 0))
+
+        # Checkbox für die zweite Ebene von Körper und Armen
+        self.second_layer_var = tk.BooleanVar(value=False)
+        second_layer_check = ttk.Checkbutton(
+            upload_frame,
+            text="Jacke/Ärmel",
+            variable=self.second_layer_var
+        )
+        second_layer_check.grid(row=1, column=3, padx=(10, 0))
+
+        # Checkbox für HD-Totems (nur bei HD-Skins wirksam)
+        self.hd_var = tk.BooleanVar(value=False)
+        hd_check = ttk.Checkbutton(
+            upload_frame,
+            text="HD-Totem",
+            variable=self.hd_var
+        )
+        hd_check.grid(row=1, column=4, padx=(10, 0))
         
         # Grid-Konfiguration
         upload_frame.columnconfigure(0, weight=1)
@@ -179,6 +290,7 @@ class TotemGenerator:
             bd=1
         )
         self.preview_canvas.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.preview_canvas.bind("<Configure>", self.on_canvas_resize)
         
         # Scrollbar für die Vorschau
         v_scrollbar = ttk.Scrollbar(preview_frame, orient=tk.VERTICAL, command=self.preview_canvas.yview)
@@ -239,7 +351,15 @@ class TotemGenerator:
             text="Einstellungen", 
             command=self.open_settings
         )
-        settings_btn.grid(row=0, column=3)
+        settings_btn.grid(row=0, column=3, padx=(0, 10))
+        
+        # Ordner überwachen Button
+        self.watch_btn = ttk.Button(
+            button_frame,
+            text="Ordner überwachen",
+            command=self.toggle_watch
+        )
+        self.watch_btn.grid(row=0, column=4)
         
     def upload_image(self):
         """
@@ -267,13 +387,47 @@ class TotemGenerator:
                 
     def load_and_validate_image(self, file_path):
         """
-        Lädt und validiert das hochgeladene Bild
+        Startet das Laden des Bildes im Worker-Thread. Ältere Aufträge
+        (Laden, Vorschau, Rendern) des vorherigen Skins werden verworfen.
         
         Args:
             file_path: Pfad zur Bilddatei
         """
-        # Bild mit Pillow laden
-        image = Image.open(file_path)
+        self.worker.cancel()
+        self.generate_btn.config(state=tk.DISABLED)
+        self.path_var.set(f"Lade: {os.path.basename(file_path)} ...")
+        self.worker.submit("load", load_skin_file, file_path)
+        
+    def restore_generate_btn(self):
+        """
+        Aktiviert den Generate-Button, solange ein Skin geladen ist
+        (z.B. wenn das Laden eines neuen Skins fehlschlägt)
+        """
+        self.generate_btn.config(state=tk.NORMAL if self.uploaded_image is not None else tk.DISABLED)
+        
+    def show_current_path(self):
+        """
+        Zeigt wieder die Datei des aktuell geladenen Skins an
+        """
+        if self.uploaded_image is None:
+            self.path_var.set("Keine Datei ausgewählt")
+        else:
+            self.path_var.set(f"Ausgewählte Datei: {os.path.basename(self.image_path)}")
+        
+    def on_image_loaded(self, ergebnis, fehler):
+        """
+        Validiert das im Worker geladene Bild und übernimmt es in die GUI
+        """
+        if fehler is not None:
+            self.show_current_path()
+            self.restore_generate_btn()
+            self.show_silent_message(
+                "Fehler", 
+                f"Fehler beim Laden der Datei:\n{str(fehler)}",
+                "error"
+            )
+            return
+        file_path, image = ergebnis
         
         # Überprüfen ob es sich um ein gültiges Minecraft-Skin-Format handelt
         width, height = image.size
@@ -291,6 +445,8 @@ class TotemGenerator:
                 "yesno"
             )
             if not result:
+                self.show_current_path()
+                self.restore_generate_btn()
                 return
         
         # Bild speichern und GUI aktualisieren
@@ -310,64 +466,114 @@ class TotemGenerator:
             "info"
         )
         
-    def update_preview(self):
+    def canvas_size(self):
         """
-        Aktualisiert die Bildvorschau im Canvas
+        Aktuelle Größe des Vorschau-Canvas (400x400, solange er noch nicht angezeigt wird)
         """
-        if self.uploaded_image is None:
-            return
-            
-        # Canvas leeren
-        self.preview_canvas.delete("all")
-        
-        # Bild für Vorschau skalieren
         canvas_width = self.preview_canvas.winfo_width()
         canvas_height = self.preview_canvas.winfo_height()
-        
         if canvas_width <= 1:  # Canvas noch nicht gerendert
             canvas_width, canvas_height = 400, 400
-            
-        # Bild proportional skalieren
-        img_width, img_height = self.uploaded_image.size
-        scale = min(canvas_width / img_width, canvas_height / img_height, 1.0)
+        return canvas_width, canvas_height
         
-        new_width = int(img_width * scale)
-        new_height = int(img_height * scale)
+    def update_preview(self):
+        """
+        Aktualisiert die Bildvorschau im Canvas. Der Skin wird ganzzahlig mit
+        Nearest-Neighbor skaliert; ist die Größe noch nicht im Cache, skaliert
+        der Worker-Thread und on_preview_scaled() zeigt das Ergebnis an.
+        """
+        if self.uploaded_image is None:
+            return
+        self.preview_mode = "skin"
+        size = integer_fit(*self.uploaded_image.size, *self.canvas_size())
+        preview_img = self.preview_cache.get(self.uploaded_image, size)
+        if preview_img is not None:
+            self.show_preview_image(preview_img)
+            return
+        self.worker.submit("preview", self.preview_cache.scaled, self.uploaded_image, size)
         
-        # Bild skalieren
-        preview_img = self.uploaded_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+    def on_preview_scaled(self, ergebnis, fehler):
+        """
+        Zeigt die im Worker skalierte Vorschau an
+        """
+        if fehler is not None or self.preview_mode != "skin":
+            return
+        self.show_preview_image(ergebnis)
         
-        # Für tkinter konvertieren
-        self.preview_image = ImageTk.PhotoImage(preview_img)
+    def show_preview_image(self, preview_img):
+        """
+        Zeigt ein fertig skaliertes Bild zentriert im Canvas an. Das
+        PhotoImage und das Canvas-Objekt werden wiederverwendet, solange
+        die Größe gleich bleibt.
+        """
+        canvas_width, canvas_height = self.canvas_size()
+        x = (canvas_width - preview_img.width) // 2
+        y = (canvas_height - preview_img.height) // 2
+        if (self.preview_shown is not None and self.preview_shown[0] is preview_img
+                and self.preview_shown[1:] == (x, y)):
+            return
         
-        # Bild im Canvas anzeigen
-        x = (canvas_width - new_width) // 2
-        y = (canvas_height - new_height) // 2
+        # Für tkinter konvertieren (bei gleicher Größe nur die Pixel ersetzen)
+        if (self.preview_image is not None
+                and (self.preview_image.width(), self.preview_image.height()) == preview_img.size):
+            self.preview_image.paste(preview_img)
+        else:
+            self.preview_image = ImageTk.PhotoImage(preview_img)
         
-        self.preview_canvas.create_image(x, y, anchor=tk.NW, image=self.preview_image)
+        # Bild im Canvas anzeigen
+        if self.preview_item is None:
+            self.preview_item = self.preview_canvas.create_image(x, y, anchor=tk.NW, image=self.preview_image)
+        else:
+            self.preview_canvas.coords(self.preview_item, x, y)
+            self.preview_canvas.itemconfig(self.preview_item, image=self.preview_image)
+        self.preview_shown = (preview_img, x, y)
         
         # Canvas-Scrollregion setzen
         self.preview_canvas.configure(scrollregion=self.preview_canvas.bbox("all"))
         
+    def on_canvas_resize(self, event=None):
+        """
+        Zeichnet die Vorschau nach einer Größenänderung neu, aber erst wenn
+        für RESIZE_DELAY_MS keine weitere Änderung kam.
+        """
+        if self.resize_job is not None:
+            self.root.after_cancel(self.resize_job)
+        self.resize_job = self.root.after(RESIZE_DELAY_MS, self.refresh_preview)
+        
+    def refresh_preview(self):
+        """
+        Zeichnet die aktuelle Vorschau (Skin oder Totem) für die neue Canvas-Größe
+        """
+        self.resize_job = None
+        if self.preview_mode == "totem" and getattr(self, 'small_totem_img', None) is not None:
+            self.show_totem_preview(self.small_totem_img)
+        elif self.preview_mode == "skin":
+            self.update_preview()
+        
     def clear_image(self):
         """
         Löscht das aktuell geladene Bild
         """
+        self.worker.cancel()
         self.uploaded_image = None
         self.image_path = None
         self.preview_image = None
+        self.preview_mode = None
         self.path_var.set("Keine Datei ausgewählt")
         
-        # Canvas leeren
+        # Canvas und Vorschau-Cache leeren
         self.preview_canvas.delete("all")
+        self.preview_item = None
+        self.preview_shown = None
+        self.preview_cache.clear()
         
         # Generate-Button deaktivieren
         self.generate_btn.config(state=tk.DISABLED)
         
     def generate_totem(self):
         """
-        Generiert die Totem-Textur für Kopf und beide Arme mit flexiblem Mapping.
-        Die Arme werden ohne Resizing direkt aus der Skin-Textur ausgeschnitten und ins Totem eingefügt.
+        Generiert die Totem-Textur für Kopf, Arme und Körper.
+        Das Mapping liegt in totem_core und wird mit der Web-Version geteilt.
         """
         if self.uploaded_image is None:
             self.show_silent_message(
@@ -377,196 +583,37 @@ class TotemGenerator:
             )
             return
 
-        # --- 1. Mapping-Parameter für Kopf und Arme definieren ---
-        mapping = {
-            "kopf": {
-                "skin": [8, 8, 8, 8],  # Bereich im Skin: x, y, Breite, Höhe
-                "totem": [8, 1, 16, 16],  # Zielbereich im Totem: x, y, Breite, Höhe (hier: ganzes Bild)
-                "resize": "nearest",  # Vergrößern mit Nachbarpixel (Nearest-Neighbor)
-                "crop": [
-                    [0, 0, 15, 0],
-                    [0, 1],
-                    [1, 1],
-                    [14, 1],
-                    [15, 1],
-                    [0, 2],
-                    [15, 2],
-                    [0, 15, 15, 15]  # oben die pixel weg
-                ]
-            },
-            "arm_links": {
-                "skin": [44, 20, 3, 9],
-                "totem": [8, 17, 3, 9],
-                "resize": None,
-                "crop": []
-            },
-            "arm_rechts": {
-                "skin": [36, 52, 3, 9],
-                "totem": [21, 17, 3, 9],
-                "resize": None,
-                "crop": []
-            },
-            "koerper": {
-                # Beispiel-Koordinaten für den Körper (Standard-Skin: [20, 20, 8, 12])
-                "skin": [20, 20, 8, 12],
-                # Zielposition und -größe im Totem (z.B. mittig unter dem Kopf)
-                "totem": [12, 16, 8, 12],
-                "resize": None,
-                "crop": []
-            }
-        }
-
-        # --- 2. Leeres Totem-Bild mit 32x32 Pixel erstellen ---
-        totem_img = Image.new("RGBA", (32, 32), (0, 0, 0, 0))
-
-        # --- 3. Kopf generieren (wie bisher) ---
-        kopf = mapping["kopf"]
-        sx, sy, sw, sh = kopf["skin"]
-        kopf_img = self.uploaded_image.crop((sx, sy, sx+sw, sy+sh))
-        if kopf["resize"] == "nearest":
-            ziel_w, ziel_h = kopf["totem"][2], kopf["totem"][3]
-            kopf_img = kopf_img.resize((ziel_w, ziel_h), Image.NEAREST)
-        kopf_img = kopf_img.convert("RGBA")
-        pixels = kopf_img.load()
-        for crop in kopf["crop"]:
-            if len(crop) == 4:
-                x1, y1, x2, y2 = crop
-                for x in range(x1, x2+1):
-                    for y in range(y1, y2+1):
-                        if 0 <= x < kopf_img.width and 0 <= y < kopf_img.height:
-                            pixels[x, y] = (0, 0, 0, 0)
-            elif len(crop) == 2:
-                x, y = crop
-                if 0 <= x < kopf_img.width and 0 <= y < kopf_img.height:
-                    pixels[x, y] = (0, 0, 0, 0)
-
-        # --- Kopf-Overlay extrahieren, vergrößern und croppen (wie Kopf) ---
-        if self.overlay_var.get():
-            overlay_img = self.uploaded_image.crop((40, 8, 40+8, 8+8))
-            if kopf["resize"] == "nearest":
-                overlay_img = overlay_img.resize((ziel_w, ziel_h), Image.NEAREST)
-            overlay_img = overlay_img.convert("RGBA")
-            overlay_pixels = overlay_img.load()
-            for crop in kopf["crop"]:
-                if len(crop) == 4:
-                    x1, y1, x2, y2 = crop
-                    for x in range(x1, x2+1):
-                        for y in range(y1, y2+1):
-                            if 0 <= x < overlay_img.width and 0 <= y < overlay_img.height:
-                                overlay_pixels[x, y] = (0, 0, 0, 0)
-                elif len(crop) == 2:
-                    x, y = crop
-                    if 0 <= x < overlay_img.width and 0 <= y < overlay_img.height:
-                        overlay_pixels[x, y] = (0, 0, 0, 0)
-            # Overlay über den Kopf legen
-            kopf_img = Image.alpha_composite(kopf_img, overlay_img)
-
-        tx, ty = kopf["totem"][0], kopf["totem"][1]
-        totem_img.paste(kopf_img, (tx, ty), kopf_img)
-
-        # --- 4. Linken Arm generieren und einfügen ---
-        arm_l = mapping["arm_links"]
-        sx, sy, sw, sh = arm_l["skin"]
-        arm_l_img = self.uploaded_image.crop((sx, sy, sx+sw, sy+sh))
-        arm_l_img = arm_l_img.convert("RGBA")
-        # Optionales Cropping für den Arm (wie beim Kopf)
-        pixels = arm_l_img.load()
-        for crop in arm_l["crop"]:
-            if len(crop) == 4:
-                x1, y1, x2, y2 = crop
-                for x in range(x1, x2+1):
-                    for y in range(y1, y2+1):
-                        if 0 <= x < arm_l_img.width and 0 <= y < arm_l_img.height:
-                            pixels[x, y] = (0, 0, 0, 0)
-            elif len(crop) == 2:
-                x, y = crop
-                if 0 <= x < arm_l_img.width and 0 <= y < arm_l_img.height:
-                    pixels[x, y] = (0, 0, 0, 0)
-        tx, ty = arm_l["totem"][0], arm_l["totem"][1]
-        totem_img.paste(arm_l_img, (tx, ty), arm_l_img)
-
-        # --- 5. Rechten Arm generieren und einfügen ---
-        arm_r = mapping["arm_rechts"]
-        sx, sy, sw, sh = arm_r["skin"]
-        arm_r_img = self.uploaded_image.crop((sx, sy, sx+sw, sy+sh))
-        arm_r_img = arm_r_img.convert("RGBA")
-        # Optionales Cropping für den Arm (wie beim Kopf)
-        pixels = arm_r_img.load()
-        for crop in arm_r["crop"]:
-            if len(crop) == 4:
-                x1, y1, x2, y2 = crop
-                for x in range(x1, x2+1):
-                    for y in range(y1, y2+1):
-                        if 0 <= x < arm_r_img.width and 0 <= y < arm_r_img.height:
-                            pixels[x, y] = (0, 0, 0, 0)
-            elif len(crop) == 2:
-                x, y = crop
-                if 0 <= x < arm_r_img.width and 0 <= y < arm_r_img.height:
-                    pixels[x, y] = (0, 0, 0, 0)
-        tx, ty = arm_r["totem"][0], arm_r["totem"][1]
-        totem_img.paste(arm_r_img, (tx, ty), arm_r_img)
-
-        # --- 6. Körper generieren und einfügen ---
-        koerper = mapping["koerper"]
-        sx, sy, sw, sh = koerper["skin"]
-        koerper_img = self.uploaded_image.crop((sx, sy, sx+sw, sy+sh))
-        koerper_img = koerper_img.convert("RGBA")
-        # Optionales Cropping für den Körper
-        pixels = koerper_img.load()
-        for crop in koerper["crop"]:
-            if len(crop) == 4:
-                x1, y1, x2, y2 = crop
-                for x in range(x1, x2+1):
-                    for y in range(y1, y2+1):
-                        if 0 <= x < koerper_img.width and 0 <= y < koerper_img.height:
-                            pixels[x, y] = (0, 0, 0, 0)
-            elif len(crop) == 2:
-                x, y = crop
-                if 0 <= x < koerper_img.width and 0 <= y < koerper_img.height:
-                    pixels[x, y] = (0, 0, 0, 0)
-        tx, ty = koerper["totem"][0], koerper["totem"][1]
-        totem_img.paste(koerper_img, (tx, ty), koerper_img)
-
-        # --- 7. Spezielle Pixel-Kopieraktionen für den Körper (Feinschliff) ---
-        # 1. Pixel von (10, 17) nach (10, 16) kopieren
-        px = totem_img.getpixel((10, 17))
-        totem_img.putpixel((10, 16), px)
-
-        # 2. Vertikale Reihe von (12, 16)-(12, 26) nach (11, 16)-(11, 26) kopieren (links)
-        for y in range(16, 27):
-            px = totem_img.getpixel((12, y))
-            totem_img.putpixel((11, y), px)
-
-        # 3. Vertikale Reihe von (19, 16)-(19, 26) nach (20, 16)-(20, 26) kopieren (rechts)
-        for y in range(16, 27):
-            px = totem_img.getpixel((19, y))
-            totem_img.putpixel((20, y), px)
-
-        # 4. Pixel von (21, 17) nach (21, 16) kopieren (rechte Seite)
-        px = totem_img.getpixel((21, 17))
-        totem_img.putpixel((21, 16), px)
+        # --- 1. Totem mit der gemeinsamen Render-Engine im Worker erzeugen ---
+        options = RenderOptions(
+            overlay=self.overlay_var.get(),
+            hd=self.hd_var.get(),
+            profile=self.profile_var.get(),
+            second_layer=self.second_layer_var.get(),
+        )
+        self.worker.cancel("preview")
+        self.preview_mode = "totem"
+        self.generate_btn.config(state=tk.DISABLED)
+        self.worker.submit("render", render_totem, self.uploaded_image, options)
 
-        # --- 8. Outline laden und drüberlegen, falls vorhanden ---
-        outline_path = Path("outline.png")
-        if outline_path.exists():
-            try:
-                outline_img = Image.open(outline_path).convert("RGBA")
-                if outline_img.size != (32, 32):
-                    outline_img = outline_img.resize((32, 32), Image.NEAREST)
-                totem_img = Image.alpha_composite(totem_img, outline_img)
-            except Exception as e:
-                self.show_silent_message(
-                    "Warnung", f"Outline konnte nicht geladen werden: {e}", "warning"
-                )
+    def on_totem_rendered(self, ergebnis, fehler):
+        """
+        Übernimmt das im Worker gerenderte Totem
+        """
+        self.restore_generate_btn()
+        if fehler is not None:
+            self.show_silent_message("Fehler", f"Fehler beim Generieren: {fehler}", "error")
+            return
+        totem_img, large_totem_img = ergebnis
 
-        # --- 9. Großes Totem-Bild (256x256) für Export erzeugen ---
-        self.large_totem_img = totem_img.resize((256, 256), Image.NEAREST)
-        self.small_totem_img = totem_img.copy()
+        # --- 2. Großes Totem-Bild (256x256) für Export übernehmen ---
+        self.large_totem_img = large_totem_img
+        self.small_totem_img = totem_img
 
-        # --- 10. Vorschau aktualisieren ---
+        # --- 3. Vorschau aktualisieren ---
+        self.preview_mode = "totem"
         self.show_totem_preview(totem_img)
 
-        # --- 11. Erfolgsmeldung und Save-Buttons aktivieren ---
+        # --- 4. Erfolgsmeldung und Save-Buttons aktivieren ---
         self.save_btn.config(state=tk.NORMAL)
         self.save32_btn.config(state=tk.NORMAL)
         self.show_silent_message(
@@ -579,33 +626,107 @@ class TotemGenerator:
         """
         Zeigt das generierte Totem-Bild in der Vorschau an.
         Das Bild wird für die Vorschau um den Faktor 5 (auf 160x160) mit Nearest-Neighbor vergrößert,
-        damit die Pixel klar erkennbar bleiben. Die Vorschau bleibt zentriert im Canvas.
+        damit die Pixel klar erkennbar bleiben; HD-Totems nur um ganze Faktoren bis 160x160.
+        Die Vorschau bleibt zentriert im Canvas.
         """
-        # Canvas leeren
-        self.preview_canvas.delete("all")
-        canvas_width = self.preview_canvas.winfo_width()
-        canvas_height = self.preview_canvas.winfo_height()
+        seite = 32 * TOTEM_PREVIEW_SCALE
+        size = integer_fit(*totem_img.size, seite, seite)
+        self.show_preview_image(self.preview_cache.scaled(totem_img, size))
+
+    def toggle_watch(self):
+        """
+        Startet oder beendet die Überwachung eines Skin-Ordners. Geänderte
+        Skins werden automatisch neu gerendert (siehe watch.py).
+        """
+        if self.watch_stop is not None:
+            self.stop_watch()
+            self.show_silent_message("Info", "Ordner-Überwachung beendet.", "info")
+            return
         
-        # Bild für die Vorschau um den Faktor 5 vergrößern (Nearest-Neighbor)
-        scale = 5
-        preview_img = totem_img.resize((32 * scale, 32 * scale), Image.NEAREST)
+        source = filedialog.askdirectory(title="Skin-Ordner zum Überwachen auswählen")
+        if not source:
+            return
+        output = filedialog.askdirectory(title="Zielordner für die Totems auswählen")
+        if not output:
+            return
         
-        # Bild zentriert im Canvas anzeigen
-        x = (canvas_width - 32 * scale) // 2
-        y = (canvas_height - 32 * scale) // 2
-        self.preview_image = ImageTk.PhotoImage(preview_img)
-        self.preview_canvas.create_image(x, y, anchor=tk.NW, image=self.preview_image)
-        self.preview_canvas.configure(scrollregion=self.preview_canvas.bbox("all"))
+        options = RenderOptions(
+            overlay=self.overlay_var.get(),
+            hd=self.hd_var.get(),
+            profile=self.profile_var.get(),
+            second_layer=self.second_layer_var.get(),
+        )
+        watcher = SkinWatcher(source, output, options)
+        self.watch_stop = threading.Event()
+        threading.Thread(
+            target=watcher.run,
+            kwargs={"stop_event": self.watch_stop, "on_scan": self.watch_reports.put},
+            name="totem-watch",
+            daemon=True,
+        ).start()
+        self.watch_btn.config(text="Überwachung stoppen")
+        self.show_silent_message("Info", f"Überwache {os.path.basename(source)} ...", "info")
+        
+    def stop_watch(self):
+        """
+        Beendet die Ordner-Überwachung (der laufende Durchlauf wird noch abgeschlossen)
+        """
+        if self.watch_stop is not None:
+            self.watch_stop.set()
+            self.watch_stop = None
+            self.watch_btn.config(text="Ordner überwachen")
+        
+    def on_watch_report(self, bericht):
+        """
+        Meldet neu gerenderte Skins und Fehler der Ordner-Überwachung
+        """
+        if bericht["errors"]:
+            rel, fehler = next(iter(bericht["errors"].items()))
+            self.show_silent_message("Fehler", f"{rel}: {fehler}", "error")
+        elif bericht["rendered"]:
+            anzahl = len(bericht["rendered"])
+            self.show_silent_message("Erfolg", f"{anzahl} Totem(s) aktualisiert", "info")
 
     def open_settings(self):
         """
-        Öffnet die Einstellungen (Platzhalter für später)
+        Öffnet die Einstellungen: Auswahl des Mapping-Profils.
+        Eigene Profile werden als JSON-Datei im Ordner profiles/ abgelegt.
         """
-        self.show_silent_message(
-            "Einstellungen", 
-            "Einstellungen werden in einer späteren Version verfügbar sein.\n"
-            "Hier können Sie später die Cropping-Parameter anpassen.",
-            "info"
+        fenster = tk.Toplevel(self.root)
+        fenster.title("Einstellungen")
+        fenster.transient(self.root)
+        fenster.resizable(False, False)
+        
+        frame = ttk.Frame(fenster, padding="10")
+        frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        
+        ttk.Label(frame, text="Mapping-Profil:").grid(row=0, column=0, sticky=tk.W, padx=(0, 10))
+        profile_box = ttk.Combobox(
+            frame,
+            textvariable=self.profile_var,
+            values=[AUTO_PROFILE] + PROFILES.names(),
+            state="readonly"
+        )
+        profile_box.grid(row=0, column=1, sticky=(tk.W, tk.E))
+        
+        # Beschreibung des gewählten Profils
+        beschreibung = tk.StringVar()
+        ttk.Label(frame, textvariable=beschreibung, wraplength=300).grid(
+            row=1, column=0, columnspan=2, sticky=tk.W, pady=(10, 0)
+        )
+        
+        def profil_gewaehlt(event=None):
+            name = self.profile_var.get()
+            if name == AUTO_PROFILE:
+                beschreibung.set("Arm-Modell (classic oder slim) wird aus dem Skin erkannt")
+            else:
+                beschreibung.set(PROFILES.get(name).description)
+        
+        profile_box.bind("<<ComboboxSelected>>", profil_gewaehlt)
+        profil_gewaehlt()
+        
+        ttk.Button(frame, text="Schließen", command=fenster.destroy).grid(
+            row=2, column=1, sticky=tk.E, pady=(10, 0)
         )
 
     def save_totem(self):
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ordner-Überwachung für Skins
+============================
+
+Überwacht einen Ordner mit Skins und rendert nur die Dateien neu, deren
+Inhalt sich geändert hat. Die Totems landen entweder als Spiegel des
+Quellordners im Zielordner oder, mit --pack, je Skin als fertiger
+Resourcepack-Ordner (z.B. direkt in .minecraft/resourcepacks).
+
+Änderungen werden per Polling erkannt. Ein Index (INDEX_NAME im Zielordner)
+speichert pro Skin mtime, Größe und Inhalts-Hash:
+
+- gleiche mtime und Größe: die Datei wird nicht einmal gelesen
+- geänderte mtime, aber gleicher Hash: nur der Index wird aktualisiert
+- sonst wird gerendert und die Ausgabe atomar ersetzt
+
+Der Index wird ebenfalls atomar geschrieben und übersteht einen Neustart,
+bei 10.000 unveränderten Skins kostet ein Durchlauf also nur stat()-Aufrufe.
+Ändern sich Render-Optionen, Outline oder Profil, wird alles neu gerendert;
+das wird bei jedem Durchlauf geprüft, also auch während der Überwachung.
+
+Verwendung:
+    python watch.py skins/ -o totems/
+    python watch.py skins/ -o ~/.minecraft/resourcepacks --pack
+    python watch.py skins/ -o totems/ --once
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import shutil
+import sys
+import threading
+from dataclasses import astuple
+from pathlib import Path
+
+from atomic_file import atomic_write
+from png_encoder import encode_png
+from skin_decoder import SkinDecodeError, decode_skin, read_limited
+from totem_core import AUTO_PROFILE, LAYERS, PROFILES, RenderOptions, mapping_version, render
+
+# Name der Index-Datei im Zielordner
+INDEX_NAME = ".totem_watch.json"
+# Version des Index-Formats; bei Änderung wird der Index verworfen
+INDEX_VERSION = 1
+# Sekunden zwischen zwei Durchläufen
+POLL_INTERVAL = 1.0
+# Pfad der Totem-Textur in einem Resourcepack
+PACK_TEXTURE = "assets/minecraft/textures/item/totem_of_undying.png"
+# pack.mcmeta für --pack
+WATCH_MCMETA = """{
+    "pack": {
+        "description": "Custom Totem",
+        "pack_format": 15,
+        "supported_formats": {
+          "min_inclusive": 15,
+          "max_inclusive": 99
+        }
+    }
+}"""
+
+logger = logging.getLogger("totem.watch")
+
+
+def content_hash(data):
+    """
+    Inhalts-Hash einer Skin-Datei (Hex-String).
+    """
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def options_key(options):
+    """
+    Schlüssel für Render-Optionen inkl. Outline- und Mapping-Version. Ändert
+    er sich, sind alle bisherigen Ausgaben veraltet.
+    """
+    outline_version = LAYERS.version(options.outline) if options.outline else None
+    return repr((astuple(options), outline_version, mapping_version(options.profile)))
+
+
+class SkinWatcher:
+    """
+    Rendert geänderte Skins eines Ordners, Zustand im persistenten Index
+    """
+
+    def __init__(self, source, output, options=None, pack=False):
+        """
+        Args:
+            source: Ordner mit Skins (*.png, auch in Unterordnern)
+            output: Zielordner
+            options: RenderOptions, Standard: RenderOptions()
+            pack: je Skin einen Resourcepack-Ordner statt einer PNG-Datei schreiben
+        """
+        self.source = Path(source)
+        self.output = Path(output)
+        self.options = options if options is not None else RenderOptions()
+        self.pack = pack
+        self.index_path = self.output / INDEX_NAME
+        self.options_key = options_key(self.options)
+        self.entries = self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                daten = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if (not isinstance(daten, dict) or daten.get("version") != INDEX_VERSION
+                or daten.get("pack") != self.pack or daten.get("options") != self.options_key):
+            return {}
+        entries = daten.get("entries")
+        return entries if isinstance(entries, dict) else {}
+
+    def save_index(self):
+        """
+        Schreibt den Index atomar in den Zielordner.
+        """
+        atomic_write(self.index_path, json.dumps({
+            "version": INDEX_VERSION,
+            "pack": self.pack,
+            "options": self.options_key,
+            "entries": self.entries,
+        }, indent=1, sort_keys=True))
+
+    def pack_dir(self, rel):
+        """
+        Resourcepack-Ordner eines Skins bei --pack. Unterordner werden mit "_"
+        zusammengefasst; verschiedene Skins können so denselben Ordner
+        ergeben (siehe _pack_collisions()).
+        """
+        return self.output / rel[:-len(".png")].replace("/", "_")
+
+    def target_path(self, rel):
+        """
+        Ausgabedatei für einen Skin (rel: Pfad relativ zum Quellordner).
+        """
+        if self.pack:
+            return self.pack_dir(rel) / PACK_TEXTURE
+        return self.output / rel
+
+    def _pack_collisions(self, rels):
+        """
+        Skins, deren Pack-Ordner schon zu einem anderen Skin gehört.
+        Der Ordner bleibt beim Skin, der ihn bereits erfolgreich belegt,
+        sonst beim ersten in Sortierreihenfolge.
+
+        Returns:
+            Dictionary rel -> rel des Skins, dem der Ordner gehört
+        """
+        gruppen = {}
+        for rel in rels:
+            gruppen.setdefault(self.pack_dir(rel), []).append(rel)
+        konflikte = {}
+        for gruppe in gruppen.values():
+            if len(gruppe) < 2:
+                continue
+            besitzer = [rel for rel in gruppe if rel in self.entries and not self.entries[rel].get("error")]
+            gewinner = besitzer[0] if besitzer else gruppe[0]
+            for rel in gruppe:
+                if rel != gewinner:
+                    konflikte[rel] = gewinner
+        return konflikte
+
+    def _iter_skins(self):
+        ausgabe = self.output.resolve()
+        for path in sorted(self.source.rglob("*.png")):
+            # Liegt der Zielordner im Quellordner, werden die Totems nicht als Skins gelesen
+            if ausgabe in path.resolve().parents:
+                continue
+            yield path.relative_to(self.source).as_posix(), path
+
+    def _render(self, daten):
+        return encode_png(render(decode_skin(daten), self.options)).data
+
+    def _write(self, rel, png):
+        atomic_write(self.target_path(rel), png)
+        if self.pack:
+            pack_dir = self.pack_dir(rel)
+            if not (pack_dir / "pack.mcmeta").exists():
+                atomic_write(pack_dir / "pack.mcmeta", WATCH_MCMETA)
+
+    def _remove(self, rel):
+        # Bei --pack den ganzen Pack-Ordner entfernen, kein leeres Pack zurücklassen
+        if self.pack:
+            shutil.rmtree(self.pack_dir(rel), ignore_errors=True)
+            return
+        try:
+            self.target_path(rel).unlink()
+        except OSError:
+            pass
+
+    def scan(self):
+        """
+        Ein Durchlauf über den Quellordner.
+
+        Returns:
+            Dictionary mit "rendered" (Liste), "unchanged" (Anzahl),
+            "removed" (Liste) und "errors" (rel -> Meldung)
+        """
+        bericht = {"rendered": [], "unchanged": 0, "removed": [], "errors": {}}
+        skins = list(self._iter_skins())
+        gesehen = {rel for rel, _ in skins}
+        konflikte = self._pack_collisions(rel for rel, _ in skins) if self.pack else {}
+        geaendert = False
+
+        # Outline oder Profil können sich zur Laufzeit ändern: dann alles neu rendern
+        key = options_key(self.options)
+        alles_neu = key != self.options_key
+        if alles_neu:
+            logger.info("Render-Optionen, Outline oder Profil geändert, alle Skins werden neu gerendert")
+            self.options_key = key
+            geaendert = True
+
+        for rel, path in skins:
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            eintrag = self.entries.get(rel)
+            if (not alles_neu and eintrag
+                    and eintrag["mtime_ns"] == st.st_mtime_ns and eintrag["size"] == st.st_size):
+                bericht["unchanged"] += 1
+                continue
+            if rel in konflikte:
+                # Erst nach der nächsten Änderung erneut prüfen
+                fehler = f"Pack-Ordner {self.pack_dir(rel).name} gehört schon zu {konflikte[rel]}"
+                self.entries[rel] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "hash": None, "error": fehler}
+                geaendert = True
+                bericht["errors"][rel] = fehler
+                continue
+
+            try:
+                with open(path, "rb") as f:
+                    daten = read_limited(f)
+            except OSError as e:
+                # Vermutlich wird die Datei gerade geschrieben: im nächsten Durchlauf erneut
+                bericht["errors"][rel] = str(e)
+                continue
+            except SkinDecodeError as e:
+                self.entries[rel] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "hash": None, "error": str(e)}
+                geaendert = True
+                bericht["errors"][rel] = str(e)
+                continue
+            digest = content_hash(daten)
+            neu = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "hash": digest}
+            geaendert = True
+
+            if not alles_neu and eintrag and eintrag["hash"] == digest and (
+                    eintrag.get("error") or self.target_path(rel).exists()):
+                # Nur angefasst, Inhalt gleich
+                if eintrag.get("error"):
+                    neu["error"] = eintrag["error"]
+                self.entries[rel] = neu
+                bericht["unchanged"] += 1
+                continue
+
+            try:
+                self._write(rel, self._render(daten))
+            except (SkinDecodeError, OSError, ValueError) as e:
+                # Fehlerhafte Skins erst nach der nächsten Änderung erneut versuchen
+                neu["error"] = str(e)
+                bericht["errors"][rel] = str(e)
+                logger.info("%s: %s", rel, e)
+            else:
+                bericht["rendered"].append(rel)
+            self.entries[rel] = neu
+
+        for rel in sorted(set(self.entries) - gesehen):
+            eintrag = self.entries.pop(rel)
+            geaendert = True
+            bericht["removed"].append(rel)
+            if not eintrag.get("error"):
+                self._remove(rel)
+
+        if geaendert:
+            self.save_index()
+        return bericht
+
+    def run(self, interval=POLL_INTERVAL, stop_event=None, on_scan=None):
+        """
+        Überwacht den Ordner, bis stop_event gesetzt ist.
+
+        Args:
+            interval: Sekunden zwischen zwei Durchläufen
+            stop_event: threading.Event zum Beenden (Standard: läuft endlos)
+            on_scan: optionale Funktion, die jeden Bericht von scan() bekommt
+        """
+        if stop_event is None:
+            stop_event = threading.Event()
+        while not stop_event.is_set():
+            bericht = self.scan()
+            if on_scan is not None:
+                on_scan(bericht)
+            stop_event.wait(interval)
+
+
+def print_report(bericht, datei=None, fehler_datei=None):
+    """
+    Gibt einen Bericht von SkinWatcher.scan() aus.
+
+    Args:
+        datei: Ziel für gerenderte und entfernte Skins (Standard: sys.stdout)
+        fehler_datei: Ziel für Fehler (Standard: sys.stderr)
+    """
+    datei = datei if datei is not None else sys.stdout
+    fehler_datei = fehler_datei if fehler_datei is not None else sys.stderr
+    for rel in bericht["rendered"]:
+        print(f"gerendert: {rel}", file=datei)
+    for rel in bericht["removed"]:
+        print(f"entfernt:  {rel}", file=datei)
+    for rel, fehler in bericht["errors"].items():
+        print(f"Fehler bei {rel}: {fehler}", file=fehler_datei)
+
+
+def main(argv=None):
+    """
+    Kommandozeilen-Einstiegspunkt
+    """
+    parser = argparse.ArgumentParser(description="Überwacht einen Skin-Ordner und rendert geänderte Skins.")
+    parser.add_argument("source", help="Ordner mit Skins")
+    parser.add_argument("-o", "--output", required=True, help="Zielordner")
+    parser.add_argument("--pack", action="store_true", help="je Skin einen Resourcepack-Ordner schreiben")
+    parser.add_argument("--once", action="store_true", help="nur einen Durchlauf ausführen")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL, help="Sekunden zwischen zwei Durchläufen")
+    parser.add_argument("--no-overlay", action="store_true", help="Kopf-Overlay weglassen")
+    parser.add_argument("--second-layer", action="store_true", help="Jacke und Ärmel (zweite Ebene) anwenden")
+    parser.add_argument("--hd", action="store_true", help="HD-Skins als HD-Totem rendern")
+    parser.add_argument("--profile", default=AUTO_PROFILE, choices=[AUTO_PROFILE] + PROFILES.names(),
+                        help=f"Mapping-Profil (Standard: {AUTO_PROFILE} = Arm-Modell erkennen)")
+    args = parser.parse_args(argv)
+
+    if not Path(args.source).is_dir():
+        parser.error(f"{args.source} ist kein Ordner")
+    options = RenderOptions(
+        overlay=not args.no_overlay, hd=args.hd, profile=args.profile, second_layer=args.second_layer
+    )
+    watcher = SkinWatcher(args.source, args.output, options, pack=args.pack)
+
+    if args.once:
+        bericht = watcher.scan()
+        print_report(bericht)
+        print(f"{len(bericht['rendered'])} gerendert, {bericht['unchanged']} unverändert")
+        return 1 if bericht["errors"] else 0
+
+    print(f"Überwache {args.source} -> {args.output} (Strg+C zum Beenden)")
+    try:
+        watcher.run(args.interval, on_scan=print_report)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())